@@ -90,3 +90,18 @@ export interface Task {
     user_plant: UserPlant;
     next_date?: string;
 }
+
+// Respuesta de /api/user-tasks/: las tareas referencian la planta por id y
+// cada planta viene una sola vez en `plants`
+export interface TaskRef {
+    type: TaskType;
+    user_plant: number;
+    next_date?: string;
+}
+
+export interface TasksResponse {
+    today_tasks: TaskRef[];
+    next_tasks: TaskRef[];
+    previous_tasks: TaskRef[];
+    plants: { [plantId: string]: UserPlant };
+}
@@ -1,10 +1,24 @@
 import { useAuth } from "@/hooks/useAuthContext";
 import { Platform } from "react-native";
-import { PerenualPlant, Tasks, UserPlant } from "@/models/Plant";
+import { PerenualPlant, Task, TaskRef, Tasks, TasksResponse, UserPlant } from "@/models/Plant";
 import { PlantInfo, Prediction } from "@/models/PlantInfo";
 import { PlantDetailTrefle, PlantTrefle } from "@/models/PlanTrefle";
 const url = process.env.EXPO_PUBLIC_API_BASE_URL;
 
+// Sustituye el id de planta de cada tarea por la planta de `plants`
+const hydrateTasks = (json: TasksResponse): Tasks => {
+  const plants = json.plants || {};
+  const hydrate = (tasks: TaskRef[] = []): Task[] =>
+    tasks
+      .filter(task => plants[task.user_plant])
+      .map(task => ({ ...task, user_plant: plants[task.user_plant] }));
+  return {
+    today_tasks: hydrate(json.today_tasks),
+    next_tasks: hydrate(json.next_tasks),
+    previous_tasks: hydrate(json.previous_tasks),
+  };
+};
+
 export const PlantService = {
   getAllPlants: async (accessToken: string): Promise<UserPlant[]> => {
     try {
@@ -300,7 +314,7 @@ export const PlantService = {
         throw new Error("Error fetching tasks");
       }
       const json = await response.json();
-      return json || [];
+      return hydrateTasks(json || {});
     } catch (error) {
       throw error;
     }
@@ -0,0 +1,151 @@
+"""Tareas de cuidado (riego, poda, pulverización, rotación) de las plantas de un usuario.
+
+Las próximas fechas se guardan en UserPlant (`next_*_date`, ver DUE_DATE_FIELDS):
+se recalculan con estas funciones al guardar la planta y con
+`manage.py backfill_due_dates`, así que listar las tareas y los métodos
+`get_next_*_date` de UserPlantSerializer solo leen esas columnas.
+"""
+import json
+from datetime import timedelta
+
+from django.utils import timezone
+
+UNIT_DAYS = {'day': 1, 'week': 7, 'month': 30}
+PERIOD_UNIT_DAYS = {'days': 1, 'weeks': 7, 'months': 30}
+
+TASK_FIELDS = (
+    'id', 'created_at', 'isWateringReminder',
+    'last_watered_date', 'watering_type', 'watering_period', 'watering_time', 'watering_unit',
+    'last_pruning_date', 'pruning_time', 'pruning_time_unit',
+    'last_spraying_date', 'sprayed_time', 'sprayed_unit',
+    'last_rotating_date', 'rotation_time', 'rotation_unit',
+)
+
+
+def _created_date(row):
+    # Una planta nueva todavía no tiene created_at cuando se calculan sus fechas
+    return (row['created_at'] or timezone.now()).date()
+
+
+def task_row(obj):
+    """Campos de TASK_FIELDS de una instancia de UserPlant, como los devuelve values()."""
+    return {field: getattr(obj, field) for field in TASK_FIELDS}
+
+
+def _period_days(period):
+    # watering_period de Perenual: {"value": "7-10", "unit": "days"}; un rango usa la media
+    if isinstance(period, str):
+        period = json.loads(period)
+    value = period["value"]
+    if isinstance(value, str) and '-' in value:
+        min_val, max_val = map(int, value.split('-'))
+        value = (min_val + max_val) / 2
+    else:
+        value = int(value)
+    return value * PERIOD_UNIT_DAYS.get(period["unit"], 1)
+
+
+def next_watering_date(row):
+    if not row['isWateringReminder']:
+        return None
+    last = row['last_watered_date']
+    if last and row['watering_period'] and row['watering_type'] == 'recommended':
+        try:
+            return last + timedelta(days=_period_days(row['watering_period']))
+        except Exception:
+            return None
+    if last and row['watering_time'] and row['watering_type'] == 'manual':
+        return last + timedelta(days=row['watering_time'] * UNIT_DAYS.get(row['watering_unit'], 1))
+    return _created_date(row)
+
+
+def _next_interval_date(row, last, amount, unit):
+    if not (row[amount] and row[unit]):
+        return None
+    if row[last]:
+        return row[last] + timedelta(days=row[amount] * UNIT_DAYS.get(row[unit], 1))
+    return _created_date(row)
+
+
+def next_pruning_date(row):
+    return _next_interval_date(row, 'last_pruning_date', 'pruning_time', 'pruning_time_unit')
+
+
+def next_spraying_date(row):
+    return _next_interval_date(row, 'last_spraying_date', 'sprayed_time', 'sprayed_unit')
+
+
+def next_rotating_date(row):
+    return _next_interval_date(row, 'last_rotating_date', 'rotation_time', 'rotation_unit')
+
+
+# La fertilización no genera tareas por ahora (ver UserPlantSerializer.get_next_fertilizing_date)
+TASK_TYPES = (
+    ('watering', next_watering_date),
+    ('pruning', next_pruning_date),
+    ('spraying', next_spraying_date),
+    ('rotating', next_rotating_date),
+)
+
+# Columna de UserPlant con la próxima fecha de cada tipo de tarea
+DUE_DATE_FIELDS = {
+    'watering': 'next_watering_date',
+    'pruning': 'next_pruning_date',
+    'spraying': 'next_spraying_date',
+    'rotating': 'next_rotating_date',
+}
+
+
+def due_dates(row):
+    """{campo next_*_date: fecha} calculadas a partir de los campos de TASK_FIELDS."""
+    return {DUE_DATE_FIELDS[task_type]: next_date(row) for task_type, next_date in TASK_TYPES}
+
+
+def bucket_tasks(rows, today):
+    """Reparte las tareas en hoy / próximas / atrasadas.
+
+    `rows` son diccionarios con 'id' y las columnas de DUE_DATE_FIELDS. Cada tarea
+    referencia la planta por id (`user_plant`); devuelve también el conjunto de ids
+    con alguna tarea para serializar cada planta una sola vez.
+    """
+    buckets = {'today_tasks': [], 'next_tasks': [], 'previous_tasks': []}
+    plant_ids = set()
+    for row in rows:
+        for task_type, field in DUE_DATE_FIELDS.items():
+            date = row[field]
+            if date is None:
+                continue
+            if date == today:
+                bucket = 'today_tasks'
+            elif date > today:
+                bucket = 'next_tasks'
+            else:
+                bucket = 'previous_tasks'
+            buckets[bucket].append({"type": task_type, "next_date": date, "user_plant": row['id']})
+            plant_ids.add(row['id'])
+    return buckets, plant_ids
+
+
+def backfill(model, batch_size=1000, dry_run=False):
+    """Recalcula next_*_date de todas las filas de `model` que estén desactualizadas.
+
+    `model` es UserPlant. Devuelve el número de plantas con alguna fecha distinta.
+    """
+    fields = list(DUE_DATE_FIELDS.values())
+    rows = model.objects.order_by('pk').values(*TASK_FIELDS, *fields)
+    changed = []
+    total = 0
+    for row in rows.iterator(chunk_size=batch_size):
+        dates = due_dates(row)
+        if all(row[field] == value for field, value in dates.items()):
+            continue
+        total += 1
+        if dry_run:
+            continue
+        changed.append(model(pk=row['id'], **dates))
+        if len(changed) >= batch_size:
+            model.objects.bulk_update(changed, fields)
+            changed = []
+    if changed:
+        model.objects.bulk_update(changed, fields)
+    return total
@@ -0,0 +1,119 @@
+"""Índice clase del modelo -> id de Perenual para PredictImageView y PredictPestDiseaseView.
+
+Las clases de los clasificadores son fijas, así que su id de Perenual se resuelve
+una sola vez con `manage.py build_perenual_index` (desde los JSON del repositorio o
+con una búsqueda en la API por clase) y se guarda junto a los pesos:
+`perenual_ids.json` (especie de cada planta) y `perenual_issues.json` (plaga o
+enfermedad de cada etiqueta, -1 para las sanas). Las vistas hacen una búsqueda O(1)
+en ese fichero y solo consultan Perenual en vivo para las clases que no están.
+
+Formato del fichero:
+    {"format": 1, "model": "plant", "names_sha256": "...", "source": "mock",
+     "built_at": "...", "ids": {"<clase>": <id o null>, ...}}
+"""
+import hashlib
+import json
+import os
+import threading
+
+from .inference import MODEL_WEIGHTS
+
+INDEX_FORMAT = 1
+INDEX_FILENAMES = {
+    'plant': 'perenual_ids.json',
+    'disease': 'perenual_issues.json',
+}
+
+_lock = threading.Lock()
+# ruta -> (mtime_ns, ids)
+_loaded = {}
+
+
+def index_path(name):
+    """Ruta del índice del modelo `name`, en la carpeta de sus pesos."""
+    return os.path.join(os.path.dirname(MODEL_WEIGHTS[name]), INDEX_FILENAMES[name])
+
+
+def names_digest(names):
+    """Huella de las clases del modelo, para saber con qué clases se construyó el índice."""
+    return hashlib.sha256('\n'.join(sorted(names)).encode('utf-8')).hexdigest()
+
+
+def normalize(text):
+    return ' '.join(str(text).replace('_', ' ').replace('-', ' ').lower().split())
+
+
+def match_species(plants, class_name):
+    """Id de la especie de species-list que corresponde a `class_name`, o None.
+
+    Primero busca una coincidencia exacta (normalizada) con el nombre común, los
+    científicos o los alternativos; si no hay, el primer resultado cuyo nombre
+    contiene la clase, como haría la búsqueda `q` de Perenual.
+    """
+    query = normalize(class_name)
+    if not query:
+        return None
+    partial = None
+    for plant in plants:
+        names = [plant.get('common_name') or '']
+        names += plant.get('scientific_name') or []
+        names += plant.get('other_name') or []
+        names = [normalize(n) for n in names if n]
+        if query in names:
+            return plant.get('id')
+        if partial is None and any(query in n for n in names):
+            partial = plant.get('id')
+    return partial
+
+
+def write_index(name, ids, names, source):
+    from django.utils import timezone
+
+    data = {
+        'format': INDEX_FORMAT,
+        'model': name,
+        'names_sha256': names_digest(names),
+        'source': source,
+        'built_at': timezone.now().isoformat(),
+        'ids': ids,
+    }
+    path = index_path(name)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+    return path
+
+
+def read_index(name):
+    """Contenido completo del índice, o None si no existe o no es legible."""
+    try:
+        with open(index_path(name), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get('format') != INDEX_FORMAT:
+        return None
+    return data
+
+
+def load_ids(name):
+    """Clase -> id del índice de `name`; se relee solo si el fichero cambia."""
+    path = index_path(name)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return {}
+    loaded = _loaded.get(path)
+    if loaded is not None and loaded[0] == mtime:
+        return loaded[1]
+    with _lock:
+        data = read_index(name)
+        ids = data.get('ids', {}) if data else {}
+        _loaded[path] = (mtime, ids)
+    return ids
+
+
+def perenual_id(name, class_name):
+    """Id de Perenual de la clase `class_name` del modelo `name`, o None si no está resuelta."""
+    return load_ids(name).get(class_name)
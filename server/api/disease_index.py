@@ -0,0 +1,138 @@
+"""Resolución offline de las etiquetas del modelo de enfermedades a ids de Perenual.
+
+Las etiquetas del clasificador tienen la forma "Planta___Enfermedad" (p. ej.
+"Apple___Apple_scab", "Tomato___Late_blight"). DiseaseMatcher las compara con los
+nombres de perenual_diseases_list.json y disease-list-mock.json:
+
+1. Coincidencia exacta (normalizada) con "planta enfermedad" o con "enfermedad".
+2. Si no, similitud de trigramas con los nombres que comparten alguna palabra con
+   la enfermedad (índice invertido de palabras), por encima de `min_score`.
+
+Los nombres con alternativas ("Brown patch (large patch or Rhizoctonia blight)")
+se indexan también por cada alternativa. `manage.py build_perenual_index --models
+disease` guarda el resultado para todas las clases del modelo, y
+PredictPestDiseaseView solo consulta Perenual para las etiquetas que no estén.
+"""
+import ast
+import json
+import os
+import re
+from collections import defaultdict
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..')
+DISEASE_FILES = ('perenual_diseases_list.json', 'disease-list-mock.json')
+MIN_SCORE = 0.6
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_PARENS = re.compile(r"\(([^)]*)\)")
+
+
+def normalize(text):
+    text = str(text or '').replace('_', ' ').replace('-', ' ').lower()
+    return ' '.join(_NON_WORD.sub(' ', text).split())
+
+
+def split_label(label):
+    """"Planta___Enfermedad" -> ("Planta", "Enfermedad") con los guiones bajos como espacios."""
+    plant, disease = (label.split('___', 1) if '___' in label else ('', label))
+    return plant.replace('_', ' ').strip(), disease.replace('_', ' ').strip()
+
+
+def is_healthy(label):
+    return normalize(split_label(label)[1]) == 'healthy'
+
+
+def trigrams(text):
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def name_aliases(name):
+    """Nombre completo, nombre sin paréntesis y cada alternativa entre paréntesis ("a or b")."""
+    aliases = [name, _PARENS.sub(' ', name)]
+    for inner in _PARENS.findall(name):
+        aliases.extend(re.split(r"\bor\b", inner))
+    return [a for a in (normalize(a) for a in aliases) if a]
+
+
+def _as_list(value):
+    if isinstance(value, list):
+        return value
+    if not value or value == 'None':
+        return []
+    if isinstance(value, str) and value.startswith('['):
+        try:
+            parsed = ast.literal_eval(value)
+            return parsed if isinstance(parsed, list) else [value]
+        except (ValueError, SyntaxError):
+            pass
+    return [value]
+
+
+def load_entries(data_dir=DATA_DIR):
+    """[(issue_id, nombre), ...] de los JSON de enfermedades que hay en el repositorio."""
+    entries = []
+    for filename in DISEASE_FILES:
+        try:
+            with open(os.path.join(data_dir, filename), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            print(f"Warning: {filename} not found")
+            continue
+        items = data.get('data', []) if isinstance(data, dict) else data
+        for item in items:
+            try:
+                issue_id = int(item.get('id'))
+            except (TypeError, ValueError):
+                continue
+            names = [item.get('name'), item.get('common_name')]
+            names += _as_list(item.get('other_name'))
+            entries.extend((issue_id, n) for n in names if n)
+    return entries
+
+
+class DiseaseMatcher:
+    def __init__(self, entries):
+        self.exact = {}
+        self.aliases = []
+        self.words = defaultdict(set)
+        # Ante nombres repetidos (p. ej. "Powdery mildew" para varios huéspedes) gana el id menor
+        for issue_id, name in sorted(entries):
+            for alias in name_aliases(name):
+                self.exact.setdefault(alias, issue_id)
+                position = len(self.aliases)
+                self.aliases.append((alias, issue_id, trigrams(alias)))
+                for word in alias.split():
+                    self.words[word].add(position)
+
+    @classmethod
+    def from_files(cls, data_dir=DATA_DIR):
+        return cls(load_entries(data_dir))
+
+    def match(self, label, min_score=MIN_SCORE):
+        """(issue_id, nombre, puntuación) de la mejor coincidencia o (None, None, puntuación)."""
+        plant, disease = split_label(label)
+        queries = name_aliases(disease)
+        plant_query = normalize(plant)
+        for query in ([f"{plant_query} {q}" for q in queries] if plant_query else []) + queries:
+            if query in self.exact:
+                return self.exact[query], query, 1.0
+
+        plant_words = set(plant_query.split())
+        best, best_key = (None, None, 0.0), None
+        for query in queries:
+            query_grams = trigrams(query)
+            positions = set().union(*(self.words.get(w, ()) for w in query.split()))
+            for position in positions:
+                alias, issue_id, grams = self.aliases[position]
+                score = len(query_grams & grams) / len(query_grams | grams)
+                # A igual puntuación, preferir el nombre que menciona la planta y luego el id menor
+                key = (score, bool(plant_words & set(alias.split())), -issue_id)
+                if best_key is None or key > best_key:
+                    best, best_key = (issue_id, alias, score), key
+        if best[2] < min_score:
+            return None, None, best[2]
+        return best
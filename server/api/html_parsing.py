@@ -0,0 +1,102 @@
+"""Parseo de HTML común a los scrapers (diseases_parser.py, plantScraping.py) y a las
+páginas de detalle de plagas (api/pest_details.py).
+
+- Parser: lxml (en C) si está instalado; si no, html.parser, que da el mismo árbol
+  para estas páginas pero es varias veces más lento.
+- Parseo parcial: con `only` (un SoupStrainer, ver `TagStrainer`) solo se construyen los
+  contenedores que interesan (y todo lo que tienen dentro); el resto del documento
+  se recorre pero no crea objetos Tag.
+- Páginas grandes (la lista de enfermedades): aun con lxml, BeautifulSoup construye
+  el árbol en Python y tarda unas 6 veces más que lxml solo. `parse_tree` devuelve el
+  árbol de lxml para recorrerlo con XPath (`xpath`, `has_classes_xpath`) y `text` da el mismo
+  texto que get_text(strip=True).
+
+Medido con benchmarks/html_parsing.py sobre perenual_diseases.html.
+"""
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
+
+try:
+    import lxml.etree
+    import lxml.html
+except ImportError:
+    lxml = None
+
+PARSER = 'lxml' if builder_registry.lookup('lxml') else 'html.parser'
+
+
+def has_classes(*names):
+    """Filtro de atributo `class` para SoupStrainer: el elemento tiene todas esas clases.
+
+    Mientras se parsea, BeautifulSoup pasa el atributo sin separar ("a b c"), así
+    que no sirve comparar con una sola clase como en `find_all(class_=...)`.
+    """
+    wanted = set(names)
+
+    def match(value):
+        if not value:
+            return False
+        classes = value.split() if isinstance(value, str) else value
+        return wanted.issubset(classes)
+    return match
+
+
+class TagStrainer(SoupStrainer):
+    """SoupStrainer que deja pasar los elementos que cumplen alguna de las alternativas.
+
+    Cada alternativa es un nombre de etiqueta ('main') o un par (nombre o None,
+    atributos), p. ej. ('a', {'class': has_classes('search-container-box')}); los
+    valores de los atributos son un valor exacto o una función.
+    """
+
+    def __init__(self, *alternatives):
+        self.alternatives = [(alternative, {}) if isinstance(alternative, str) else alternative
+                             for alternative in alternatives]
+        # bs4 < 4.13 llama a la función con el nombre y los atributos de cada etiqueta
+        super().__init__(self.allows)
+
+    def allows(self, name, attrs=None):
+        attrs = attrs or {}
+        for wanted, tests in self.alternatives:
+            if wanted is not None and name != wanted:
+                continue
+            if all(test(attrs.get(attr)) if callable(test) else attrs.get(attr) == test
+                   for attr, test in tests.items()):
+                return True
+        return False
+
+    # bs4 >= 4.13
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return self.allows(name, attrs)
+
+    def allow_string_creation(self, string):
+        return False
+
+
+def parse(html, only=None):
+    """BeautifulSoup de `html` con el parser más rápido disponible; `only` limita lo que se construye."""
+    return BeautifulSoup(html, PARSER, parse_only=only)
+
+
+def parse_tree(html):
+    """Árbol de lxml.html del documento (requiere lxml)."""
+    if lxml is None:
+        raise ImportError("parse_tree requiere lxml (pip install lxml)")
+    return lxml.html.document_fromstring(html)
+
+
+def xpath(expression):
+    """XPath compilado una vez (requiere lxml); se llama con el elemento: xpath('.//p')(element)."""
+    if lxml is None:
+        raise ImportError("xpath requiere lxml (pip install lxml)")
+    return lxml.etree.XPath(expression)
+
+
+def has_classes_xpath(*names):
+    """Condición XPath equivalente a `has_classes`: [has_classes_xpath('a', 'b')]."""
+    return ' and '.join(f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')" for name in names)
+
+
+def text(element):
+    """Texto del elemento como get_text(strip=True) de BeautifulSoup: cada trozo sin espacios, unidos."""
+    return ''.join(part.strip() for part in element.itertext())
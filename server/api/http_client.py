@@ -0,0 +1,231 @@
+"""Cliente HTTP compartido para todas las llamadas salientes (Perenual, OpenWeather,
+páginas de plagas, descarga de imágenes).
+
+Cada host tiene su propia `requests.Session` con un pool de conexiones keep-alive,
+timeouts por defecto y reintentos acotados con backoff para 429/5xx. Un Retry-After
+se respeta solo hasta OUTBOUND_MAX_RETRY_AFTER segundos: si el servidor pide esperar
+más se devuelve su respuesta enseguida, para no dejar el worker dormido. También se
+guarda un histograma de latencias por host.
+
+Las vistas asíncronas usan `aget`, que hace lo mismo sobre un `httpx.AsyncClient`
+compartido por bucle de eventos (uno por worker de uvicorn).
+"""
+import asyncio
+import threading
+import time
+import weakref
+from urllib.parse import urlparse
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Límites superiores (ms) de los buckets del histograma de latencias
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def default_timeout():
+    """Timeout (connect, read) que se aplica si la llamada no indica otro."""
+    return (
+        getattr(settings, 'OUTBOUND_CONNECT_TIMEOUT', 3.05),
+        getattr(settings, 'OUTBOUND_READ_TIMEOUT', 15),
+    )
+
+
+def max_retry_after():
+    """Segundos de Retry-After que se está dispuesto a esperar antes de reintentar."""
+    return getattr(settings, 'OUTBOUND_MAX_RETRY_AFTER', 5)
+
+
+class CappedRetry(Retry):
+    """Retry que no reintenta si el Retry-After supera `max_retry_after()`: urlopen
+    devuelve entonces la respuesta (raise_on_status=False) sin dormir."""
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if response is not None:
+            retry_after = self.get_retry_after(response)
+            if retry_after is not None and retry_after > max_retry_after():
+                raise MaxRetryError(_pool, url, ResponseError(f"Retry-After {retry_after:g}s"))
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+def _build_session():
+    retry = CappedRetry(
+        total=getattr(settings, 'OUTBOUND_MAX_RETRIES', 2),
+        backoff_factor=getattr(settings, 'OUTBOUND_BACKOFF_FACTOR', 0.3),
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        # Tras agotar los reintentos se devuelve la última respuesta, como antes
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=getattr(settings, 'OUTBOUND_POOL_MAXSIZE', 10),
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def session_for(url):
+    """Devuelve la sesión (y por tanto el pool) del host de `url`."""
+    host = urlparse(url).netloc
+    session = _sessions.get(host)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(host)
+            if session is None:
+                session = _build_session()
+                _sessions[host] = session
+    return session
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, elapsed_ms, error=False):
+        index = len(LATENCY_BUCKETS_MS)
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                index = i
+                break
+        self.buckets[index] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if error:
+            self.errors += 1
+
+    def as_dict(self):
+        labels = [f"le_{bound}ms" for bound in LATENCY_BUCKETS_MS] + ['inf']
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'avg_ms': round(self.total_ms / self.count, 2) if self.count else 0,
+            'max_ms': round(self.max_ms, 2),
+            'buckets': dict(zip(labels, self.buckets)),
+        }
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def _observe(host, elapsed_ms, error=False):
+    with _histograms_lock:
+        histogram = _histograms.get(host)
+        if histogram is None:
+            histogram = _histograms[host] = LatencyHistogram()
+        histogram.observe(elapsed_ms, error=error)
+
+
+def latency_stats():
+    """Histograma de latencias por host de este proceso."""
+    with _histograms_lock:
+        return {host: h.as_dict() for host, h in _histograms.items()}
+
+
+def reset_stats():
+    with _histograms_lock:
+        _histograms.clear()
+
+
+def get(url, params=None, timeout=None, **kwargs):
+    """GET a través del pool del host, con timeout por defecto y métricas de latencia.
+
+    Los errores 5xx/429 que persisten tras los reintentos se devuelven como respuesta;
+    los errores de red se propagan como `requests.RequestException`.
+    """
+    host = urlparse(url).netloc
+    session = session_for(url)
+    start = time.perf_counter()
+    try:
+        response = session.get(url, params=params, timeout=timeout or default_timeout(), **kwargs)
+    except requests.RequestException:
+        _observe(host, (time.perf_counter() - start) * 1000, error=True)
+        raise
+    _observe(host, (time.perf_counter() - start) * 1000, error=response.status_code >= 500)
+    return response
+
+
+# Cliente asíncrono: un httpx.AsyncClient por bucle de eventos, ya que sus conexiones
+# no se pueden usar desde otro bucle (p. ej. cuando gunicorn sync ejecuta una vista async)
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _httpx_timeout(timeout):
+    if timeout is None:
+        timeout = default_timeout()
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
+
+
+def async_client():
+    """Devuelve el AsyncClient del bucle de eventos actual."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=getattr(settings, 'OUTBOUND_ASYNC_MAX_CONNECTIONS', 100),
+                max_keepalive_connections=getattr(settings, 'OUTBOUND_POOL_MAXSIZE', 10),
+            ),
+            # Reintentos de conexión; los de 429/5xx se hacen en `aget`
+            retries=getattr(settings, 'OUTBOUND_MAX_RETRIES', 2),
+        )
+        client = httpx.AsyncClient(transport=transport, timeout=_httpx_timeout(None))
+        _async_clients[loop] = client
+    return client
+
+
+def _retry_delay(response, attempt):
+    """Segundos hasta el siguiente intento, o None si el Retry-After pide esperar demasiado."""
+    retry_after = response.headers.get('Retry-After')
+    if retry_after and retry_after.isdigit():
+        return int(retry_after) if int(retry_after) <= max_retry_after() else None
+    return getattr(settings, 'OUTBOUND_BACKOFF_FACTOR', 0.3) * (2 ** attempt)
+
+
+async def aget(url, params=None, timeout=None, **kwargs):
+    """Versión asíncrona de `get`. Devuelve un `httpx.Response` (status_code, json(), text).
+
+    Los errores de red se propagan como `httpx.HTTPError`.
+    """
+    host = urlparse(url).netloc
+    client = async_client()
+    retries = getattr(settings, 'OUTBOUND_MAX_RETRIES', 2)
+    start = time.perf_counter()
+    attempt = 0
+    while True:
+        try:
+            response = await client.get(url, params=params, timeout=_httpx_timeout(timeout), **kwargs)
+        except httpx.HTTPError:
+            _observe(host, (time.perf_counter() - start) * 1000, error=True)
+            raise
+        if response.status_code not in RETRY_STATUS_CODES or attempt >= retries:
+            break
+        delay = _retry_delay(response, attempt)
+        if delay is None:
+            break
+        await asyncio.sleep(delay)
+        attempt += 1
+    _observe(host, (time.perf_counter() - start) * 1000, error=response.status_code >= 500)
+    return response
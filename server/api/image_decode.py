@@ -0,0 +1,96 @@
+"""Decodificación de las imágenes subidas para los clasificadores.
+
+El clasificador trabaja a INFERENCE_IMGSZ (224) píxeles, así que decodificar una
+foto de móvil de 12 MP a resolución completa (~36 MB en BGR) es trabajo perdido.
+decode_image lee solo la cabecera para conocer el tamaño, rechaza las imágenes
+demasiado grandes antes de decodificarlas y usa IMREAD_REDUCED_COLOR_{2,4,8} para
+que libjpeg decodifique directamente a 1/2, 1/4 u 1/8, dejando el lado corto
+siempre >= INFERENCE_IMGSZ.
+
+read_buffer evita copias: usa el buffer del fichero en memoria o mapea el fichero
+temporal de la subida en un array de numpy.
+"""
+import io
+
+import cv2
+import numpy as np
+from django.conf import settings
+from PIL import Image
+
+# Bytes que se pasan a PIL para leer la cabecera (incluye un EXIF grande)
+HEADER_BYTES = 256 * 1024
+
+REDUCED_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+
+class ImageTooLarge(ValueError):
+    """La imagen supera IMAGE_MAX_BYTES o IMAGE_MAX_PIXELS."""
+
+
+def read_buffer(uploaded):
+    """Contenido de un fichero subido como array uint8, sin copias intermedias."""
+    if hasattr(uploaded, 'temporary_file_path'):
+        # Mapeado en memoria: las páginas se leen del fichero temporal bajo demanda
+        if not uploaded.size:
+            return np.empty(0, dtype=np.uint8)
+        return np.memmap(uploaded.temporary_file_path(), dtype=np.uint8, mode='r')
+    f = getattr(uploaded, 'file', uploaded)
+    if isinstance(f, io.BytesIO):
+        # getvalue() comparte el buffer del BytesIO en lugar de copiarlo
+        return np.frombuffer(f.getvalue(), dtype=np.uint8)
+    uploaded.seek(0)
+    return np.frombuffer(uploaded.read(), dtype=np.uint8)
+
+
+def image_size(buffer):
+    """(ancho, alto) leídos de la cabecera, o None si PIL no reconoce el formato.
+
+    `buffer` es cualquier objeto con el protocolo de buffer (array, bytes, bytearray).
+    """
+    try:
+        with Image.open(io.BytesIO(bytes(memoryview(buffer)[:HEADER_BYTES]))) as image:
+            return image.size
+    except Image.DecompressionBombError:
+        raise ImageTooLarge("Image dimensions are too large.")
+    except Exception:
+        return None
+
+
+def reduced_flag(width, height, target_size):
+    """Flag de imdecode con la mayor reducción que mantiene el lado corto >= target_size."""
+    short_side = min(width, height)
+    for factor, flag in REDUCED_FLAGS:
+        if short_side // factor >= target_size:
+            return flag
+    return cv2.IMREAD_COLOR
+
+
+def check_bytes(buffer, max_bytes=None):
+    """Lanza ImageTooLarge si el fichero supera IMAGE_MAX_BYTES."""
+    max_bytes = max_bytes or getattr(settings, 'IMAGE_MAX_BYTES', 20 * 1024 * 1024)
+    if buffer.nbytes > max_bytes:
+        raise ImageTooLarge(f"Image file is larger than {max_bytes // (1024 * 1024)} MB.")
+
+
+def decode_image(buffer, target_size=None, max_pixels=None, max_bytes=None):
+    """Imagen BGR lista para el clasificador, o None si no se puede decodificar.
+
+    Lanza ImageTooLarge si el fichero o sus dimensiones superan los límites.
+    """
+    target_size = target_size or getattr(settings, 'INFERENCE_IMGSZ', 224)
+    max_pixels = max_pixels or getattr(settings, 'IMAGE_MAX_PIXELS', 50_000_000)
+
+    check_bytes(buffer, max_bytes)
+    flag = cv2.IMREAD_COLOR
+    size = image_size(buffer)
+    if size is not None:
+        width, height = size
+        if width * height > max_pixels:
+            raise ImageTooLarge(f"Image is {width}x{height}; the limit is {max_pixels // 1_000_000} MP.")
+        if getattr(settings, 'IMAGE_REDUCED_DECODE', True):
+            flag = reduced_flag(width, height, target_size)
+    return cv2.imdecode(buffer, flag)
@@ -0,0 +1,209 @@
+"""Inferencia de los clasificadores YOLO con micro-batching.
+
+Cada petición de PredictImageView / PredictPestDiseaseView deja su imagen ya
+decodificada en una cola y espera. Un hilo por modelo junta hasta
+INFERENCE_MAX_BATCH imágenes (o las que lleguen en INFERENCE_MAX_WAIT_MS desde la
+primera) y hace una sola pasada del modelo para todas; cada petición recibe su
+resultado. Solo tiene efecto si el worker atiende varias peticiones a la vez
+(gunicorn con --threads, o workers ASGI).
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
+
+import numpy as np
+from django.conf import settings
+
+
+# Pesos de cada clasificador (rutas relativas a server/)
+MODEL_WEIGHTS = {
+    'plant': "./model/results/plantify_model_v1/weights/best.pt",
+    'disease': "./model/results_disease/plantify_disease_model_v1/weights/best.pt",
+}
+
+
+def load_model(name, backend=None):
+    """Modelo `name` con el backend de INFERENCE_BACKEND: 'torch' (best.pt con
+    Ultralytics), 'onnx' o 'onnx-int8' (exportados con manage.py export_models)."""
+    backend = backend or getattr(settings, 'INFERENCE_BACKEND', 'torch')
+    if backend in ('onnx', 'onnx-int8'):
+        from .onnx_backend import OnnxClassifier, onnx_path
+        return OnnxClassifier(onnx_path(MODEL_WEIGHTS[name], int8=backend == 'onnx-int8'))
+    if backend != 'torch':
+        raise ValueError(f"Unknown INFERENCE_BACKEND: {backend}")
+    # ultralytics importa torch: solo se paga al cargar un modelo, no al importar api.views
+    from ultralytics import YOLO
+    return YOLO(MODEL_WEIGHTS[name])
+
+
+def load_predictor(name):
+    """Carga el clasificador `name` de MODEL_WEIGHTS en este proceso, con micro-batching."""
+    return BatchingPredictor(load_model(name), name=name)
+
+
+def warm_up(*predictors):
+    """Carga los modelos y hace una predicción con una imagen vacía para que la
+    primera petición real no pague la carga ni la inicialización de torch."""
+    for predictor in predictors:
+        start = time.perf_counter()
+        predictor.predict(np.zeros((224, 224, 3), dtype=np.uint8))
+        print(f"Modelo {getattr(predictor, 'name', predictor)} listo en {time.perf_counter() - start:.1f}s")
+
+
+def warm_up_in_background(*predictors):
+    def run():
+        try:
+            warm_up(*predictors)
+        except Exception as e:
+            print(f"Error precargando los modelos: {e}")
+    threading.Thread(target=run, name='model-warm-up', daemon=True).start()
+
+
+class LazyPredictor:
+    """Clasificador que se carga en la primera predicción (o con warm_up()).
+
+    Así importar api.views (migrate, collectstatic, tests, arranque de workers)
+    no importa torch ni carga los pesos.
+    """
+
+    def __init__(self, name, loader=load_predictor):
+        self.name = name
+        self._loader = loader
+        self._predictor = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._predictor is not None
+
+    def get(self):
+        if self._predictor is None:
+            with self._lock:
+                if self._predictor is None:
+                    self._predictor = self._loader(self.name)
+        return self._predictor
+
+    def predict(self, source, **kwargs):
+        return self.get().predict(source, **kwargs)
+
+    def stats(self):
+        if self._predictor is None:
+            return {'loaded': False}
+        return dict(self._predictor.stats(), loaded=True)
+
+
+# Marca en la cola para que el hilo de un BatchingPredictor termine (close())
+_STOP = object()
+
+
+class BatchingPredictor:
+    """Envuelve un modelo con `predict(lista_de_imágenes)` (YOLO de Ultralytics).
+
+    `predict(img)` devuelve lo mismo que `YOLO.predict(img)`: una lista con un
+    Results. Las URLs y rutas no se agrupan y van directamente al modelo.
+    """
+
+    def __init__(self, model, name='model', max_batch=None, max_wait_ms=None, timeout=None):
+        self.model = model
+        self.name = name
+        self.max_batch = max_batch or getattr(settings, 'INFERENCE_MAX_BATCH', 4)
+        if max_wait_ms is None:
+            max_wait_ms = getattr(settings, 'INFERENCE_MAX_WAIT_MS', 10)
+        self.max_wait = max_wait_ms / 1000
+        self.timeout = timeout or getattr(settings, 'INFERENCE_TIMEOUT', 30)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._stats = {'requests': 0, 'batches': 0, 'batched_images': 0, 'largest_batch': 0, 'batch_errors': 0}
+
+    def predict(self, source, **kwargs):
+        if self.max_batch <= 1 or kwargs or not isinstance(source, np.ndarray):
+            return self.model.predict(source, **kwargs)
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((source, future))
+        try:
+            return [future.result(timeout=self.timeout)]
+        except FuturesTimeoutError:
+            future.cancel()
+            raise
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['queued'] = self._queue.qsize()
+        stats['avg_batch'] = round(stats['batched_images'] / stats['batches'], 2) if stats['batches'] else 0
+        return stats
+
+    def close(self):
+        """Detiene el hilo de inferencia, que mantiene vivo el modelo, para poder liberarlo."""
+        with self._lock:
+            worker, self._worker = self._worker, None
+        if worker is not None and worker.is_alive():
+            self._queue.put(_STOP)
+
+    def _ensure_worker(self):
+        # El hilo se arranca en la primera predicción, ya dentro del worker de gunicorn
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=f'inference-{self.name}', daemon=True)
+                self._worker.start()
+
+    def _next_batch(self):
+        item = self._queue.get()
+        if item is _STOP:
+            return None
+        batch = [item]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                # Se atiende este batch y el hilo termina en la siguiente vuelta
+                self._queue.put(item)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            # Si el que esperaba ya se fue (timeout), no gastar inferencia en su imagen
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if batch:
+                self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        with self._lock:
+            self._stats['requests'] += len(batch)
+            self._stats['batches'] += 1
+            self._stats['batched_images'] += len(batch)
+            self._stats['largest_batch'] = max(self._stats['largest_batch'], len(batch))
+        try:
+            results = self.model.predict([image for image, _ in batch], verbose=False)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # Una imagen mala no debe hacer fallar a las demás: repetir una a una
+            with self._lock:
+                self._stats['batch_errors'] += 1
+            print(f"Error en el batch de {self.name} ({len(batch)} imágenes), se repite una a una: {e}")
+            for image, future in batch:
+                try:
+                    future.set_result(self.model.predict(image, verbose=False)[0])
+                except Exception as single_error:
+                    future.set_exception(single_error)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from api import care_tasks
+from api.models import UserPlant
+
+
+class Command(BaseCommand):
+    help = "Recalcula las próximas fechas de riego, poda, pulverización y rotación (next_*_date) de las plantas"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Solo muestra cuántas plantas tienen fechas desactualizadas')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = care_tasks.backfill(UserPlant, batch_size=options['batch_size'], dry_run=options['dry_run'])
+        if options['dry_run']:
+            self.stdout.write(f"plantas: {total} con fechas desactualizadas")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"plantas: {total} actualizadas"))
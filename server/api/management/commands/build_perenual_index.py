@@ -0,0 +1,106 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import class_index, disease_index, http_client
+from api.inference import load_model
+from api.perenual import PERENUAL_API_URL, PERENUAL_PEST_API_URL, PerenualError, get_api_key
+
+
+def model_class_names(name):
+    """Nombres de las clases del modelo (`results[0].names`), en orden de índice."""
+    names = load_model(name).names
+    return [names[i] for i in sorted(names)] if isinstance(names, dict) else list(names)
+
+
+class Command(BaseCommand):
+    help = ("Resuelve el id de Perenual de cada clase de los clasificadores y lo guarda junto a los "
+            "pesos (perenual_ids.json, perenual_issues.json) para que las predicciones no busquen en la API")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--models', nargs='+', choices=sorted(class_index.INDEX_FILENAMES),
+                            default=sorted(class_index.INDEX_FILENAMES))
+        parser.add_argument('--source', choices=['mock', 'api'], default='mock',
+                            help='JSON del repositorio (species-list-mock.json; perenual_diseases_list.json '
+                                 'y disease-list-mock.json) o una búsqueda en la API por clase')
+        parser.add_argument('--refresh', action='store_true',
+                            help='Vuelve a resolver también las clases que ya están en el índice')
+        parser.add_argument('--delay', type=float, default=1.0,
+                            help='Segundos entre llamadas a la API (límite de peticiones de Perenual)')
+        parser.add_argument('--min-score', type=float, default=disease_index.MIN_SCORE,
+                            help='Similitud mínima (trigramas) para aceptar una enfermedad por aproximación')
+
+    def handle(self, *args, **options):
+        for name in options['models']:
+            names = model_class_names(name)
+            current = {} if options['refresh'] else dict((class_index.read_index(name) or {}).get('ids', {}))
+            resolve = self.resolver(name, options)
+
+            ids = {}
+            for class_name in names:
+                if current.get(class_name) is not None:
+                    ids[class_name] = current[class_name]
+                else:
+                    ids[class_name] = resolve(class_name)
+            path = class_index.write_index(name, ids, names, options['source'])
+
+            missing = [n for n, i in ids.items() if i is None]
+            self.stdout.write(self.style.SUCCESS(
+                f"{name}: {len(ids) - len(missing)}/{len(ids)} clases con id de Perenual -> {path}"
+            ))
+            if missing:
+                self.stdout.write(f"  sin resolver (se buscarán en vivo): {', '.join(missing[:20])}"
+                                  + (" ..." if len(missing) > 20 else ""))
+
+    def resolver(self, name, options):
+        if options['source'] == 'mock':
+            return self.mock_plant_resolver() if name == 'plant' else self.mock_disease_resolver(options['min_score'])
+        try:
+            api_key = get_api_key()
+        except PerenualError as e:
+            raise CommandError(str(e))
+        if name == 'plant':
+            return self.api_plant_resolver(api_key, options['delay'])
+        return self.api_disease_resolver(api_key, options['delay'])
+
+    def mock_plant_resolver(self):
+        from api.views import load_species_list_mock
+        plants = load_species_list_mock().get('data', [])
+        return lambda class_name: class_index.match_species(plants, class_name)
+
+    def mock_disease_resolver(self, min_score):
+        matcher = disease_index.DiseaseMatcher.from_files()
+
+        def resolve(label):
+            if disease_index.is_healthy(label):
+                return -1
+            issue_id, matched, score = matcher.match(label, min_score=min_score)
+            if issue_id is not None and score < 1:
+                # Las coincidencias aproximadas se muestran para poder revisarlas
+                self.stdout.write(f"  {label} ~ {matched} ({score:.2f}) -> {issue_id}")
+            return issue_id
+        return resolve
+
+    def api_search(self, url, params, delay):
+        time.sleep(delay)
+        response = http_client.get(url, params=params)
+        if response.status_code != 200:
+            self.stderr.write(f"  {params['q']}: Perenual respondió {response.status_code}")
+            return []
+        return response.json().get('data') or []
+
+    def api_plant_resolver(self, api_key, delay):
+        def resolve(class_name):
+            data = self.api_search(f"{PERENUAL_API_URL}/species-list", {'key': api_key, 'q': class_name}, delay)
+            # Preferir la coincidencia exacta si la hay; si no, el primer resultado (como la vista)
+            return class_index.match_species(data, class_name) or (data[0].get('id') if data else None)
+        return resolve
+
+    def api_disease_resolver(self, api_key, delay):
+        def resolve(label):
+            if disease_index.is_healthy(label):
+                return -1
+            query = disease_index.split_label(label)[1]
+            data = self.api_search(f"{PERENUAL_PEST_API_URL}/pest-disease-list", {'key': api_key, 'q': query}, delay)
+            return data[0].get('id') if data else None
+        return resolve
@@ -0,0 +1,125 @@
+import os
+
+import cv2
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from api.inference import MODEL_WEIGHTS
+from api.onnx_backend import OnnxClassifier, onnx_path, preprocess
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.bmp')
+
+
+def find_images(directory):
+    paths = []
+    for root, _, files in os.walk(directory):
+        paths.extend(os.path.join(root, f) for f in files if f.lower().endswith(IMAGE_EXTENSIONS))
+    return sorted(paths)
+
+
+def read_image(path):
+    return cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+class CalibrationReader:
+    """Imágenes de calibración para la cuantización INT8 estática."""
+
+    def __init__(self, input_name, images, imgsz):
+        self.input_name = input_name
+        self.images = iter(images)
+        self.imgsz = imgsz
+
+    def get_next(self):
+        for path in self.images:
+            image = read_image(path)
+            if image is not None:
+                return {self.input_name: preprocess(image, self.imgsz)[None]}
+        return None
+
+
+class Command(BaseCommand):
+    help = ("Exporta los clasificadores (best.pt) a ONNX, opcionalmente también a INT8, "
+            "y comprueba que el top-1 coincide con el del modelo .pt")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--models', nargs='+', choices=sorted(MODEL_WEIGHTS), default=sorted(MODEL_WEIGHTS))
+        parser.add_argument('--imgsz', type=int, default=224)
+        parser.add_argument('--int8', action='store_true', help='Genera también best.int8.onnx')
+        parser.add_argument('--calibration-dir', help='Imágenes para la cuantización estática (sin ella, dinámica)')
+        parser.add_argument('--validate-dir', help='Conjunto de imágenes reservado para comparar el top-1 con el .pt')
+        parser.add_argument('--max-disagreement', type=float, default=0.0,
+                            help='Fracción máxima de imágenes con top-1 distinto en ONNX FP32')
+        parser.add_argument('--max-int8-disagreement', type=float, default=0.02,
+                            help='Fracción máxima de imágenes con top-1 distinto en ONNX INT8')
+
+    def handle(self, *args, **options):
+        from ultralytics import YOLO
+
+        failures = []
+        for name in options['models']:
+            weights = MODEL_WEIGHTS[name]
+            if not os.path.exists(weights):
+                raise CommandError(f"No existe {weights}")
+            model = YOLO(weights)
+            exported = model.export(format='onnx', imgsz=options['imgsz'], dynamic=True, simplify=True)
+            target = onnx_path(weights)
+            if os.path.abspath(exported) != os.path.abspath(target):
+                os.replace(exported, target)
+            self.stdout.write(f"{name}: {target}")
+            variants = {'onnx': target}
+
+            if options['int8']:
+                variants['onnx-int8'] = self.quantize(target, options)
+                self.stdout.write(f"{name}: {variants['onnx-int8']}")
+
+            if options['validate_dir']:
+                images = find_images(options['validate_dir'])
+                if not images:
+                    raise CommandError(f"No hay imágenes en {options['validate_dir']}")
+                for backend, path in variants.items():
+                    limit = options['max_int8_disagreement'] if backend == 'onnx-int8' else options['max_disagreement']
+                    if not self.validate(name, model, OnnxClassifier(path), images, backend, limit):
+                        failures.append(f"{name} ({backend})")
+
+        if failures:
+            raise CommandError(f"Top-1 distinto del modelo .pt por encima del límite: {', '.join(failures)}")
+
+    def quantize(self, source, options):
+        import onnx
+        from onnxruntime.quantization import QuantType, quantize_dynamic, quantize_static
+
+        target = source.replace('.onnx', '.int8.onnx')
+        if options['calibration_dir']:
+            images = find_images(options['calibration_dir'])
+            input_name = onnx.load(source, load_external_data=False).graph.input[0].name
+            quantize_static(source, target, CalibrationReader(input_name, images, options['imgsz']),
+                            activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+        else:
+            quantize_dynamic(source, target, weight_type=QuantType.QUInt8)
+        # La cuantización no conserva los metadatos de Ultralytics (names, imgsz)
+        original = onnx.load(source, load_external_data=False)
+        quantized = onnx.load(target)
+        del quantized.metadata_props[:]
+        quantized.metadata_props.extend(original.metadata_props)
+        onnx.save(quantized, target)
+        return target
+
+    def validate(self, name, model, onnx_model, images, backend, limit):
+        checked, different = 0, []
+        for path in images:
+            image = read_image(path)
+            if image is None:
+                continue
+            expected = model.predict(image, verbose=False)[0].probs.top1
+            got = onnx_model.predict(image)[0].probs.top1
+            checked += 1
+            if expected != got:
+                different.append(os.path.basename(path))
+        rate = len(different) / checked if checked else 0
+        ok = rate <= limit
+        style = self.style.SUCCESS if ok else self.style.ERROR
+        self.stdout.write(style(
+            f"{name} ({backend}): top-1 igual en {checked - len(different)}/{checked} imágenes"
+            + (f"; distintas: {', '.join(different[:10])}" if different else "")
+        ))
+        return ok
@@ -0,0 +1,37 @@
+import json
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.inference import MODEL_WEIGHTS, load_predictor, warm_up
+from api.model_server import ModelServer, RemotePredictor
+
+
+class Command(BaseCommand):
+    help = "Arranca el servidor de modelos compartido por los workers web (socket Unix)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--socket', default=None, help='Ruta del socket (por defecto MODEL_SERVER_SOCKET)')
+        parser.add_argument('--max-pending', type=int, default=None)
+        parser.add_argument('--check', action='store_true', help='Muestra el estado de un servidor en marcha y sale')
+
+    def handle(self, *args, **options):
+        address = options['socket'] or settings.MODEL_SERVER_SOCKET
+        if not address:
+            raise CommandError("Indica --socket o MODEL_SERVER_SOCKET")
+
+        if options['check']:
+            health = RemotePredictor('plant', address, timeout=5).health()
+            self.stdout.write(json.dumps(health, indent=2))
+            if health.get('status') != 'ok':
+                sys.exit(1)
+            return
+
+        predictors = {name: load_predictor(name) for name in MODEL_WEIGHTS}
+        warm_up(*predictors.values())
+        server = ModelServer(address, predictors, max_pending=options['max_pending'])
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.close()
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api import mock_catalog, pest_details
+from api.models import PestDetail
+from api.pest_details import PestDetailError
+
+
+class Command(BaseCommand):
+    help = ("Descarga y parsea las páginas de detalle de perenual_diseases_list.json y las guarda en la "
+            "base de datos, para que /api/perenual/pests/<id>/ no tenga que hacerlo en la petición")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ids', type=int, nargs='+', help='Solo estas plagas')
+        parser.add_argument('--refresh', action='store_true',
+                            help='Revalida también las ya guardadas (petición condicional: 304 si no cambian)')
+        parser.add_argument('--force', action='store_true',
+                            help='Vuelve a descargar y parsear las ya guardadas aunque no hayan cambiado')
+        parser.add_argument('--delay', type=float, default=1.0, help='Segundos entre descargas')
+
+    def handle(self, *args, **options):
+        cards = [card for card in mock_catalog.disease_cards.all() if card.get('id') is not None and card.get('href')]
+        if options['ids']:
+            wanted = set(options['ids'])
+            cards = [card for card in cards if card['id'] in wanted]
+        stored = dict(PestDetail.objects.values_list('id', 'href'))
+        refresh = options['refresh'] or options['force']
+        pending = [card for card in cards if refresh or stored.get(card['id']) != card['href']]
+        self.stdout.write(f"{len(pending)} de {len(cards)} plagas por descargar")
+
+        fetched = errors = 0
+        for position, card in enumerate(pending):
+            if position and options['delay']:
+                time.sleep(options['delay'])
+            # Sin copia (o con otro href) la petición no puede ser condicional
+            conditional = not options['force'] and stored.get(card['id']) == card['href']
+            try:
+                pest_details.refresh(card['id'], card['href'], conditional=conditional)
+                fetched += 1
+            except PestDetailError as e:
+                errors += 1
+                self.stderr.write(f"  {card['id']} ({card.get('name')}): {e}")
+
+        stats = pest_details.stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Listo: {fetched} actualizadas ({stats['not_modified']} sin cambios), {errors} errores"))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+
+from api.models import Comment, Post, vote_count_subquery
+
+
+class Command(BaseCommand):
+    help = "Recalcula likes_count/dislikes_count de posts y comentarios a partir de los votos"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Solo muestra cuántas filas tienen contadores incorrectos')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        for model, target in ((Post, 'post'), (Comment, 'comment')):
+            likes = vote_count_subquery(target, 'like')
+            dislikes = vote_count_subquery(target, 'dislike')
+            drifted = list(
+                model.objects.annotate(real_likes=likes, real_dislikes=dislikes)
+                .filter(~Q(likes_count=F('real_likes')) | ~Q(dislikes_count=F('real_dislikes')))
+                .values_list('pk', flat=True)
+            )
+            name = model._meta.verbose_name_plural
+            if options['dry_run']:
+                self.stdout.write(f"{name}: {len(drifted)} con contadores incorrectos")
+                continue
+
+            batch_size = options['batch_size']
+            for start in range(0, len(drifted), batch_size):
+                model.objects.filter(pk__in=drifted[start:start + batch_size]).update(
+                    likes_count=likes, dislikes_count=dislikes
+                )
+            self.stdout.write(self.style.SUCCESS(f"{name}: {len(drifted)} corregidos"))
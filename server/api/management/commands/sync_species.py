@@ -0,0 +1,201 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from api import perenual, species_mirror
+from api.models import Species, SyncCheckpoint
+from api.perenual import PerenualError
+
+CHECKPOINT = 'species_list'
+# Llamadas a la API por especie: species/details + species-care-guide-list
+DETAIL_COST = 2
+
+
+class BudgetExhausted(Exception):
+    pass
+
+
+class RateLimiter:
+    """Reparte las llamadas entre los hilos: como mucho `per_minute` por minuto
+    (0 = sin límite) y `budget` en total (None = sin límite)."""
+
+    def __init__(self, per_minute, budget=None, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self.budget = budget
+        self.used = 0
+        self.clock = clock
+        self.sleep = sleep
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, cost=1):
+        """Espera su turno para `cost` llamadas; False si ya no quedan en el presupuesto."""
+        with self._lock:
+            if self.budget is not None and self.used + cost > self.budget:
+                return False
+            self.used += cost
+            now = self.clock()
+            start = max(now, self._next)
+            self._next = start + self.interval * cost
+        if start > now:
+            self.sleep(start - now)
+        return True
+
+
+class Command(BaseCommand):
+    help = ("Copia species-list y species/details de Perenual (con la guía de cuidados) a la base de datos "
+            "para servirlos con SPECIES_MIRROR=True. Se puede interrumpir y reanudar: las páginas hechas "
+            "se guardan en un checkpoint y las especies sin detalles quedan pendientes")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ids', type=int, nargs='+',
+                            help='Solo vuelve a pedir los detalles de estas especies (refresco incremental)')
+        parser.add_argument('--stale-days', type=float,
+                            help='Vuelve a pedir también los detalles sincronizados hace más de N días')
+        parser.add_argument('--skip-list', action='store_true', help='No recorre species-list')
+        parser.add_argument('--skip-details', action='store_true', help='No pide species/details')
+        parser.add_argument('--pages', type=int, help='Máximo de páginas de species-list en esta ejecución')
+        parser.add_argument('--limit', type=int, help='Máximo de especies de las que pedir detalles')
+        parser.add_argument('--restart', action='store_true',
+                            help='Ignora el checkpoint y vuelve a recorrer species-list desde la página 1')
+        parser.add_argument('--concurrency', type=int, default=4, help='Llamadas simultáneas a la API')
+        parser.add_argument('--rate', type=float, default=60,
+                            help='Llamadas por minuto como máximo (0 = sin límite)')
+        parser.add_argument('--max-requests', type=int,
+                            help='Llamadas a la API en esta ejecución (cuota diaria de Perenual)')
+
+    def handle(self, *args, **options):
+        try:
+            perenual.get_api_key()
+        except PerenualError as e:
+            raise CommandError(str(e))
+        self.concurrency = max(1, options['concurrency'])
+        self.limiter = RateLimiter(options['rate'], options['max_requests'])
+        self.stopped = None
+        self.errors = 0
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='sync-species') as pool:
+            self.pool = pool
+            if options['ids']:
+                self.sync_details(options['ids'])
+            else:
+                if not options['skip_list']:
+                    self.sync_list(options)
+                if not options['skip_details'] and not self.stopped:
+                    self.sync_details(self.pending_ids(options))
+
+        self.stdout.write(f"llamadas a la API: {self.limiter.used}, errores: {self.errors}")
+        if self.stopped:
+            self.stdout.write(self.style.WARNING(
+                f"Interrumpido ({self.stopped}); vuelve a ejecutar el comando para continuar"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Sincronización completada"))
+
+    # species-list
+
+    def sync_list(self, options):
+        checkpoint, _ = SyncCheckpoint.objects.get_or_create(name=CHECKPOINT)
+        state = {} if options['restart'] else dict(checkpoint.data)
+        if state.get('completed_at'):
+            self.stdout.write(f"species-list ya está completa ({state['completed_at']}); usa --restart para repetirla")
+            return
+        done = set(state.get('done_pages', []))
+        budget = options['pages']
+
+        def save():
+            state['done_pages'] = sorted(done)
+            if state.get('last_page') and len(done) >= state['last_page']:
+                state['completed_at'] = timezone.now().isoformat()
+            checkpoint.data = state
+            checkpoint.save(update_fields=['data', 'updated_at'])
+
+        def store(page, data):
+            stored = species_mirror.store_list_page(data.get('data') or [])
+            state['last_page'] = data.get('last_page') or state.get('last_page') or page
+            done.add(page)
+            save()
+            self.stdout.write(f"  página {page}/{state['last_page']}: {stored} especies")
+
+        if not state.get('last_page'):
+            # La primera página dice cuántas hay
+            self.run([1], perenual.fetch_species_list_page, store)
+            budget = budget - 1 if budget else budget
+            if self.stopped or not state.get('last_page'):
+                return
+        pages = [page for page in range(1, state['last_page'] + 1) if page not in done]
+        if budget is not None:
+            pages = pages[:max(budget, 0)]
+        self.run(pages, perenual.fetch_species_list_page, store)
+        save()
+        self.stdout.write(f"species-list: {len(done)}/{state['last_page']} páginas")
+
+    # species/details
+
+    def pending_ids(self, options):
+        pending = Q(details_synced_at__isnull=True)
+        if options['stale_days'] is not None:
+            pending |= Q(details_synced_at__lt=timezone.now() - timedelta(days=options['stale_days']))
+        ids = Species.objects.filter(pending).order_by('id').values_list('id', flat=True)
+        return list(ids[:options['limit']] if options['limit'] else ids)
+
+    def sync_details(self, ids):
+        self.stdout.write(f"species/details: {len(ids)} especies pendientes")
+        stored = []
+
+        def store(plant_id, data):
+            if data is None:
+                self.stderr.write(f"  {plant_id}: Perenual no la encuentra (404)")
+                return
+            species_mirror.store_details(plant_id, data)
+            stored.append(plant_id)
+            if len(stored) % 50 == 0:
+                self.stdout.write(f"  {len(stored)}/{len(ids)} especies")
+
+        self.run(ids, perenual.fetch_species_details, store, cost=DETAIL_COST)
+        self.stdout.write(f"species/details: {len(stored)} especies guardadas")
+
+    # Ejecución concurrente
+
+    def call(self, fetch, key, cost):
+        if not self.limiter.acquire(cost):
+            return key, None, BudgetExhausted()
+        try:
+            return key, fetch(key), None
+        except PerenualError as e:
+            return key, None, e
+
+    def run(self, keys, fetch, store, cost=1):
+        """Pide `fetch(key)` en el pool con como mucho `concurrency` llamadas en vuelo y guarda
+        cada resultado desde este hilo (la base de datos solo se usa aquí). Se detiene si se
+        acaba el presupuesto o Perenual responde 429 tras los reintentos de http_client."""
+        keys = iter(keys)
+        in_flight = set()
+
+        def submit_next():
+            for key in keys:
+                in_flight.add(self.pool.submit(self.call, fetch, key, cost))
+                return
+
+        for _ in range(self.concurrency):
+            submit_next()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                in_flight.discard(future)
+                key, result, error = future.result()
+                if isinstance(error, BudgetExhausted):
+                    self.stopped = self.stopped or 'presupuesto de --max-requests agotado'
+                elif error is not None and error.status_code == 429:
+                    self.stopped = self.stopped or 'Perenual ha limitado las peticiones (429)'
+                elif error is not None:
+                    self.errors += 1
+                    self.stderr.write(f"  {key}: {error}")
+                else:
+                    store(key, result)
+                if not self.stopped:
+                    submit_next()
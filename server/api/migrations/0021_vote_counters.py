@@ -0,0 +1,53 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_votes(apps, schema_editor):
+    """Rellena los contadores nuevos a partir de los votos existentes."""
+    Vote = apps.get_model('api', 'Vote')
+    for model_name, target in (('Post', 'post'), ('Comment', 'comment')):
+        model = apps.get_model('api', model_name)
+
+        def total(vote_type):
+            votes = (
+                Vote.objects.filter(**{target: OuterRef('pk')}, vote_type=vote_type)
+                .order_by()
+                .values(target)
+                .annotate(total=Count('pk'))
+                .values('total')
+            )
+            return Coalesce(Subquery(votes), 0)
+
+        model.objects.update(likes_count=total('like'), dislikes_count=total('dislike'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_alter_userplant_garden'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='post',
+            old_name='like_count',
+            new_name='likes_count',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='dislikes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='dislikes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_votes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 07:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_vote_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'is_deleted', 'created_at', 'id'], name='comment_post_del_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['plant_id', 'created_at', 'id'], name='post_plant_created_idx'),
+        ),
+    ]
@@ -0,0 +1,118 @@
+# Generated by Django 4.2.30 on 2026-10-18 07:40
+
+import json
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+# Copia del cálculo de api/care_tasks.py en el momento de esta migración: las
+# migraciones no deben importar código de la app, que puede cambiar después.
+UNIT_DAYS = {'day': 1, 'week': 7, 'month': 30}
+PERIOD_UNIT_DAYS = {'days': 1, 'weeks': 7, 'months': 30}
+
+
+def _created_date(plant):
+    return (plant.created_at or timezone.now()).date()
+
+
+def _period_days(period):
+    if isinstance(period, str):
+        period = json.loads(period)
+    value = period["value"]
+    if isinstance(value, str) and '-' in value:
+        min_val, max_val = map(int, value.split('-'))
+        value = (min_val + max_val) / 2
+    else:
+        value = int(value)
+    return value * PERIOD_UNIT_DAYS.get(period["unit"], 1)
+
+
+def _next_watering_date(plant):
+    if not plant.isWateringReminder:
+        return None
+    last = plant.last_watered_date
+    if last and plant.watering_period and plant.watering_type == 'recommended':
+        try:
+            return last + timedelta(days=_period_days(plant.watering_period))
+        except Exception:
+            return None
+    if last and plant.watering_time and plant.watering_type == 'manual':
+        return last + timedelta(days=plant.watering_time * UNIT_DAYS.get(plant.watering_unit, 1))
+    return _created_date(plant)
+
+
+def _next_interval_date(plant, last, amount, unit):
+    if not (amount and unit):
+        return None
+    if last:
+        return last + timedelta(days=amount * UNIT_DAYS.get(unit, 1))
+    return _created_date(plant)
+
+
+def fill_due_dates(apps, schema_editor):
+    """Calcula las próximas fechas de las plantas existentes."""
+    UserPlant = apps.get_model('api', 'UserPlant')
+    fields = ['next_watering_date', 'next_pruning_date', 'next_spraying_date', 'next_rotating_date']
+    batch = []
+    for plant in UserPlant.objects.order_by('pk').iterator(chunk_size=1000):
+        plant.next_watering_date = _next_watering_date(plant)
+        plant.next_pruning_date = _next_interval_date(
+            plant, plant.last_pruning_date, plant.pruning_time, plant.pruning_time_unit)
+        plant.next_spraying_date = _next_interval_date(
+            plant, plant.last_spraying_date, plant.sprayed_time, plant.sprayed_unit)
+        plant.next_rotating_date = _next_interval_date(
+            plant, plant.last_rotating_date, plant.rotation_time, plant.rotation_unit)
+        batch.append(plant)
+        if len(batch) >= 1000:
+            UserPlant.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        UserPlant.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_post_comment_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userplant',
+            name='next_pruning_date',
+            field=models.DateField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='userplant',
+            name='next_rotating_date',
+            field=models.DateField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='userplant',
+            name='next_spraying_date',
+            field=models.DateField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='userplant',
+            name='next_watering_date',
+            field=models.DateField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='userplant',
+            index=models.Index(fields=['owner', 'next_watering_date'], name='userplant_owner_watering_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userplant',
+            index=models.Index(fields=['owner', 'next_pruning_date'], name='userplant_owner_pruning_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userplant',
+            index=models.Index(fields=['owner', 'next_spraying_date'], name='userplant_owner_spraying_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userplant',
+            index=models.Index(fields=['owner', 'next_rotating_date'], name='userplant_owner_rotating_idx'),
+        ),
+        migrations.RunPython(fill_due_dates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_userplant_next_due_dates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Species',
+            fields=[
+                ('id', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('common_name', models.CharField(blank=True, default='', max_length=255)),
+                ('scientific_name', models.JSONField(blank=True, default=list)),
+                ('other_name', models.JSONField(blank=True, default=list)),
+                ('family', models.CharField(blank=True, max_length=255, null=True)),
+                ('genus', models.CharField(blank=True, max_length=255, null=True)),
+                ('default_image', models.JSONField(blank=True, null=True)),
+                ('indoor', models.BooleanField(blank=True, null=True)),
+                ('watering', models.CharField(blank=True, max_length=50, null=True)),
+                ('sunlight', models.JSONField(blank=True, default=list)),
+                ('hardiness_min', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('hardiness_max', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('details', models.JSONField(blank=True, null=True)),
+                ('list_synced_at', models.DateTimeField(blank=True, null=True)),
+                ('details_synced_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SyncCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SpeciesCareSection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section_type', models.CharField(max_length=20)),
+                ('description', models.TextField(blank=True, default='')),
+                ('species', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='care_sections', to='api.species')),
+            ],
+            options={
+                'unique_together': {('species', 'section_type')},
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_species_mirror'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PestDetail',
+            fields=[
+                ('id', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('href', models.URLField(max_length=500)),
+                ('data', models.JSONField(default=dict)),
+                ('etag', models.CharField(blank=True, default='', max_length=255)),
+                ('last_modified', models.CharField(blank=True, default='', max_length=64)),
+                ('fetched_at', models.DateTimeField()),
+                ('checked_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,123 @@
+"""Catálogo en memoria de los JSON mock de Perenual (USE_MOCK_DATA=True) y de las
+tarjetas de plagas de perenual_diseases_list.json.
+
+Cada fichero se lee una sola vez por proceso y se vuelve a leer solo si cambia
+(mtime o tamaño). Al cargarlo se construyen:
+- `by_id`: id -> registro, para los detalles sin recorrer la lista;
+- un índice de búsqueda con los campos de texto ya en minúsculas, para no
+  llamar a .lower() sobre cada registro en cada búsqueda.
+
+Los registros se comparten entre peticiones: quien los modifique debe copiarlos
+antes (get_mock_species_details devuelve una copia).
+"""
+import json
+import os
+import threading
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _species_search_fields(plant):
+    scientific = plant.get('scientific_name') or []
+    if isinstance(scientific, str):
+        scientific = [scientific]
+    return (plant.get('common_name') or '').lower(), tuple(str(name).lower() for name in scientific)
+
+
+def _disease_search_fields(item):
+    return str(item.get('name') or '').lower(), (str(item.get('description') or '').lower(),)
+
+
+def _card_search_fields(card):
+    return str(card.get('name') or '').lower(), ()
+
+
+class MockCatalog:
+    """Un fichero JSON mock: datos tal cual, índice por id e índice de búsqueda."""
+
+    def __init__(self, filename, empty, search_fields, data_dir=DATA_DIR):
+        self.filename = filename
+        self.path = os.path.join(data_dir, filename)
+        self.empty = empty
+        self.search_fields = search_fields
+        self._lock = threading.Lock()
+        self._signature = None
+        self._data = empty
+        self.records = []
+        self.by_id = {}
+        self.search_index = []
+        # Aumenta en cada carga, para quien construye índices sobre estos datos
+        self.version = 0
+
+    def _current_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return 'missing'
+        return stat.st_mtime_ns, stat.st_size
+
+    def _refresh(self):
+        signature = self._current_signature()
+        if signature == self._signature:
+            return
+        with self._lock:
+            if signature == self._signature:
+                return
+            self._load(signature)
+
+    def _load(self, signature):
+        if signature == 'missing':
+            print(f"Warning: {self.filename} not found")
+            data = self.empty
+        else:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Error reading {self.filename}: {e}")
+                data = self.empty
+        records = data if isinstance(data, list) else data.get('data', [])
+        by_id = {}
+        for record in records:
+            # Con ids repetidos se queda el primero, como el recorrido lineal
+            by_id.setdefault(record.get('id'), record)
+        self.search_index = [(record, *self.search_fields(record)) for record in records]
+        self.records, self.by_id, self._data = records, by_id, data
+        self.version += 1
+        self._signature = signature
+
+    def data(self):
+        """El JSON completo (compartido: no modificar)."""
+        self._refresh()
+        return self._data
+
+    def all(self):
+        self._refresh()
+        return self.records
+
+    def get(self, record_id):
+        """Registro con ese id (compartido: no modificar), o None."""
+        self._refresh()
+        return self.by_id.get(record_id)
+
+    def search(self, query):
+        """Registros cuyo primer campo o alguno de los secundarios contienen `query`, en su orden."""
+        self._refresh()
+        if not query:
+            return self.records
+        query = query.lower()
+        return [record for record, name, others in self.search_index
+                if query in name or any(query in other for other in others)]
+
+    def clear(self):
+        """Olvida los datos cargados; se vuelven a leer en el siguiente acceso."""
+        with self._lock:
+            self._signature = None
+            self.version += 1
+            self._data, self.records, self.by_id, self.search_index = self.empty, [], {}, []
+
+
+species_details = MockCatalog('species-details-mock.json', [], _species_search_fields)
+species_list = MockCatalog('species-list-mock.json', {'data': []}, _species_search_fields)
+disease_list = MockCatalog('disease-list-mock.json', {'data': []}, _disease_search_fields)
+disease_cards = MockCatalog('perenual_diseases_list.json', [], _card_search_fields)
@@ -0,0 +1,279 @@
+"""Servidor de modelos local compartido por los workers web.
+
+`manage.py model_server` carga los clasificadores de planta y enfermedad una sola
+vez y atiende predicciones por un socket Unix (multiprocessing.connection). Los
+workers de gunicorn usan RemotePredictor en lugar de cargar su propia copia de
+torch y de los modelos (MODEL_SERVER_SOCKET). Las predicciones de todos los
+workers pasan por el BatchingPredictor del servidor, así que se agrupan entre sí.
+
+Protocolo (objetos pickle sobre la conexión autenticada):
+    ('predict', nombre_modelo, imagen_o_url) -> ('ok', [resultado]) | ('busy', max_pending)
+                                                | ('error', tipo, mensaje)
+    ('health',)                              -> ('ok', {...})
+"""
+import builtins
+import hashlib
+import os
+import threading
+import time
+from multiprocessing.connection import AuthenticationError, Client, Listener
+
+from django.conf import settings
+
+
+class ModelServerUnavailable(Exception):
+    pass
+
+
+class ModelServerBusy(Exception):
+    """El servidor tiene MODEL_SERVER_MAX_PENDING predicciones en curso."""
+
+
+def _authkey():
+    return hashlib.sha256(f"model-server:{settings.SECRET_KEY}".encode()).digest()
+
+
+class RemoteProbs:
+    def __init__(self, top1, top1conf, top5, top5conf):
+        self.top1 = top1
+        self.top1conf = top1conf
+        self.top5 = top5
+        self.top5conf = top5conf
+
+
+class RemoteResult:
+    """Lo que usan las vistas de un Results de Ultralytics: `names` y `probs`."""
+
+    def __init__(self, names, probs):
+        self.names = names
+        self.probs = probs
+
+
+def compact_result(result):
+    probs = result.probs
+    return {
+        'names': result.names,
+        'top1': int(probs.top1),
+        'top1conf': float(probs.top1conf),
+        'top5': [int(i) for i in probs.top5],
+        'top5conf': [float(c) for c in probs.top5conf],
+    }
+
+
+def expand_result(data):
+    import numpy as np
+    # np.float32 para que `top1conf.item()` funcione como con el tensor de torch
+    probs = RemoteProbs(data['top1'], np.float32(data['top1conf']), data['top5'], data['top5conf'])
+    return RemoteResult(data['names'], probs)
+
+
+class ModelServer:
+    def __init__(self, address, predictors, max_pending=None):
+        self.address = address
+        self.predictors = predictors
+        self.max_pending = max_pending if max_pending is not None else getattr(settings, 'MODEL_SERVER_MAX_PENDING', 32)
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {'served': 0, 'rejected': 0, 'errors': 0, 'connections': 0}
+        self._listener = None
+
+    def health(self):
+        with self._lock:
+            stats = dict(self._stats, pending=self._pending)
+        return {
+            'status': 'ok',
+            'pid': os.getpid(),
+            'uptime': round(time.time() - self.started, 1),
+            'max_pending': self.max_pending,
+            'models': {name: p.stats() if hasattr(p, 'stats') else {} for name, p in self.predictors.items()},
+            **stats,
+        }
+
+    def listen(self):
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        self._listener = Listener(self.address, family='AF_UNIX', authkey=_authkey())
+        os.chmod(self.address, 0o660)
+        return self._listener
+
+    def serve_forever(self):
+        listener = self._listener or self.listen()
+        print(f"Servidor de modelos escuchando en {self.address} (modelos: {', '.join(self.predictors)})")
+        while True:
+            try:
+                conn = listener.accept()
+            except AuthenticationError as e:
+                print(f"Conexión rechazada al servidor de modelos: {e}")
+                continue
+            except OSError:
+                # Listener cerrado (close())
+                return
+            with self._lock:
+                self._stats['connections'] += 1
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def close(self):
+        if self._listener is not None:
+            self._listener.close()
+
+    def _handle(self, conn):
+        with conn:
+            while True:
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    conn.send(self._dispatch(message))
+                except (EOFError, OSError):
+                    return
+
+    def _dispatch(self, message):
+        if message[0] == 'health':
+            return ('ok', self.health())
+        if message[0] != 'predict':
+            return ('error', 'ValueError', f"Unknown operation: {message[0]}")
+        _, name, source = message
+        if name not in self.predictors:
+            return ('error', 'ValueError', f"Unknown model: {name}")
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._stats['rejected'] += 1
+                return ('busy', self.max_pending)
+            self._pending += 1
+        try:
+            results = self.predictors[name].predict(source)
+            reply = ('ok', [compact_result(r) for r in results])
+            with self._lock:
+                self._stats['served'] += 1
+            return reply
+        except Exception as e:
+            with self._lock:
+                self._stats['errors'] += 1
+            return ('error', type(e).__name__, str(e))
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+
+class RemotePredictor:
+    """Cliente de ModelServer con la misma interfaz `predict` que YOLO.
+
+    Cada hilo mantiene su propia conexión. Si el servidor no responde se lanza
+    ModelServerUnavailable, o con `fallback` se usa el predictor local que crea
+    (cargado solo cuando hace falta y liberado en cuanto el servidor vuelve a
+    responder), y no se vuelve a intentar hasta pasados MODEL_SERVER_RETRY_INTERVAL
+    segundos. Si el servidor está saturado se lanza ModelServerBusy.
+    """
+
+    def __init__(self, name, address, fallback=None, timeout=None, retry_interval=None):
+        self.name = name
+        self.address = address
+        self.fallback = fallback
+        self.timeout = timeout or getattr(settings, 'MODEL_SERVER_TIMEOUT', 30)
+        self.retry_interval = retry_interval if retry_interval is not None else getattr(settings, 'MODEL_SERVER_RETRY_INTERVAL', 5)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._fallback_predictor = None
+        self._down_until = 0
+        self._stats = {'remote': 0, 'fallback': 0, 'busy': 0, 'unavailable': 0, 'fallback_released': 0}
+
+    def predict(self, source, **kwargs):
+        if time.monotonic() >= self._down_until:
+            try:
+                results = self._remote_predict(source)
+                self._count('remote')
+                self._release_fallback()
+                return results
+            except ModelServerUnavailable as e:
+                self._count('unavailable')
+                self._down_until = time.monotonic() + self.retry_interval
+                if self.fallback is None:
+                    raise
+                print(f"Servidor de modelos no disponible ({e}); inferencia en el proceso")
+        elif self.fallback is None:
+            raise ModelServerUnavailable(f"Model server at {self.address} is down")
+        self._count('fallback')
+        return self._local_predictor().predict(source, **kwargs)
+
+    def health(self):
+        try:
+            return self._request(('health',))[1]
+        except ModelServerUnavailable as e:
+            return {'status': 'down', 'error': str(e)}
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, fallback_loaded=self._fallback_predictor is not None)
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _local_predictor(self):
+        with self._lock:
+            if self._fallback_predictor is None:
+                self._fallback_predictor = self.fallback()
+            return self._fallback_predictor
+
+    def _release_fallback(self):
+        # El servidor vuelve a responder: no mantener torch y el modelo en este worker
+        if self._fallback_predictor is None:
+            return
+        with self._lock:
+            predictor, self._fallback_predictor = self._fallback_predictor, None
+            if predictor is None:
+                return
+            self._stats['fallback_released'] += 1
+        if hasattr(predictor, 'close'):
+            predictor.close()
+        print("Servidor de modelos disponible de nuevo; modelo local liberado")
+
+    def _remote_predict(self, source):
+        reply = self._request(('predict', self.name, source))
+        if reply[0] == 'ok':
+            return [expand_result(r) for r in reply[1]]
+        if reply[0] == 'busy':
+            self._count('busy')
+            raise ModelServerBusy(f"Model server has {reply[1]} predictions in progress")
+        error_class = getattr(builtins, reply[1], None)
+        if not (isinstance(error_class, type) and issubclass(error_class, Exception)):
+            error_class = RuntimeError
+        raise error_class(reply[2])
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            try:
+                conn = Client(self.address, family='AF_UNIX', authkey=_authkey())
+            except (OSError, EOFError, AuthenticationError) as e:
+                raise ModelServerUnavailable(str(e)) from e
+            self._local.conn = conn
+        return conn
+
+    def _drop_connection(self):
+        conn = getattr(self._local, 'conn', None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    def _request(self, message):
+        # Un reintento con conexión nueva por si el servidor se reinició
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.send(message)
+                if conn.poll(self.timeout):
+                    return conn.recv()
+            except (OSError, EOFError) as e:
+                self._drop_connection()
+                if attempt:
+                    raise ModelServerUnavailable(str(e)) from e
+                continue
+            # Sin respuesta a tiempo: la conexión queda desincronizada
+            self._drop_connection()
+            raise ModelServerUnavailable(f"No answer in {self.timeout}s")
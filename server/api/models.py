@@ -1,8 +1,11 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce, Greatest
 from django.contrib.auth.models import User 
 from django.db.models.signals import post_delete, pre_save
 from django.dispatch import receiver
 from django.core.files.storage import default_storage
+from . import care_tasks
 
 class Garden(models.Model):
     name = models.CharField(max_length=255)
@@ -161,9 +164,80 @@ class UserPlant(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Próximas fechas de las tareas de cuidado (api/care_tasks.py). Se recalculan en
+    # save(); lo que no pase por save() (update(), bulk_create) debe seguirse de
+    # `manage.py backfill_due_dates`
+    next_watering_date = models.DateField(blank=True, null=True, editable=False, db_index=True)
+    next_pruning_date = models.DateField(blank=True, null=True, editable=False, db_index=True)
+    next_spraying_date = models.DateField(blank=True, null=True, editable=False, db_index=True)
+    next_rotating_date = models.DateField(blank=True, null=True, editable=False, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Tareas de un usuario por fecha
+            models.Index(fields=['owner', 'next_watering_date'], name='userplant_owner_watering_idx'),
+            models.Index(fields=['owner', 'next_pruning_date'], name='userplant_owner_pruning_idx'),
+            models.Index(fields=['owner', 'next_spraying_date'], name='userplant_owner_spraying_idx'),
+            models.Index(fields=['owner', 'next_rotating_date'], name='userplant_owner_rotating_idx'),
+        ]
+
     def __str__(self):
         return self.custom_name if self.custom_name else f"Plant {self.id} of {self.owner.username}"
+
+    def refresh_due_dates(self):
+        """Recalcula los campos next_*_date a partir de las últimas fechas e intervalos."""
+        for field, value in care_tasks.due_dates(care_tasks.task_row(self)).items():
+            setattr(self, field, value)
+
+    def save(self, *args, **kwargs):
+        self.refresh_due_dates()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | set(care_tasks.DUE_DATE_FIELDS.values())
+        super().save(*args, **kwargs)
     
+def vote_count_subquery(target, vote_type):
+    """Número real de votos `vote_type` del post/comentario (`target` = 'post' o 'comment').
+    Se usa para recalcular los contadores desnormalizados.
+    """
+    votes = (
+        Vote.objects.filter(**{target: models.OuterRef('pk')}, vote_type=vote_type)
+        .order_by()
+        .values(target)
+        .annotate(total=models.Count('pk'))
+        .values('total')
+    )
+    return Coalesce(models.Subquery(votes), 0)
+
+
+def user_vote_prefetch(user):
+    """Prefetch del voto de `user`; queda en `obj.user_votes` (lista de 0 o 1 votos)."""
+    return models.Prefetch('votes', queryset=Vote.objects.filter(user=user), to_attr='user_votes')
+
+
+class CommentQuerySet(models.QuerySet):
+    def with_votes(self, user=None):
+        """Precarga autor, post y el voto del usuario para CommentSerializer sin N+1."""
+        qs = self.select_related('author', 'post')
+        if user is not None and user.is_authenticated:
+            qs = qs.prefetch_related(user_vote_prefetch(user))
+        return qs
+
+
+class PostQuerySet(models.QuerySet):
+    def with_votes(self, user=None, comments=True):
+        """Precarga autor, el voto del usuario y los comentarios (con sus votos)
+        para PostSerializer sin N+1. Con comments=False no se cargan los comentarios
+        (PostSummarySerializer).
+        """
+        qs = self.select_related('author')
+        if user is not None and user.is_authenticated:
+            qs = qs.prefetch_related(user_vote_prefetch(user))
+        if comments:
+            qs = qs.prefetch_related(models.Prefetch('comments', queryset=Comment.objects.with_votes(user)))
+        return qs
+
+
 class Post(models.Model):
     title = models.CharField(max_length=255)
     content = models.TextField()
@@ -172,23 +246,32 @@ class Post(models.Model):
     plant_id = models.PositiveIntegerField(default=0)
     plant_common_name = models.CharField(max_length=255, blank=True, null=True)
     image = models.ImageField(upload_to='posts/', blank=True, null=True)
-    like_count = models.PositiveIntegerField(default=0)
+    # Contadores desnormalizados; los mantiene cast_vote (vistas de voto)
+    # y se pueden recalcular con `manage.py recount_votes`
+    likes_count = models.PositiveIntegerField(default=0)
+    dislikes_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PostQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Feed por planta paginado por (created_at, id)
+            models.Index(fields=['plant_id', 'created_at', 'id'], name='post_plant_created_idx'),
+        ]
+
     def get_vote_score(self):
         """Calcula el score total: likes - dislikes (mínimo 0)"""
-        likes = self.votes.filter(vote_type='like').count()
-        dislikes = self.votes.filter(vote_type='dislike').count()
-        return max(0, likes - dislikes)
+        return max(0, self.likes_count - self.dislikes_count)
     
     def get_likes_count(self):
         """Número total de likes"""
-        return self.votes.filter(vote_type='like').count()
+        return self.likes_count
     
     def get_dislikes_count(self):
         """Número total de dislikes"""
-        return self.votes.filter(vote_type='dislike').count()
+        return self.dislikes_count
     
     def get_user_vote(self, user):
         """Obtiene el voto del usuario para este post"""
@@ -263,20 +346,28 @@ class Comment(models.Model):
     is_deleted = models.BooleanField(default=False)
     deleted_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    likes_count = models.PositiveIntegerField(default=0)
+    dislikes_count = models.PositiveIntegerField(default=0)
+
+    objects = CommentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Comentarios visibles de un post paginados por (created_at, id)
+            models.Index(fields=['post', 'is_deleted', 'created_at', 'id'], name='comment_post_del_created_idx'),
+        ]
 
     def get_vote_score(self):
         """Calcula el score total: likes - dislikes (mínimo 0)"""
-        likes = self.votes.filter(vote_type='like').count()
-        dislikes = self.votes.filter(vote_type='dislike').count()
-        return max(0, likes - dislikes)
+        return max(0, self.likes_count - self.dislikes_count)
     
     def get_likes_count(self):
         """Número total de likes"""
-        return self.votes.filter(vote_type='like').count()
+        return self.likes_count
     
     def get_dislikes_count(self):
         """Número total de dislikes"""
-        return self.votes.filter(vote_type='dislike').count()
+        return self.dislikes_count
     
     def get_user_vote(self, user):
         """Obtiene el voto del usuario para este comentario"""
@@ -325,3 +416,108 @@ class Vote(models.Model):
     def __str__(self):
         target = self.post.title if self.post else f"comment on {self.comment.post.title}"
         return f"{self.user.username} {self.vote_type}d {target}"
+
+
+# Cambio en (likes, dislikes) que aporta cada tipo de voto
+VOTE_DELTAS = {'like': (1, 0), 'dislike': (0, 1)}
+
+
+def cast_vote(target, user, vote_type):
+    """Crea, quita (mismo voto) o cambia el voto de `user` sobre un Post o Comment
+    y actualiza sus contadores en la misma transacción. Devuelve la acción.
+    """
+    field = 'post' if isinstance(target, Post) else 'comment'
+    with transaction.atomic():
+        # Bloquear el voto existente para que dos peticiones simultáneas del mismo
+        # usuario no apliquen dos veces el mismo cambio a los contadores
+        vote = Vote.objects.select_for_update().filter(user=user, **{field: target}).first()
+        if vote is None:
+            Vote.objects.create(user=user, vote_type=vote_type, **{field: target})
+            action, added, removed = 'created', vote_type, None
+        elif vote.vote_type == vote_type:
+            # Si es el mismo voto, lo eliminamos (toggle)
+            vote.delete()
+            action, added, removed = 'removed', None, vote_type
+        else:
+            # Si es diferente, lo actualizamos
+            removed = vote.vote_type
+            vote.vote_type = vote_type
+            vote.save()
+            action, added = 'updated', vote_type
+
+        likes = dislikes = 0
+        if added:
+            likes += VOTE_DELTAS[added][0]
+            dislikes += VOTE_DELTAS[added][1]
+        if removed:
+            likes -= VOTE_DELTAS[removed][0]
+            dislikes -= VOTE_DELTAS[removed][1]
+        type(target).objects.filter(pk=target.pk).update(
+            likes_count=Greatest(F('likes_count') + likes, 0),
+            dislikes_count=Greatest(F('dislikes_count') + dislikes, 0),
+        )
+    target.refresh_from_db(fields=['likes_count', 'dislikes_count'])
+    return action
+
+
+class Species(models.Model):
+    """Copia local de una especie de Perenual (ver api/species_mirror.py y manage.py sync_species)."""
+    id = models.PositiveIntegerField(primary_key=True)  # id de Perenual
+    common_name = models.CharField(max_length=255, blank=True, default='')
+    scientific_name = models.JSONField(default=list, blank=True)
+    other_name = models.JSONField(default=list, blank=True)
+    family = models.CharField(max_length=255, blank=True, null=True)
+    genus = models.CharField(max_length=255, blank=True, null=True)
+    default_image = models.JSONField(blank=True, null=True)
+    # Columnas de los detalles que usan los filtros de búsqueda
+    indoor = models.BooleanField(null=True, blank=True)
+    watering = models.CharField(max_length=50, blank=True, null=True)
+    sunlight = models.JSONField(default=list, blank=True)
+    hardiness_min = models.PositiveSmallIntegerField(blank=True, null=True)
+    hardiness_max = models.PositiveSmallIntegerField(blank=True, null=True)
+    # Respuesta completa de species/details (sin las secciones de cuidados)
+    details = models.JSONField(blank=True, null=True)
+    list_synced_at = models.DateTimeField(blank=True, null=True)
+    details_synced_at = models.DateTimeField(blank=True, null=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.id}: {self.common_name}"
+
+
+class SpeciesCareSection(models.Model):
+    """Sección de la guía de cuidados de una especie (watering, pruning, sunlight)."""
+    species = models.ForeignKey(Species, on_delete=models.CASCADE, related_name='care_sections')
+    section_type = models.CharField(max_length=20)
+    description = models.TextField(blank=True, default='')
+
+    class Meta:
+        unique_together = [['species', 'section_type']]
+
+    def __str__(self):
+        return f"{self.species_id} {self.section_type}"
+
+
+class SyncCheckpoint(models.Model):
+    """Progreso de un trabajo de sincronización, para poder reanudarlo."""
+    name = models.CharField(max_length=50, unique=True)
+    data = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+
+class PestDetail(models.Model):
+    """Página de detalle de una plaga de Perenual ya parseada (ver api/pest_details.py)."""
+    id = models.PositiveIntegerField(primary_key=True)  # id de perenual_diseases_list.json
+    href = models.URLField(max_length=500)
+    data = models.JSONField(default=dict)
+    # Validadores de la última respuesta 200, para las peticiones condicionales
+    etag = models.CharField(max_length=255, blank=True, default='')
+    last_modified = models.CharField(max_length=64, blank=True, default='')
+    fetched_at = models.DateTimeField()
+    checked_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.id}: {(self.data or {}).get('name')}"
@@ -0,0 +1,103 @@
+"""Clasificadores exportados a ONNX servidos con onnxruntime, sin torch.
+
+`manage.py export_models` genera `best.onnx` (y `best.int8.onnx` con --int8) junto a
+cada `best.pt`; con INFERENCE_BACKEND='onnx' u 'onnx-int8' load_predictor usa
+OnnxClassifier en lugar de YOLO. El preprocesado reproduce el de Ultralytics para
+clasificación (redimensionar el lado corto a imgsz con PIL bilineal, recorte
+central, RGB en [0, 1]) para que el top-1 coincida con el del modelo .pt.
+"""
+import ast
+import os
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from . import http_client
+
+
+def onnx_path(weights, int8=False):
+    """Ruta del modelo ONNX exportado a partir de la ruta de un `best.pt`."""
+    base, _ = os.path.splitext(weights)
+    return f"{base}.int8.onnx" if int8 else f"{base}.onnx"
+
+
+def preprocess(image, imgsz):
+    """Imagen BGR (como la devuelve cv2) -> array float32 CHW listo para el modelo."""
+    pil = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+    w, h = pil.size
+    # Igual que torchvision Resize(int): el lado corto pasa a imgsz
+    if w <= h:
+        new_w, new_h = imgsz, int(imgsz * h / w)
+    else:
+        new_w, new_h = int(imgsz * w / h), imgsz
+    pil = pil.resize((new_w, new_h), Image.BILINEAR)
+    top = int(round((new_h - imgsz) / 2.0))
+    left = int(round((new_w - imgsz) / 2.0))
+    pil = pil.crop((left, top, left + imgsz, top + imgsz))
+    return (np.asarray(pil, dtype=np.float32) / 255.0).transpose(2, 0, 1)
+
+
+class OnnxProbs:
+    def __init__(self, probs):
+        self.data = probs
+        order = np.argsort(-probs)
+        self.top1 = int(order[0])
+        self.top1conf = np.float32(probs[order[0]])
+        self.top5 = [int(i) for i in order[:5]]
+        self.top5conf = [float(probs[i]) for i in order[:5]]
+
+
+class OnnxResult:
+    """Lo que usan las vistas de un Results de Ultralytics: `names` y `probs`."""
+
+    def __init__(self, names, probs):
+        self.names = names
+        self.probs = OnnxProbs(probs)
+
+
+class OnnxClassifier:
+    """Misma interfaz `predict` que YOLO para una imagen, una lista o una URL."""
+
+    def __init__(self, path, threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, sess_options=options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(metadata['names'])
+        imgsz = ast.literal_eval(metadata.get('imgsz', '224'))
+        self.imgsz = max(imgsz) if isinstance(imgsz, (list, tuple)) else int(imgsz)
+        # Exportado sin dynamic=True el modelo solo acepta batch 1
+        batch_dim = self.session.get_inputs()[0].shape[0]
+        self.dynamic_batch = not isinstance(batch_dim, int)
+
+    def predict(self, source, **kwargs):
+        images = source if isinstance(source, list) else [source]
+        images = [self._load(image) for image in images]
+        batch = np.stack([preprocess(image, self.imgsz) for image in images])
+        if self.dynamic_batch:
+            probs = self.session.run(None, {self.input_name: batch})[0]
+        else:
+            probs = np.concatenate([self.session.run(None, {self.input_name: item[None]})[0] for item in batch])
+        return [OnnxResult(self.names, p) for p in probs]
+
+    def _load(self, source):
+        if isinstance(source, np.ndarray):
+            return source
+        if isinstance(source, str) and source.startswith(('http://', 'https://')):
+            response = http_client.get(source)
+            if response.status_code != 200:
+                raise ValueError(f"Could not download image: status {response.status_code}")
+            data = np.frombuffer(response.content, dtype=np.uint8)
+        elif isinstance(source, str):
+            data = np.fromfile(source, dtype=np.uint8)
+        else:
+            raise TypeError(f"Unsupported image source: {type(source).__name__}")
+        image = cv2.imdecode(data, cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("Unsupported or corrupt image file.")
+        return image
@@ -0,0 +1,64 @@
+"""Paginación por cursor (keyset) sobre (created_at, id).
+
+En lugar de OFFSET, cada página se pide a partir del último elemento de la anterior
+(`created_at < X OR (created_at = X AND id < Y)`), de modo que el coste no crece con
+el número de página y no se repiten ni se saltan elementos si se publican posts
+nuevos mientras se recorre el listado. El cursor es opaco para el cliente.
+"""
+import base64
+import binascii
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(obj):
+    raw = f"{obj.created_at.isoformat()}|{obj.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, pk = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+def page_size(value, default=None):
+    """Tamaño de página pedido por el cliente, acotado a POSTS_MAX_PAGE_SIZE."""
+    default = default or getattr(settings, 'POSTS_PAGE_SIZE', 20)
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, getattr(settings, 'POSTS_MAX_PAGE_SIZE', 100)))
+
+
+def keyset_page(queryset, cursor=None, limit=None, descending=True):
+    """Devuelve (elementos, next_cursor) de la página que empieza después de `cursor`.
+
+    `descending=True` ordena de más reciente a más antiguo (posts); False, al revés
+    (comentarios). next_cursor es None en la última página.
+    """
+    limit = limit or page_size(None)
+    if descending:
+        queryset = queryset.order_by('-created_at', '-id')
+    else:
+        queryset = queryset.order_by('created_at', 'id')
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        if descending:
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+        else:
+            queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+    # Un elemento de más para saber si hay página siguiente sin hacer un COUNT
+    items = list(queryset[:limit + 1])
+    next_cursor = encode_cursor(items[limit - 1]) if len(items) > limit else None
+    return items[:limit], next_cursor
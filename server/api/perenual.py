@@ -0,0 +1,442 @@
+"""Acceso a la API de Perenual para los detalles de especies.
+
+Todas las vistas que necesitan `species/details/{id}` (y su guía de cuidados) leen
+a través de este módulo. Hay dos niveles de caché:
+
+1. Una LRU con TTL en memoria del proceso (sin serialización, la más rápida).
+2. La caché de Django `PERENUAL_CACHE_ALIAS`, compartida entre workers cuando el
+   backend es de fichero o de base de datos.
+
+Los 404 de Perenual también se cachean (caché negativa) con su propio TTL, y los
+fallos concurrentes para la misma especie se agrupan en una sola llamada a la API
+(ver `singleflight`).
+
+Las funciones `a*` son las equivalentes asíncronas para las vistas ASGI: comparten
+las mismas cachés y contadores, pero llaman a la API con `http_client.aget`.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+from . import http_client
+from .caching import TTLCache
+from .singleflight import AsyncSingleFlight, SingleFlight, MISS
+
+PERENUAL_API_URL = getattr(settings, 'PERENUAL_API_URL', "https://perenual.com/api/v2")
+PERENUAL_PEST_API_URL = "https://perenual.com/api"
+
+# Tipo de sección de la guía de cuidados -> campo que se añade a los detalles
+CARE_SECTION_FIELDS = {
+    'watering': 'watering_long',
+    'pruning': 'pruning',
+    'sunlight': 'sunlight_long',
+}
+
+# Marcador que se guarda en caché cuando Perenual responde 404
+NOT_FOUND = '__perenual_not_found__'
+
+_MISS = MISS
+
+
+class PerenualError(Exception):
+    """Error al consultar Perenual. `data` es el cuerpo a devolver al cliente."""
+
+    def __init__(self, message, status_code=500, **extra):
+        super().__init__(message)
+        self.status_code = status_code
+        self.data = {"error": message, **extra}
+
+
+class PerenualConfigError(PerenualError):
+    """Falta la API key de Perenual."""
+
+    def __init__(self):
+        super().__init__(
+            "Perenual API key not configured",
+            status_code=500,
+            env="Missing PERENUAL_API_KEY",
+        )
+
+
+_local_cache = TTLCache(
+    maxsize=getattr(settings, 'PERENUAL_LRU_SIZE', 512),
+    ttl=getattr(settings, 'PERENUAL_LRU_TTL', 300),
+)
+
+_flight = SingleFlight(
+    cache=lambda: _shared_cache(),
+    lease_timeout=getattr(settings, 'PERENUAL_LEASE_TIMEOUT', 10),
+)
+
+_async_flight = AsyncSingleFlight()
+
+# Pool acotado para pedir detalles y guía de cuidados en paralelo
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'PERENUAL_FANOUT_WORKERS', 8),
+    thread_name_prefix='perenual',
+)
+
+_stats_lock = threading.Lock()
+_stats = {
+    'local_hits': 0,
+    'shared_hits': 0,
+    'negative_hits': 0,
+    'misses': 0,
+    'upstream_calls': 0,
+    'upstream_errors': 0,
+}
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def cache_stats():
+    """Contadores de aciertos/fallos y de peticiones agrupadas de este proceso."""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['local_size'] = len(_local_cache)
+    stats['singleflight'] = _flight.stats()
+    stats['async_singleflight'] = _async_flight.stats()
+    return stats
+
+
+def clear_cache():
+    """Vacía ambos niveles de caché y reinicia los contadores."""
+    _local_cache.clear()
+    try:
+        _shared_cache().clear()
+    except Exception as e:
+        print(f"Error clearing Perenual cache: {e}")
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
+    _flight.reset_stats()
+    _async_flight.reset_stats()
+
+
+def _shared_cache():
+    return caches[getattr(settings, 'PERENUAL_CACHE_ALIAS', 'perenual')]
+
+
+def _ttl_for(value):
+    if value == NOT_FOUND:
+        return getattr(settings, 'PERENUAL_CACHE_NEGATIVE_TTL', 3600)
+    return getattr(settings, 'PERENUAL_CACHE_TTL', 86400)
+
+
+def _lookup(key):
+    value = _local_cache.get(key, _MISS)
+    if value is not _MISS:
+        _count('local_hits')
+        return value
+    try:
+        value = _shared_cache().get(key, _MISS)
+    except Exception as e:
+        # Un backend caído no debe tumbar la petición: se trata como fallo
+        print(f"Error reading Perenual cache: {e}")
+        value = _MISS
+    if value is not _MISS:
+        _count('shared_hits')
+        _local_cache.set(key, value, ttl=min(_local_cache.ttl, _ttl_for(value)))
+        return value
+    _count('misses')
+    return _MISS
+
+
+def _peek_shared(key):
+    try:
+        return _shared_cache().get(key, _MISS)
+    except Exception:
+        return _MISS
+
+
+def _store(key, value):
+    ttl = _ttl_for(value)
+    _local_cache.set(key, value, ttl=min(_local_cache.ttl, ttl))
+    try:
+        _shared_cache().set(key, value, ttl)
+    except Exception as e:
+        print(f"Error writing Perenual cache: {e}")
+
+
+def get_api_key():
+    api_key = os.getenv('PERENUAL_API_KEY')
+    if not api_key:
+        raise PerenualConfigError()
+    return api_key
+
+
+def extract_care_sections(care_data):
+    """Devuelve las descripciones de riego, poda y luz de una respuesta de care guides."""
+    sections = {}
+    if not isinstance(care_data, dict) or not care_data.get('data'):
+        return sections
+    first_guide = care_data['data'][0]
+    for section in first_guide.get('section') or []:
+        field = CARE_SECTION_FIELDS.get(section.get('type'))
+        if field:
+            sections[field] = section.get('description', '')
+    return sections
+
+
+def apply_care_sections(data, care_data):
+    """Añade a `data` los campos watering_long, pruning y sunlight_long."""
+    data.update(extract_care_sections(care_data))
+    return data
+
+
+def care_guides_url(plant_id):
+    """URL de la guía de cuidados; se construye a partir del id para no esperar a los detalles."""
+    return f"{PERENUAL_PEST_API_URL}/species-care-guide-list?species_id={int(plant_id)}&key={get_api_key()}"
+
+
+def _species_details_url(plant_id):
+    return f"{PERENUAL_API_URL}/species/details/{plant_id}"
+
+
+def _species_details_result(response):
+    if response.status_code == 200:
+        return response.json()
+    if response.status_code == 404:
+        return NOT_FOUND
+    _count('upstream_errors')
+    raise PerenualError(
+        f"Failed to fetch plant details from Perenual API (status: {response.status_code})",
+        status_code=response.status_code,
+    )
+
+
+def _fetch_species_details(plant_id):
+    api_key = get_api_key()
+    _count('upstream_calls')
+    try:
+        response = http_client.get(_species_details_url(plant_id), params={'key': api_key})
+        return _species_details_result(response)
+    except (requests.RequestException, ValueError) as e:
+        _count('upstream_errors')
+        raise PerenualError("Error connecting to Perenual API", details=str(e))
+
+
+async def _afetch_species_details(plant_id):
+    api_key = get_api_key()
+    _count('upstream_calls')
+    try:
+        response = await http_client.aget(_species_details_url(plant_id), params={'key': api_key})
+        return _species_details_result(response)
+    except (httpx.HTTPError, ValueError) as e:
+        _count('upstream_errors')
+        raise PerenualError("Error connecting to Perenual API", details=str(e))
+
+
+def _fetch_care_sections(care_guides_url):
+    _count('upstream_calls')
+    try:
+        response = http_client.get(care_guides_url)
+        if response.status_code == 200:
+            return extract_care_sections(response.json())
+        print(f"Error fetching care guides: status {response.status_code}")
+    except (requests.RequestException, ValueError) as e:
+        print(f"Error fetching care guides: {str(e)}")
+    _count('upstream_errors')
+    return None
+
+
+async def _afetch_care_sections(care_guides_url):
+    _count('upstream_calls')
+    try:
+        response = await http_client.aget(care_guides_url)
+        if response.status_code == 200:
+            return extract_care_sections(response.json())
+        print(f"Error fetching care guides: status {response.status_code}")
+    except (httpx.HTTPError, ValueError) as e:
+        print(f"Error fetching care guides: {str(e)}")
+    _count('upstream_errors')
+    return None
+
+
+def _fetch_and_store(key, fetch):
+    value = fetch()
+    if value is not None:
+        _store(key, value)
+    return value
+
+
+async def _alookup(key):
+    # La LRU local se consulta directamente; la caché compartida puede hacer E/S
+    value = _local_cache.get(key, _MISS)
+    if value is not _MISS:
+        _count('local_hits')
+        return value
+    return await sync_to_async(_lookup, thread_sensitive=False)(key)
+
+
+async def _afetch_and_store(key, fetch):
+    value = await fetch()
+    if value is not None:
+        await sync_to_async(_store, thread_sensitive=False)(key, value)
+    return value
+
+
+def get_raw_species_details(plant_id):
+    """Respuesta de `species/details` tal cual (cacheada). None si la planta no existe."""
+    key = f"species:{int(plant_id)}"
+    value = _lookup(key)
+    if value is _MISS:
+        value = _flight.do(
+            key,
+            lambda: _fetch_and_store(key, lambda: _fetch_species_details(plant_id)),
+            peek=lambda: _peek_shared(key),
+        )
+    if value == NOT_FOUND:
+        _count('negative_hits')
+        return None
+    return value
+
+
+def get_care_sections(plant_id, care_guides_url):
+    """Secciones de cuidados de la especie (cacheadas). Los fallos no se cachean."""
+    key = f"care:{int(plant_id)}"
+    value = _lookup(key)
+    if value is _MISS:
+        value = _flight.do(
+            key,
+            lambda: _fetch_and_store(key, lambda: _fetch_care_sections(care_guides_url)),
+            peek=lambda: _peek_shared(key),
+        )
+    return value if value is not None else {}
+
+
+def get_species_details(plant_id):
+    """Detalles de la especie con las secciones de cuidados ya añadidas.
+
+    Devuelve None si Perenual no conoce la planta y lanza PerenualError si la API
+    falla. El diccionario devuelto es una copia: el llamante puede modificarlo.
+    """
+    details = get_raw_species_details(plant_id)
+    if details is None:
+        return None
+    data = dict(details)
+    care_guides_url = data.get('care_guides')
+    if isinstance(care_guides_url, str) and care_guides_url:
+        data.update(get_care_sections(plant_id, care_guides_url))
+    return data
+
+
+def fetch_species_details(plant_id):
+    """Detalles con las secciones de cuidados directamente de la API, sin pasar por las cachés.
+
+    Para la copia local (api/species_mirror.py). Devuelve None si la planta no existe;
+    si solo falla la guía de cuidados, los detalles sin esas secciones. Lanza
+    PerenualError si fallan los detalles.
+    """
+    details = _fetch_species_details(plant_id)
+    if details == NOT_FOUND:
+        return None
+    data = dict(details)
+    data.update(_fetch_care_sections(care_guides_url(plant_id)) or {})
+    return data
+
+
+def fetch_species_list_page(page):
+    """Una página de `species-list` directamente de la API. Lanza PerenualError si falla."""
+    api_key = get_api_key()
+    _count('upstream_calls')
+    try:
+        response = http_client.get(f"{PERENUAL_API_URL}/species-list", params={'key': api_key, 'page': page})
+        if response.status_code == 200:
+            return response.json()
+    except (requests.RequestException, ValueError) as e:
+        _count('upstream_errors')
+        raise PerenualError("Error connecting to Perenual API", details=str(e))
+    _count('upstream_errors')
+    raise PerenualError(
+        f"Failed to fetch species list from Perenual API (status: {response.status_code})",
+        status_code=response.status_code,
+    )
+
+
+async def aget_raw_species_details(plant_id):
+    """Versión asíncrona de get_raw_species_details."""
+    key = f"species:{int(plant_id)}"
+    value = await _alookup(key)
+    if value is _MISS:
+        value = await _async_flight.do(
+            key, lambda: _afetch_and_store(key, lambda: _afetch_species_details(plant_id))
+        )
+    if value == NOT_FOUND:
+        _count('negative_hits')
+        return None
+    return value
+
+
+async def aget_care_sections(plant_id, care_guides_url):
+    """Versión asíncrona de get_care_sections."""
+    key = f"care:{int(plant_id)}"
+    value = await _alookup(key)
+    if value is _MISS:
+        value = await _async_flight.do(
+            key, lambda: _afetch_and_store(key, lambda: _afetch_care_sections(care_guides_url))
+        )
+    return value if value is not None else {}
+
+
+async def aget_species_details(plant_id):
+    """Versión asíncrona de get_species_details; los detalles y los cuidados se piden a la vez."""
+    details, care = await asyncio.gather(
+        aget_raw_species_details(plant_id),
+        aget_care_sections(plant_id, care_guides_url(plant_id)),
+    )
+    if details is None:
+        return None
+    data = dict(details)
+    data.update(care)
+    return data
+
+
+class SpeciesDetailsRequest:
+    """Detalles y guía de cuidados pedidos a la vez en el pool de Perenual.
+
+    Se crea al principio de la petición para que las llamadas a Perenual avancen
+    mientras la vista hace su trabajo local, y `result()` espera como mucho hasta
+    `timeout` segundos desde la creación. Si solo falta la guía de cuidados, se
+    devuelven los detalles marcados con `partial`.
+    """
+
+    def __init__(self, plant_id, timeout):
+        self.plant_id = plant_id
+        self.deadline = time.monotonic() + timeout
+        self._details = _executor.submit(get_raw_species_details, plant_id)
+        self._care = _executor.submit(lambda: get_care_sections(plant_id, care_guides_url(plant_id)))
+
+    def _remaining(self):
+        return max(0, self.deadline - time.monotonic())
+
+    def result(self):
+        """Igual que get_species_details: None si la planta no existe, PerenualError si falla."""
+        try:
+            details = self._details.result(timeout=self._remaining())
+        except FuturesTimeoutError:
+            raise PerenualError("Timeout fetching plant details from Perenual API", status_code=504)
+        if details is None:
+            return None
+        data = dict(details)
+        try:
+            data.update(self._care.result(timeout=self._remaining()))
+        except FuturesTimeoutError:
+            data['partial'] = True
+            data['care_guides_error'] = "Timeout fetching care guides from Perenual API"
+        except Exception as e:
+            data['partial'] = True
+            data['care_guides_error'] = str(e)
+        return data
+
@@ -0,0 +1,317 @@
+"""Páginas de detalle de plagas y enfermedades de Perenual, ya parseadas (tabla PestDetail).
+
+La página de cada plaga (el href de perenual_diseases_list.json) se descarga y se
+parsea una sola vez; el resultado se guarda en la base de datos y en un dict del
+proceso, así que una petición de detalle es una búsqueda por id.
+`manage.py prefetch_pest_details` las descarga todas por adelantado.
+
+Si la copia tiene más de PEST_DETAIL_MAX_AGE segundos se sirve igualmente y se
+revalida en segundo plano con If-None-Match / If-Modified-Since: cuando Perenual
+responde 304 solo se actualiza la fecha de comprobación.
+"""
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from . import http_client
+from .html_parsing import TagStrainer, has_classes, parse
+from .models import PestDetail
+from .singleflight import AsyncSingleFlight, SingleFlight
+
+FETCH_TIMEOUT = 20
+
+# Formato de las secciones
+SECTION_HEADINGS = ('Symptoms', 'Solutions')
+NUMBERED_HEADING_RE = re.compile(r'\d+\s*-\s+.+')
+NUMBERED_TITLE_RE = re.compile(r'\s*(\d+)\s*-\s*(.+)$')
+SHORT_TITLE_RE = re.compile(r'[A-Z][A-Za-z0-9\-\(\)\s]+$')
+BULLET_RE = re.compile(r'[•\-\*]\s+')
+BULLET_PREFIX_RE = re.compile(r'[•\-\*]\s*')
+
+# Solo se construye lo que usa parse_pest_detail_page: <main> (imágenes y secciones),
+# y el título, el nombre científico y las secciones por si estuvieran fuera
+TITLE_CLASSES = ('text-5xl', 'font-bold')
+SCIENTIFIC_NAME_CLASSES = ('italic', 'main-t-c', 'my-2')
+SECTION_CLASSES = ('rounded-md', 'shadow', 'p-3', 'mb-2', 'text-sm')
+DETAIL_PAGE_PARTS = TagStrainer(
+    'main',
+    (None, {'class': has_classes(*TITLE_CLASSES)}),
+    (None, {'class': has_classes(*SCIENTIFIC_NAME_CLASSES)}),
+    ('div', {'class': has_classes(*SECTION_CLASSES)}),
+)
+
+_memory = {}  # id -> (href, datos, comprobado_en)
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'stale': 0, 'fetches': 0, 'not_modified': 0, 'refresh_errors': 0}
+
+_flight = SingleFlight()
+_async_flight = AsyncSingleFlight()
+
+_refresh_lock = threading.Lock()
+_refreshing = set()
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pest-details')
+
+
+class PestDetailError(Exception):
+    """No se pudo descargar la página de detalle."""
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def stats():
+    with _stats_lock:
+        return {**_stats, 'in_memory': len(_memory)}
+
+
+# Parseo
+
+def _section(title=None, subtitle=None):
+    return {'title': title, 'subtitle': subtitle, 'paragraphs': [], 'bullets': []}
+
+
+def _is_heading(line):
+    # Casos típicos: "Symptoms", "Solutions", líneas que acaban en '?' o patrones "N - Subtítulo"
+    if line in SECTION_HEADINGS:
+        return True
+    if line.endswith('?') and len(line) < 200:
+        return True
+    if NUMBERED_HEADING_RE.match(line):
+        return True
+    # Título corto con inicial mayúscula y sin punto final
+    return len(line) <= 80 and SHORT_TITLE_RE.match(line) is not None and not line.endswith('.')
+
+
+def _is_bullet(line):
+    return line.startswith('•') or BULLET_RE.match(line) is not None
+
+
+def _flush_paragraph(current, paragraph):
+    """Añade el párrafo pendiente a la sección actual (creándola si hace falta)."""
+    if paragraph:
+        current = current or _section()
+        current['paragraphs'].append(' '.join(paragraph))
+        paragraph.clear()
+    return current
+
+
+def format_sections(raw_sections):
+    """Convierte el texto de cada sección en títulos, párrafos y viñetas para el frontend."""
+    formatted = []
+    for raw in raw_sections:
+        current = None
+        paragraph = []
+        for line in raw.split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+            if _is_heading(line):
+                current = _flush_paragraph(current, paragraph)
+                if current:
+                    formatted.append(current)
+                # "N - Subtítulo": el texto es el título y el número el subtítulo
+                match = NUMBERED_TITLE_RE.match(line)
+                current = _section(match.group(2), match.group(1)) if match else _section(line)
+            elif _is_bullet(line):
+                current = _flush_paragraph(current, paragraph) or _section()
+                current['bullets'].append(BULLET_PREFIX_RE.sub('', line, count=1))
+            else:
+                paragraph.append(line)
+        current = _flush_paragraph(current, paragraph)
+        if current:
+            formatted.append(current)
+    return formatted
+
+
+def parse_pest_detail_page(html):
+    """Extrae nombre, nombre científico, imagen y secciones de la página de detalle de una plaga."""
+    dsoup = parse(html, DETAIL_PAGE_PARTS)
+
+    # Título (visible en el header)
+    title = None
+    header_title_div = dsoup.select_one('.' + '.'.join(TITLE_CLASSES))
+    if header_title_div:
+        raw = header_title_div.get_text(separator=' ', strip=True)
+        parts = [p.strip() for p in raw.split('>') if p.strip()]
+        if parts:
+            title = parts[-1]
+
+    # Subtítulo (nombre científico)
+    scientific_name = None
+    sci_block = dsoup.select_one('.' + '.'.join(SCIENTIFIC_NAME_CLASSES))
+    if sci_block:
+        scientific_name = sci_block.get_text(strip=True)
+
+    # Imagen principal dentro de main (evitando logos)
+    image_url = None
+    candidate_imgs = dsoup.select('main img') or []
+    for im in candidate_imgs:
+        src = im.get('src') or ''
+        alt = (im.get('alt') or '').lower()
+        if 'logo' in src or 'logo' in alt:
+            continue
+        if 'storage' in src or 'perenual.com/storage' in src:
+            image_url = src
+            break
+    if not image_url:
+        for im in candidate_imgs:
+            src = im.get('src') or ''
+            if 'logo' not in src:
+                image_url = src
+                break
+
+    # Secciones (clase exacta indicada)
+    sections = []
+    for sec in dsoup.select('div.' + '.'.join(SECTION_CLASSES)):
+        text = sec.get_text('\n', strip=True)
+        if text:
+            sections.append(text)
+
+    return {
+        'name': title,
+        'scientific_name': scientific_name,
+        'image': image_url,
+        'sections': format_sections(sections),
+    }
+
+
+# Almacén
+
+def _cached(pest_id, href):
+    """(href, datos, comprobado_en) guardados de la plaga, o None si no están o cambió el href."""
+    entry = _memory.get(pest_id)
+    if entry is None:
+        row = PestDetail.objects.filter(pk=pest_id).only('href', 'data', 'checked_at').first()
+        if row is None:
+            return None
+        entry = _memory[pest_id] = (row.href, row.data, row.checked_at)
+    return entry if entry[0] == href else None
+
+
+def _serve(pest_id, entry):
+    _count('hits')
+    href, data, checked_at = entry
+    max_age = getattr(settings, 'PEST_DETAIL_MAX_AGE', 60 * 60 * 24 * 7)
+    if checked_at < timezone.now() - timedelta(seconds=max_age):
+        _count('stale')
+        schedule_refresh(pest_id, href)
+    return data
+
+
+def conditional_headers(pest_id):
+    """If-None-Match / If-Modified-Since con los validadores de la copia guardada."""
+    row = PestDetail.objects.filter(pk=pest_id).values('etag', 'last_modified').first() or {}
+    headers = {}
+    if row.get('etag'):
+        headers['If-None-Match'] = row['etag']
+    if row.get('last_modified'):
+        headers['If-Modified-Since'] = row['last_modified']
+    return headers
+
+
+def store_response(pest_id, href, response):
+    """Guarda la respuesta de la página de detalle (200 o 304) y devuelve los datos parseados."""
+    now = timezone.now()
+    if response.status_code == 304:
+        row = PestDetail.objects.filter(pk=pest_id).first()
+        if row is None:
+            raise PestDetailError("304 sin copia guardada")
+        _count('not_modified')
+        PestDetail.objects.filter(pk=pest_id).update(checked_at=now)
+        _memory[pest_id] = (row.href, row.data, now)
+        return row.data
+    if response.status_code != 200:
+        raise PestDetailError(f"Perenual respondió {response.status_code}")
+
+    data = parse_pest_detail_page(response.text)
+    print(f"✅ Parsed pest detail {pest_id}: {data['name']}, sections: {len(data['sections'])}")
+    PestDetail.objects.update_or_create(id=pest_id, defaults={
+        'href': href,
+        'data': data,
+        'etag': (response.headers.get('ETag') or '')[:255],
+        'last_modified': (response.headers.get('Last-Modified') or '')[:64],
+        'fetched_at': now,
+        'checked_at': now,
+    })
+    _memory[pest_id] = (href, data, now)
+    _count('fetches')
+    return data
+
+
+def refresh(pest_id, href, conditional=True):
+    """Descarga la página (condicional si hay copia) y actualiza la copia. Devuelve los datos."""
+    headers = conditional_headers(pest_id) if conditional else {}
+    try:
+        response = http_client.get(href, timeout=FETCH_TIMEOUT, headers=headers)
+    except requests.RequestException as e:
+        raise PestDetailError(str(e))
+    return store_response(pest_id, href, response)
+
+
+def schedule_refresh(pest_id, href):
+    """Revalida la plaga en segundo plano (una sola vez aunque se pida varias)."""
+    with _refresh_lock:
+        if pest_id in _refreshing:
+            return False
+        _refreshing.add(pest_id)
+    _executor.submit(_background_refresh, pest_id, href)
+    return True
+
+
+def _background_refresh(pest_id, href):
+    try:
+        refresh(pest_id, href)
+    except Exception as e:
+        _count('refresh_errors')
+        print(f"Error refreshing pest detail {pest_id}: {e}")
+    finally:
+        with _refresh_lock:
+            _refreshing.discard(pest_id)
+        connection.close()
+
+
+def get_detail(pest_id, href):
+    """Detalle parseado de la plaga. PestDetailError si no hay copia y la descarga falla."""
+    entry = _cached(pest_id, href)
+    if entry is not None:
+        return _serve(pest_id, entry)
+    _count('misses')
+    return _flight.do(pest_id, lambda: refresh(pest_id, href, conditional=False))
+
+
+async def aget_detail(pest_id, href):
+    """Versión asíncrona de `get_detail`: la descarga no ocupa un hilo."""
+    entry = _memory.get(pest_id)
+    if entry is None or entry[0] != href:
+        entry = await sync_to_async(_cached)(pest_id, href)
+    if entry is not None:
+        return _serve(pest_id, entry)
+    _count('misses')
+    return await _async_flight.do(pest_id, lambda: _afetch(pest_id, href))
+
+
+async def _afetch(pest_id, href):
+    try:
+        response = await http_client.aget(href, timeout=FETCH_TIMEOUT)
+    except httpx.HTTPError as e:
+        raise PestDetailError(str(e))
+    # El parseo con BeautifulSoup es CPU: fuera del bucle de eventos
+    return await sync_to_async(store_response)(pest_id, href, response)
+
+
+def clear():
+    """Olvida las copias en memoria y reinicia los contadores (tests)."""
+    _memory.clear()
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
@@ -0,0 +1,245 @@
+"""Búsqueda local de plantas sobre el catálogo de especies (mock o copia local de Perenual).
+
+Índice invertido token -> {planta: peso} sobre nombre común, nombres
+científicos, sinónimos (other_name) y familia, con la lista de tokens ordenada
+para resolver prefijos con bisect (búsqueda mientras se escribe: "silv fi"
+encuentra "Silver Fir"). Todas las palabras de la consulta deben aparecer, como
+token completo o como prefijo de uno.
+
+Orden: suma por palabra del peso del campo donde aparece (doble si es el token
+completo), más un extra si algún nombre empieza por la consulta entera (también
+según el campo); a igual puntuación se mantiene el orden del catálogo.
+
+Filtros de la API de Perenual que se resuelven en local con los detalles de la
+especie: indoor (1/0), watering (frequent, average, minimum, none), sunlight
+(full_sun, part_shade, sun-part_shade, full_shade) y hardiness (zona "5" o
+rango "5-7", que se solapa con el de la planta).
+"""
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+
+from . import mock_catalog, species_mirror
+
+FIELD_WEIGHTS = (
+    ('common_name', 4),
+    ('scientific_name', 3),
+    ('other_name', 2),
+    ('family', 1),
+)
+# Las consultas y palabras de hasta 2 letras coinciden con medio catálogo: se guardan sus resultados
+SHORT_PREFIX = 2
+# Extra (x peso del campo) si un nombre común, científico o sinónimo empieza por la consulta completa
+NAME_PREFIX_BONUS = 2
+
+# Valores de sunlight de Perenual -> textos de los detalles de especie que los cumplen
+SUNLIGHT_ALIASES = {
+    'full_sun': {'full sun'},
+    'part_shade': {'part shade', 'filtered shade'},
+    'sun-part_shade': {'part sun/part shade', 'part sun'},
+    'full_shade': {'full shade', 'deep shade'},
+}
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def normalize(text):
+    """Minúsculas y sin acentos."""
+    text = unicodedata.normalize('NFKD', str(text or '').lower())
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def _as_list(value):
+    if not value:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+def _parse_bool(value):
+    value = str(value).strip().lower()
+    if value in ('1', 'true', 'yes'):
+        return True
+    if value in ('0', 'false', 'no'):
+        return False
+    return None
+
+
+def _parse_zone_range(value):
+    """'5' -> (5, 5), '5-7' -> (5, 7); None si no es válido."""
+    parts = str(value).replace(' ', '').split('-')
+    try:
+        zones = [int(p) for p in parts if p]
+    except ValueError:
+        return None
+    if not zones or len(zones) > 2:
+        return None
+    return min(zones), max(zones)
+
+
+class PlantSearchIndex:
+    def __init__(self, plants, details_by_id=None):
+        details_by_id = details_by_id or {}
+        self.plants = list(plants)
+        self.postings = {}
+        self.names = []
+        self.attributes = []
+        for doc, plant in enumerate(self.plants):
+            names = []
+            for field, weight in FIELD_WEIGHTS:
+                for value in _as_list(plant.get(field)):
+                    tokens = tokenize(value)
+                    if field != 'family':
+                        names.append((' '.join(tokens), weight))
+                    for token in tokens:
+                        docs = self.postings.setdefault(token, {})
+                        docs[doc] = max(docs.get(doc, 0), weight)
+            self.names.append(names)
+            self.attributes.append(self._attributes(details_by_id.get(plant.get('id')) or plant))
+        self.tokens = sorted(self.postings)
+        self._short_prefixes = {}
+        self._short_queries = {}
+
+    @staticmethod
+    def _attributes(details):
+        hardiness = details.get('hardiness') or {}
+        zones = None
+        if isinstance(hardiness, dict):
+            low = _parse_zone_range(hardiness.get('min') or '')
+            high = _parse_zone_range(hardiness.get('max') or '')
+            if low and high:
+                zones = (low[0], high[1])
+        return {
+            'indoor': details.get('indoor'),
+            'watering': normalize(details.get('watering')) or None,
+            'sunlight': {normalize(s) for s in _as_list(details.get('sunlight'))},
+            'hardiness': zones,
+        }
+
+    def _term_matches(self, term):
+        """Planta -> puntuación de una palabra de la consulta (token completo o prefijo)."""
+        if len(term) <= SHORT_PREFIX:
+            scores = self._short_prefixes.get(term)
+            if scores is None:
+                scores = self._short_prefixes[term] = self._collect_matches(term)
+            return scores
+        return self._collect_matches(term)
+
+    def _collect_matches(self, term):
+        scores = {}
+        start = bisect_left(self.tokens, term)
+        for token in self.tokens[start:]:
+            if not token.startswith(term):
+                break
+            factor = 2 if token == term else 1
+            for doc, weight in self.postings[token].items():
+                scores[doc] = max(scores.get(doc, 0), weight * factor)
+        return scores
+
+    def _matches_filters(self, doc, filters):
+        attributes = self.attributes[doc]
+        indoor = filters.get('indoor')
+        if indoor is not None and bool(attributes['indoor']) != indoor:
+            return False
+        watering = filters.get('watering')
+        if watering and attributes['watering'] != watering:
+            return False
+        sunlight = filters.get('sunlight')
+        if sunlight and not (attributes['sunlight'] & sunlight):
+            return False
+        zones = filters.get('hardiness')
+        if zones:
+            plant_zones = attributes['hardiness']
+            if plant_zones is None or plant_zones[1] < zones[0] or plant_zones[0] > zones[1]:
+                return False
+        return True
+
+    def search(self, query=None, filters=None):
+        """Plantas que cumplen la consulta y los filtros (ver parse_filters), de más a menos relevante."""
+        filters = filters or {}
+        terms = tokenize(query)
+        phrase = ' '.join(terms)
+        if len(phrase) <= SHORT_PREFIX:
+            docs = self._short_queries.get(phrase)
+            if docs is None:
+                docs = self._short_queries[phrase] = self._rank(terms, phrase)
+        else:
+            docs = self._rank(terms, phrase)
+        if filters:
+            docs = [doc for doc in docs if self._matches_filters(doc, filters)]
+        return [self.plants[doc] for doc in docs]
+
+    def _rank(self, terms, phrase):
+        if terms:
+            scores = None
+            for term in dict.fromkeys(terms):
+                matches = self._term_matches(term)
+                if scores is None:
+                    scores = dict(matches)
+                else:
+                    scores = {doc: score + matches[doc] for doc, score in scores.items() if doc in matches}
+                if not scores:
+                    return []
+            for doc in scores:
+                scores[doc] += NAME_PREFIX_BONUS * max(
+                    (weight for name, weight in self.names[doc] if name.startswith(phrase)), default=0)
+            return sorted(scores, key=lambda doc: (-scores[doc], doc))
+        return list(range(len(self.plants)))
+
+
+def parse_filters(query_params):
+    """Filtros de species-list de la petición (indoor, watering, sunlight, hardiness), ya normalizados."""
+    filters = {}
+    indoor = _parse_bool(query_params.get('indoor', ''))
+    if indoor is not None:
+        filters['indoor'] = indoor
+    watering = query_params.get('watering')
+    if watering:
+        filters['watering'] = normalize(watering)
+    sunlight = query_params.get('sunlight')
+    if sunlight:
+        key = normalize(sunlight).replace(' ', '_')
+        filters['sunlight'] = SUNLIGHT_ALIASES.get(key, {key.replace('_', ' ')})
+    hardiness = query_params.get('hardiness')
+    if hardiness:
+        zones = _parse_zone_range(hardiness)
+        if zones:
+            filters['hardiness'] = zones
+    return filters
+
+
+_lock = threading.Lock()
+_indexes = {}  # origen -> (versión, PlantSearchIndex)
+
+
+def _source(origin):
+    """(versión, función que construye el índice) de los datos de `origin`."""
+    if origin == 'mirror':
+        version, plants, attributes = species_mirror.search_source()
+        return version, lambda: PlantSearchIndex(plants, attributes)
+    plants = mock_catalog.species_list.all()
+    details = mock_catalog.species_details.all()
+    version = (mock_catalog.species_list.version, mock_catalog.species_details.version)
+    return version, lambda: PlantSearchIndex(plants, {d.get('id'): d for d in details})
+
+
+def get_index(origin='mock'):
+    """Índice del catálogo mock ('mock') o de la copia local de Perenual ('mirror').
+    Se reconstruye cuando cambian los datos (mock_catalog relee un fichero o sync_species
+    actualiza especies)."""
+    version, build = _source(origin)
+    current = _indexes.get(origin)
+    if current is None or current[0] != version:
+        with _lock:
+            current = _indexes.get(origin)
+            if current is None or current[0] != version:
+                current = _indexes[origin] = (version, build())
+    return current[1]
+
+
+def search(query=None, filters=None, origin='mock'):
+    return get_index(origin).search(query, filters)
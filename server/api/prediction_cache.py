@@ -0,0 +1,91 @@
+"""Caché de predicciones de PredictImageView y PredictPestDiseaseView.
+
+Los usuarios reenvían a menudo la misma foto (reintentos desde el móvil, volver a
+identificar una planta que ya tienen). La clave es el sha256 de los bytes subidos
+(o de `image_url`) más la versión del modelo (backend y mtime/tamaño de los
+pesos), así que exportar o reentrenar un modelo invalida sus entradas sin tener
+que vaciar nada. Cada entrada guarda el top-k (clase y confianza) y, cuando ya se
+ha resuelto, el id de Perenual ('plant_id' o 'issue_id').
+
+Es una LRU con TTL en memoria de cada worker (PREDICTION_CACHE_SIZE,
+PREDICTION_CACHE_TTL); con PREDICTION_CACHE_SIZE=0 queda desactivada.
+"""
+import hashlib
+import os
+import threading
+
+from django.conf import settings
+
+from .caching import TTLCache
+from .inference import MODEL_WEIGHTS
+
+_cache = TTLCache(
+    maxsize=getattr(settings, 'PREDICTION_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'PREDICTION_CACHE_TTL', 60 * 60 * 6),
+)
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def model_version(name):
+    """Backend de inferencia + mtime y tamaño del fichero de pesos que usa."""
+    backend = getattr(settings, 'INFERENCE_BACKEND', 'torch')
+    path = MODEL_WEIGHTS[name]
+    if backend in ('onnx', 'onnx-int8'):
+        from .onnx_backend import onnx_path
+        path = onnx_path(path, int8=backend == 'onnx-int8')
+    try:
+        st = os.stat(path)
+        stamp = f"{st.st_mtime_ns:x}-{st.st_size:x}"
+    except OSError:
+        stamp = 'missing'
+    return f"{backend}-{stamp}"
+
+
+def image_key(name, data=None, url=None, digest=None):
+    """Clave de caché para los bytes de una imagen subida o para una URL.
+
+    `digest` es el sha256 ya calculado al recibir la subida (uploads.ImageUploadHandler).
+    """
+    if digest is None:
+        digest = hashlib.sha256(data if data is not None else f"url:{url}".encode()).hexdigest()
+    return f"{name}:{model_version(name)}:{digest}"
+
+
+def top_k(result, k=None):
+    """[{'label', 'confidence'}, ...] de un resultado de clasificación, de más a menos probable."""
+    k = k or getattr(settings, 'PREDICTION_CACHE_TOP_K', 5)
+    probs = result.probs
+    top = [{'label': result.names[probs.top1], 'confidence': float(probs.top1conf.item())}]
+    for index, conf in zip(list(probs.top5), list(probs.top5conf)):
+        if len(top) >= k:
+            break
+        if int(index) != int(probs.top1):
+            top.append({'label': result.names[int(index)], 'confidence': float(conf)})
+    return top
+
+
+def lookup(key):
+    entry = _cache.get(key)
+    with _stats_lock:
+        _stats['hits' if entry is not None else 'misses'] += 1
+    return entry
+
+
+def store(key, entry):
+    _cache.set(key, entry)
+
+
+def stats():
+    with _stats_lock:
+        data = dict(_stats)
+    data['size'] = len(_cache)
+    return data
+
+
+def clear():
+    _cache.clear()
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
@@ -1,5 +1,3 @@
-from datetime import date, timedelta
-import json
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
@@ -21,19 +19,36 @@ class VoteSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Cannot vote on both post and comment")
         return data
 
+class VoteFieldsMixin:
+    """vote_score (a partir de los contadores) y user_vote.
+
+    Si el objeto viene de `with_votes()` el voto del usuario ya está precargado;
+    si no, se consulta con el método del modelo.
+    """
+    def get_vote_score(self, obj):
+        return obj.get_vote_score()
+
+    def get_user_vote(self, obj):
+        request = self.context.get('request')
+        if not (request and request.user.is_authenticated):
+            return None
+        if hasattr(obj, 'user_votes'):
+            return obj.user_votes[0].vote_type if obj.user_votes else None
+        return obj.get_user_vote(request.user)
+
 class PostBriefSerializer(serializers.ModelSerializer):
     class Meta:
         model = Post
         fields = ['id', 'title', 'plant_common_name']
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(VoteFieldsMixin, serializers.ModelSerializer):
     author = serializers.StringRelatedField(read_only=True)
     author_id = serializers.IntegerField(source='author.id', read_only=True)
     post = PostBriefSerializer(read_only=True)
     post_id = serializers.IntegerField(source='post.id', read_only=True)
     vote_score = serializers.SerializerMethodField()
-    likes_count = serializers.SerializerMethodField()
-    dislikes_count = serializers.SerializerMethodField()
+    likes_count = serializers.IntegerField(read_only=True)
+    dislikes_count = serializers.IntegerField(read_only=True)
     
     user_vote = serializers.SerializerMethodField()
     created_since = serializers.SerializerMethodField()
@@ -50,20 +65,6 @@ class CommentSerializer(serializers.ModelSerializer):
             data['content'] = None
         return data
         
-    def get_vote_score(self, obj):
-        return obj.get_vote_score()
-    
-    def get_likes_count(self, obj):
-        return obj.get_likes_count()
-    
-    def get_dislikes_count(self, obj):
-        return obj.get_dislikes_count()
-        
-    def get_user_vote(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.get_user_vote(request.user)
-        return None
     def get_created_since(self, obj):
         """Devuelve tiempo transcurrido desde la creación en formato compacto.
         m=minutos, h=horas, d=días, M=meses, a=años
@@ -89,13 +90,13 @@ class CommentSerializer(serializers.ModelSerializer):
         years = months // 12
         return f"{years}a"
         
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(VoteFieldsMixin, serializers.ModelSerializer):
     author = serializers.StringRelatedField(read_only=True)
     author_id = serializers.IntegerField(source='author.id', read_only=True)
     comments = CommentSerializer(many=True, read_only=True)
     vote_score = serializers.SerializerMethodField()
-    likes_count = serializers.SerializerMethodField()
-    dislikes_count = serializers.SerializerMethodField()
+    likes_count = serializers.IntegerField(read_only=True)
+    dislikes_count = serializers.IntegerField(read_only=True)
     user_vote = serializers.SerializerMethodField()
     created_since = serializers.SerializerMethodField()
     
@@ -103,20 +104,6 @@ class PostSerializer(serializers.ModelSerializer):
         model = Post
         fields = '__all__'
         
-    def get_vote_score(self, obj):
-        return obj.get_vote_score()
-    
-    def get_likes_count(self, obj):
-        return obj.get_likes_count()
-    
-    def get_dislikes_count(self, obj):
-        return obj.get_dislikes_count()
-        
-    def get_user_vote(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.get_user_vote(request.user)
-        return None
 
     def get_created_since(self, obj):
         """Devuelve tiempo transcurrido desde la creación en formato compacto.
@@ -143,6 +130,10 @@ class PostSerializer(serializers.ModelSerializer):
         years = months // 12
         return f"{years}a"
         
+class PostSummarySerializer(PostSerializer):
+    """Post sin los comentarios anidados, para listados (feed y posts de una planta)."""
+    comments = None
+
 class UserPlantSerializer(serializers.ModelSerializer):
     #plant = PlantInfoSerializer(read_only=True)
     
@@ -163,66 +154,16 @@ class UserPlantSerializer(serializers.ModelSerializer):
         return int(value_str)
     
     def get_next_watering_date(self, obj):
-        # obj.last_watered_date: fecha de último riego
-        # obj.plant.watering_period: JSON con los periodos
-        if not obj.isWateringReminder:
-            return None
-        if obj.last_watered_date and obj.watering_period and obj.watering_type == 'recommended':
-            try:
-                # Si watering_period es un string, conviértelo a lista
-                period = obj.watering_period
-                if isinstance(period, str):
-                    period = json.loads(period)
-                today = obj.last_watered_date
-
-                unit = period["unit"]
-                unit_days = {"days": 1, "weeks": 7, "months": 30}
-                
-                value = period["value"]
-                if isinstance(value, str) and '-' in value:
-                    # Si es un rango como "7-10", calcular la media
-                    min_val, max_val = map(int, value.split('-'))
-                    value = (min_val + max_val) / 2
-                else:
-                    value = int(value)
-                days = value * unit_days.get(unit, 1)
-                print("Calculated days for watering:", days)
-                return today + timedelta(days=days)
-            except Exception:
-                return None
-        if obj.last_watered_date and obj.watering_time and obj.watering_type == 'manual':
-            units = {'day': 1, 'week': 7, 'month': 30}
-            days = obj.watering_time * units.get(obj.watering_unit, 1)
-            return obj.last_watered_date + timedelta(days=days)
-        return obj.created_at.date()
+        return obj.next_watering_date
 
     def get_next_pruning_date(self, obj):
-        if obj.last_pruning_date and obj.pruning_time and obj.pruning_time_unit:
-            units = {'day': 1, 'week': 7, 'month': 30}
-            days = obj.pruning_time * units.get(obj.pruning_time_unit, 1)
-            return obj.last_pruning_date + timedelta(days=days)
-        elif obj.pruning_time and obj.pruning_time_unit:
-            return obj.created_at.date()
-        else:
-            return None
+        return obj.next_pruning_date
 
     def get_next_spraying_date(self, obj):
-        if obj.last_spraying_date and obj.sprayed_time and obj.sprayed_unit:
-            units = {'day': 1, 'week': 7, 'month': 30}
-            days = obj.sprayed_time * units.get(obj.sprayed_unit, 1)
-            return obj.last_spraying_date + timedelta(days=days)
-        elif obj.sprayed_time and obj.sprayed_unit:
-            return obj.created_at.date()
-        return None
+        return obj.next_spraying_date
 
     def get_next_rotating_date(self, obj):
-        if obj.last_rotating_date and obj.rotation_time and obj.rotation_unit:
-            units = {'day': 1, 'week': 7, 'month': 30}
-            days = obj.rotation_time * units.get(obj.rotation_unit, 1)
-            return obj.last_rotating_date + timedelta(days=days)
-        elif obj.rotation_time and obj.rotation_unit:
-            return obj.created_at.date()
-        return None
+        return obj.next_rotating_date
 
     def get_next_fertilizing_date(self, obj):
         #if obj.last_fertilized_date and obj.fertilizing_time and obj.fertilizing_time_unit:
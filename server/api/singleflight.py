@@ -0,0 +1,191 @@
+"""Agrupación de peticiones concurrentes ("single-flight").
+
+Cuando varias peticiones fallan en caché a la vez para la misma clave, solo una
+(la líder) llama a la API; el resto espera su resultado:
+
+- Dentro del proceso, los hilos esperan a un Event por clave.
+- Entre workers, la líder toma un lease con `cache.add` en la caché compartida;
+  los demás workers consultan esa caché hasta que aparece el valor o el lease
+  se libera/caduca, y solo entonces hacen la llamada ellos mismos.
+
+`AsyncSingleFlight` hace la agrupación dentro del bucle de eventos para las vistas
+asíncronas (sin lease entre workers).
+"""
+import asyncio
+import threading
+import time
+import weakref
+
+# Valor que devuelve `peek` cuando la clave todavía no está en la caché compartida
+MISS = object()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, cache=None, lease_timeout=10, poll_interval=0.05):
+        # `cache` es una función que devuelve la caché de Django del lease (o None)
+        self._cache = cache
+        self.lease_timeout = lease_timeout
+        self.poll_interval = poll_interval
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'executions': 0,
+            'coalesced_local': 0,
+            'coalesced_remote': 0,
+            'lease_timeouts': 0,
+        }
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._calls)
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            for name in self._stats:
+                self._stats[name] = 0
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def do(self, key, fn, peek=None):
+        """Ejecuta `fn()` una sola vez por clave entre las llamadas concurrentes.
+
+        `peek()` se usa mientras otro worker tiene el lease: debe devolver el valor
+        desde la caché compartida o MISS si todavía no está.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self._stats['coalesced_local'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run(key, fn, peek)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def _run(self, key, fn, peek):
+        cache = self._cache() if self._cache else None
+        if cache is None or peek is None:
+            self._count('executions')
+            return fn()
+
+        lease_key = f"lease:{key}"
+        try:
+            acquired = cache.add(lease_key, 1, self.lease_timeout)
+        except Exception as e:
+            print(f"Error acquiring single-flight lease: {e}")
+            acquired = False
+            cache = None
+
+        if acquired:
+            # Otro worker pudo guardar el valor justo antes de soltar su lease
+            value = peek()
+            if value is not MISS:
+                cache.delete(lease_key)
+                self._count('coalesced_remote')
+                return value
+        elif cache is not None:
+            value = self._wait_for_remote(cache, lease_key, peek)
+            if value is not MISS:
+                return value
+
+        try:
+            self._count('executions')
+            return fn()
+        finally:
+            if acquired:
+                try:
+                    cache.delete(lease_key)
+                except Exception as e:
+                    print(f"Error releasing single-flight lease: {e}")
+
+    def _wait_for_remote(self, cache, lease_key, peek):
+        deadline = time.monotonic() + self.lease_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            value = peek()
+            if value is not MISS:
+                self._count('coalesced_remote')
+                return value
+            try:
+                released = cache.get(lease_key) is None
+            except Exception:
+                return MISS
+            if released:
+                # El lease se libera después de guardar: última comprobación antes
+                # de asumir que el otro worker falló y llamar nosotros
+                value = peek()
+                if value is not MISS:
+                    self._count('coalesced_remote')
+                return value
+        self._count('lease_timeouts')
+        return MISS
+
+
+class AsyncSingleFlight:
+    """Agrupa corrutinas concurrentes del mismo bucle de eventos por clave."""
+
+    def __init__(self):
+        # bucle -> {clave: Task}
+        self._calls = weakref.WeakKeyDictionary()
+        self._stats = {'executions': 0, 'coalesced_local': 0}
+
+    def stats(self):
+        stats = dict(self._stats)
+        stats['in_flight'] = sum(len(calls) for calls in list(self._calls.values()))
+        return stats
+
+    def reset_stats(self):
+        for name in self._stats:
+            self._stats[name] = 0
+
+    async def do(self, key, fn):
+        """Espera `fn()` (una corrutina) una sola vez por clave entre las llamadas concurrentes.
+
+        La llamada corre en su propia tarea: si la petición que la lanzó se cancela,
+        las demás siguen esperando el resultado.
+        """
+        loop = asyncio.get_running_loop()
+        calls = self._calls.setdefault(loop, {})
+        task = calls.get(key)
+        if task is None:
+            self._stats['executions'] += 1
+            task = loop.create_task(fn())
+            calls[key] = task
+            task.add_done_callback(lambda t: self._done(calls, key, t))
+        else:
+            self._stats['coalesced_local'] += 1
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _done(calls, key, task):
+        calls.pop(key, None)
+        # Marca la excepción como leída aunque todos los que esperaban se hayan cancelado
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,244 @@
+"""Copia local de Perenual en la base de datos (tablas Species y SpeciesCareSection).
+
+`manage.py sync_species` la llena recorriendo species-list y species/details. Con
+SPECIES_MIRROR=True las vistas leen de aquí en lugar de llamar a la API:
+
+- Detalles (get_species_details): salen de la tabla. Si la especie no está se piden
+  a Perenual (con sus cachés) y se guardan. Si la copia tiene más de
+  SPECIES_MIRROR_MAX_AGE segundos se devuelve igualmente y se refresca en segundo
+  plano (SPECIES_MIRROR_STALE_WHILE_REVALIDATE=True), o se refresca antes de
+  responder, usando la copia si la API falla.
+- Lista y búsqueda (search_source): las especies sincronizadas alimentan el índice
+  de api/plant_search.py.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from . import perenual
+from .models import Species, SpeciesCareSection
+from .perenual import CARE_SECTION_FIELDS, PerenualError
+
+# Campo de los detalles (watering_long...) -> tipo de sección de la guía de cuidados
+SECTION_TYPES = {field: section_type for section_type, field in CARE_SECTION_FIELDS.items()}
+LIST_FIELDS = ('common_name', 'scientific_name', 'other_name', 'family', 'genus', 'default_image')
+FILTER_FIELDS = ('indoor', 'watering', 'sunlight', 'hardiness_min', 'hardiness_max')
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'stale': 0, 'refreshes': 0, 'refresh_errors': 0}
+
+_refresh_lock = threading.Lock()
+_refreshing = set()
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'SPECIES_MIRROR_REFRESH_WORKERS', 2),
+    thread_name_prefix='species-mirror',
+)
+
+_source_lock = threading.Lock()
+_source = None  # (comprobado_en, versión, plantas, atributos por id)
+
+
+def enabled():
+    return getattr(settings, 'SPECIES_MIRROR', False)
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def stats():
+    with _stats_lock:
+        return dict(_stats)
+
+
+def _zone(value):
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def _text(value, max_length):
+    return value[:max_length] if isinstance(value, str) else None
+
+
+def _list_fields(item):
+    return {
+        'common_name': _text(item.get('common_name'), 255) or '',
+        'scientific_name': item.get('scientific_name') or [],
+        'other_name': item.get('other_name') or [],
+        'family': _text(item.get('family'), 255),
+        'genus': _text(item.get('genus'), 255),
+        'default_image': item.get('default_image'),
+    }
+
+
+def store_list_page(items):
+    """Guarda (o actualiza) las especies de una página de species-list. Devuelve cuántas."""
+    now = timezone.now()
+    rows = [Species(id=item['id'], list_synced_at=now, **_list_fields(item))
+            for item in items if isinstance(item.get('id'), int)]
+    Species.objects.bulk_create(
+        rows, update_conflicts=True, unique_fields=['id'],
+        update_fields=[*LIST_FIELDS, 'list_synced_at', 'updated_at'],
+    )
+    return len(rows)
+
+
+def store_details(plant_id, data):
+    """Guarda los detalles de una especie. Las secciones de cuidados que falten en
+    `data` (p. ej. porque falló la guía) se conservan de la copia anterior."""
+    hardiness = data.get('hardiness') if isinstance(data.get('hardiness'), dict) else {}
+    sunlight = data.get('sunlight')
+    fields = {
+        **_list_fields(data),
+        'indoor': data.get('indoor') if isinstance(data.get('indoor'), bool) else None,
+        'watering': _text(data.get('watering'), 50),
+        'sunlight': sunlight if isinstance(sunlight, list) else [],
+        'hardiness_min': _zone(hardiness.get('min')),
+        'hardiness_max': _zone(hardiness.get('max')),
+        'details': {k: v for k, v in data.items() if k not in SECTION_TYPES},
+        'details_synced_at': timezone.now(),
+    }
+    with transaction.atomic():
+        species, _ = Species.objects.update_or_create(id=int(plant_id), defaults=fields)
+        for field, section_type in SECTION_TYPES.items():
+            if field in data:
+                SpeciesCareSection.objects.update_or_create(
+                    species=species, section_type=section_type,
+                    defaults={'description': data[field] or ''},
+                )
+    return species
+
+
+def row_details(species):
+    """Detalles de la copia local en el formato de perenual.get_species_details."""
+    data = dict(species.details or {})
+    for section in species.care_sections.all():
+        field = CARE_SECTION_FIELDS.get(section.section_type)
+        if field:
+            data[field] = section.description
+    return data
+
+
+def load(plant_id):
+    """Especie con detalles sincronizados (y sus secciones de cuidados), o None."""
+    return (Species.objects.filter(pk=int(plant_id), details_synced_at__isnull=False)
+            .prefetch_related('care_sections').first())
+
+
+def is_stale(species):
+    max_age = getattr(settings, 'SPECIES_MIRROR_MAX_AGE', 60 * 60 * 24 * 30)
+    return species.details_synced_at < timezone.now() - timedelta(seconds=max_age)
+
+
+def refresh(plant_id):
+    """Vuelve a pedir la especie a la API (sin cachés) y actualiza la copia.
+    Devuelve los detalles, o None si Perenual ya no la conoce."""
+    data = perenual.fetch_species_details(plant_id)
+    if data is None:
+        return None
+    _count('refreshes')
+    return row_details(load(store_details(plant_id, data).pk))
+
+
+def schedule_refresh(plant_id):
+    """Refresca la especie en segundo plano (una sola vez aunque se pida varias)."""
+    plant_id = int(plant_id)
+    with _refresh_lock:
+        if plant_id in _refreshing:
+            return False
+        _refreshing.add(plant_id)
+    _executor.submit(_background_refresh, plant_id)
+    return True
+
+
+def _background_refresh(plant_id):
+    try:
+        refresh(plant_id)
+    except Exception as e:
+        _count('refresh_errors')
+        print(f"Error refreshing species {plant_id} from Perenual: {e}")
+    finally:
+        with _refresh_lock:
+            _refreshing.discard(plant_id)
+        connection.close()
+
+
+def get_species_details(plant_id):
+    """Como perenual.get_species_details, pero desde la copia local.
+
+    None si la planta no existe; PerenualError solo si no hay copia y la API falla.
+    """
+    species = load(plant_id)
+    if species is None:
+        _count('misses')
+        data = perenual.get_species_details(plant_id)
+        if data is not None:
+            store_details(plant_id, data)
+        return data
+    _count('hits')
+    if is_stale(species):
+        _count('stale')
+        if getattr(settings, 'SPECIES_MIRROR_STALE_WHILE_REVALIDATE', True):
+            schedule_refresh(plant_id)
+        else:
+            try:
+                return refresh(plant_id) or row_details(species)
+            except PerenualError as e:
+                _count('refresh_errors')
+                print(f"Error refreshing species {plant_id}, serving the local copy: {e}")
+    return row_details(species)
+
+
+def _version():
+    return tuple(Species.objects.aggregate(count=Count('id'), updated=Max('updated_at')).values())
+
+
+def search_source():
+    """(versión, plantas, atributos por id) de las especies de la copia para plant_search.
+
+    La versión (número de especies y última actualización) se consulta como mucho
+    cada SPECIES_MIRROR_INDEX_TTL segundos; las filas solo se releen si cambia.
+    """
+    global _source
+    now = time.monotonic()
+    current = _source
+    if current is not None and now - current[0] < getattr(settings, 'SPECIES_MIRROR_INDEX_TTL', 60):
+        return current[1:]
+    with _source_lock:
+        version = _version()
+        if current is None or current[1] != version:
+            plants, attributes = [], {}
+            for row in Species.objects.order_by('id').values('id', *LIST_FIELDS, *FILTER_FIELDS):
+                plants.append({field: row[field] for field in ('id', *LIST_FIELDS)})
+                zones = None
+                if row['hardiness_min'] is not None and row['hardiness_max'] is not None:
+                    zones = {'min': row['hardiness_min'], 'max': row['hardiness_max']}
+                attributes[row['id']] = {'indoor': row['indoor'], 'watering': row['watering'],
+                                         'sunlight': row['sunlight'], 'hardiness': zones}
+            current = (now, version, plants, attributes)
+        else:
+            current = (now, *current[1:])
+        _source = current
+    return current[1:]
+
+
+def has_species():
+    return search_source()[0][0] > 0
+
+
+def clear():
+    """Olvida la versión cacheada de la búsqueda y reinicia los contadores (tests)."""
+    global _source
+    _source = None
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
@@ -0,0 +1,122 @@
+"""Sugerencias de nombres de plantas y plagas para la búsqueda mientras se escribe (/api/suggest/).
+
+Por cada tipo se guarda un array ordenado de claves normalizadas (minúsculas, sin
+acentos): el nombre completo y cada sufijo que empieza en una palabra ("japanese
+maple", "maple"), más los nombres científicos y sinónimos de las plantas. Un prefijo
+es un rango del array que se encuentra con bisect.
+
+Orden: primero los nombres que empiezan por el prefijo (antes que los que solo lo
+tienen en una palabra interior), el nombre común antes que los alias, después los
+más cortos y luego alfabético.
+
+Las sugerencias por (prefijo, tipos, límite) se guardan en una LRU. La versión de los
+datos forma parte de la clave y del ETag, así que al cambiar los datos las entradas
+antiguas dejan de usarse.
+"""
+import hashlib
+import heapq
+import threading
+from bisect import bisect_left
+from operator import itemgetter
+
+from django.conf import settings
+
+from . import mock_catalog, species_mirror
+from .caching import TTLCache
+from .plant_search import tokenize
+
+KINDS = ('plant', 'pest')
+
+_lock = threading.Lock()
+_indexes = {}  # (tipo, origen) -> (versión, SuggestIndex)
+_responses = TTLCache(
+    maxsize=getattr(settings, 'SUGGEST_CACHE_SIZE', 2048),
+    ttl=getattr(settings, 'SUGGEST_CACHE_TTL', 600),
+)
+
+
+class SuggestIndex:
+    """Array ordenado de claves -> sugerencia. `entries` son (tipo, id, nombre, alias)."""
+
+    def __init__(self, entries):
+        rows = []
+        for kind, item_id, name, aliases in entries:
+            if not name:
+                continue
+            for alias_rank, text in enumerate([name, *aliases]):
+                tokens = tokenize(text)
+                for start in range(len(tokens)):
+                    # Rango: palabra interior, alias, longitud del nombre, nombre
+                    rank = (start > 0, alias_rank > 0, len(name), name.lower())
+                    suggestion = {'type': kind, 'id': item_id, 'name': name}
+                    if alias_rank:
+                        suggestion['matched'] = text
+                    rows.append((' '.join(tokens[start:]), rank, suggestion))
+        rows.sort(key=itemgetter(0))
+        self.keys = [row[0] for row in rows]
+        self.rows = rows
+
+    def lookup(self, prefix):
+        """(rango, sugerencia) de cada elemento con alguna clave que empieza por `prefix` (normalizado)."""
+        best = {}
+        start = bisect_left(self.keys, prefix)
+        for key, rank, suggestion in self.rows[start:]:
+            if not key.startswith(prefix):
+                break
+            item = (suggestion['type'], suggestion['id'])
+            if item not in best or rank < best[item][0]:
+                best[item] = (rank, suggestion)
+        return best.values()
+
+
+def _source(kind, origin):
+    """(versión, función que da las entradas) de `kind`; las plantas salen del catálogo mock
+    o de la copia local de Perenual."""
+    if kind == 'pest':
+        cards = mock_catalog.disease_cards.all()
+        return ('cards', mock_catalog.disease_cards.version), lambda: [
+            ('pest', card.get('id'), card.get('name'), []) for card in cards]
+    if origin == 'mirror':
+        version, plants, _ = species_mirror.search_source()
+    else:
+        plants = mock_catalog.species_list.all()
+        version = ('mock', mock_catalog.species_list.version)
+    return version, lambda: [
+        ('plant', plant.get('id'), plant.get('common_name'),
+         [*(plant.get('scientific_name') or []), *(plant.get('other_name') or [])])
+        for plant in plants]
+
+
+def get_index(kind, origin='mock'):
+    """(versión, SuggestIndex) de `kind`; se reconstruye cuando cambian los datos."""
+    version, entries = _source(kind, origin)
+    current = _indexes.get((kind, origin))
+    if current is None or current[0] != version:
+        with _lock:
+            current = _indexes.get((kind, origin))
+            if current is None or current[0] != version:
+                current = _indexes[(kind, origin)] = (version, SuggestIndex(entries()))
+    return current
+
+
+def suggest(prefix, kinds=KINDS, limit=10, origin='mock'):
+    """(sugerencias, etag) para `prefix`. `origin` es de dónde salen las plantas ('mock' o 'mirror')."""
+    query = ' '.join(tokenize(prefix))
+    indexes = [get_index(kind, origin) for kind in kinds]
+    key = (query, tuple(kinds), limit, origin, tuple(version for version, _ in indexes))
+    cached = _responses.get(key)
+    if cached is not None:
+        return cached
+    results = []
+    if query:
+        candidates = [candidate for _, index in indexes for candidate in index.lookup(query)]
+        results = [suggestion for _, suggestion in heapq.nsmallest(limit, candidates, key=itemgetter(0))]
+    etag = '"%s"' % hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:20]
+    value = (results, etag)
+    _responses.set(key, value)
+    return value
+
+
+def clear():
+    _indexes.clear()
+    _responses.clear()
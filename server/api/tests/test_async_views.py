@@ -0,0 +1,160 @@
+import asyncio
+import json
+from unittest.mock import patch, AsyncMock, MagicMock
+
+import httpx
+from django.contrib.auth.models import User
+from django.test import TestCase, AsyncRequestFactory
+
+from api import perenual, pest_details
+from api.models import Post
+from api.urls import _view
+from api.views import (
+    WeatherRecommendationView,
+    AsyncPerenualPlantListView,
+    AsyncPerenualPlantDetailView,
+    AsyncWeatherRecommendationView,
+    AsyncPerenualPestDiseaseDetailView,
+)
+
+
+def make_response(status_code, payload=None, text=''):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = payload or {}
+    response.text = text
+    response.headers = {}
+    return response
+
+
+DETAILS = {'id': 42, 'common_name': 'Async Plant'}
+CARE_GUIDES = {'data': [{'section': [{'type': 'watering', 'description': 'Water weekly'}]}]}
+
+
+def by_url(url, **kwargs):
+    if 'care-guide' in url:
+        return make_response(200, CARE_GUIDES)
+    return make_response(200, DETAILS)
+
+
+@patch.dict('os.environ', {'PERENUAL_API_KEY': 'test-key', 'USE_MOCK_DATA': 'False'})
+class AsyncPerenualViewsTest(TestCase):
+    def setUp(self):
+        perenual.clear_cache()
+        pest_details.clear()
+        self.factory = AsyncRequestFactory()
+
+    def tearDown(self):
+        perenual.clear_cache()
+
+    @patch('api.views.http_client.aget', new_callable=AsyncMock)
+    async def test_plant_list_filters_fields(self, mock_aget):
+        mock_aget.return_value = make_response(200, {'data': [
+            {'id': 1, 'common_name': 'Rose', 'scientific_name': ['Rosa'], 'default_image': None, 'cycle': 'Perennial'},
+        ], 'total': 1})
+        request = self.factory.get('/api/perenual/plants/', {'q': 'rose', 'indoor': '1'})
+
+        response = await AsyncPerenualPlantListView.as_view()(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['data'][0], {
+            'id': 1, 'common_name': 'Rose', 'scientific_name': ['Rosa'], 'default_image': None,
+        })
+        params = mock_aget.call_args.kwargs['params']
+        self.assertEqual(params['q'], 'rose')
+        self.assertEqual(params['indoor'], '1')
+
+    @patch.dict('os.environ', {'PERENUAL_API_KEY': ''})
+    async def test_plant_list_without_api_key(self):
+        response = await AsyncPerenualPlantListView.as_view()(self.factory.get('/api/perenual/plants/'))
+        self.assertEqual(response.status_code, 500)
+
+    @patch('api.perenual.http_client.aget', new_callable=AsyncMock)
+    async def test_plant_detail_includes_care_sections_and_posts(self, mock_aget):
+        mock_aget.side_effect = by_url
+        user = await User.objects.acreate(username='async-user')
+        await Post.objects.acreate(title='Related', content='X', author=user, plant_id=42)
+        view = AsyncPerenualPlantDetailView.as_view()
+
+        first = await view(self.factory.get('/api/perenual/plants/42/'), plant_id=42)
+        second = await view(self.factory.get('/api/perenual/plants/42/'), plant_id=42)
+
+        self.assertEqual(first.status_code, 200)
+        data = json.loads(second.content)
+        self.assertEqual(data['watering_long'], 'Water weekly')
+        self.assertEqual(len(data['posts']), 1)
+        self.assertEqual(mock_aget.call_count, 2)
+
+    @patch('api.perenual.http_client.aget', new_callable=AsyncMock)
+    async def test_concurrent_detail_requests_share_upstream_calls(self, mock_aget):
+        async def slow(url, **kwargs):
+            await asyncio.sleep(0.1)
+            return by_url(url)
+        mock_aget.side_effect = slow
+        view = AsyncPerenualPlantDetailView.as_view()
+
+        responses = await asyncio.gather(*[
+            view(self.factory.get('/api/perenual/plants/42/'), plant_id=42) for _ in range(5)
+        ])
+
+        self.assertTrue(all(r.status_code == 200 for r in responses))
+        self.assertEqual(mock_aget.call_count, 2)
+        self.assertEqual(perenual.cache_stats()['async_singleflight']['coalesced_local'], 8)
+
+    @patch('api.perenual.http_client.aget', new_callable=AsyncMock)
+    async def test_plant_detail_not_found(self, mock_aget):
+        mock_aget.return_value = make_response(404)
+        response = await AsyncPerenualPlantDetailView.as_view()(self.factory.get('/api/perenual/plants/9/'), plant_id=9)
+        self.assertEqual(response.status_code, 404)
+
+    @patch('api.views.http_client.aget', new_callable=AsyncMock)
+    async def test_weather_recommendation(self, mock_aget):
+        mock_aget.return_value = make_response(200, {'weather': [{'main': 'Clear'}], 'main': {'temp': 35}})
+        request = self.factory.get('/api/weather/', {'lat': '40', 'lon': '-3'})
+
+        response = await AsyncWeatherRecommendationView.as_view()(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['condition'], 'hot')
+
+    @patch('api.views.http_client.aget', new_callable=AsyncMock)
+    async def test_weather_upstream_error(self, mock_aget):
+        mock_aget.side_effect = httpx.ConnectError('down')
+        request = self.factory.get('/api/weather/', {'lat': '40', 'lon': '-3'})
+        response = await AsyncWeatherRecommendationView.as_view()(request)
+        self.assertEqual(response.status_code, 502)
+
+    async def test_weather_requires_coordinates(self):
+        response = await AsyncWeatherRecommendationView.as_view()(self.factory.get('/api/weather/'))
+        self.assertEqual(response.status_code, 400)
+
+    @patch('api.views.http_client.aget', new_callable=AsyncMock)
+    async def test_pest_detail_is_parsed(self, mock_aget):
+        html = (
+            '<main><div class="text-5xl font-bold">Pests > Fairy ring</div>'
+            '<div class="italic main-t-c my-2">Agrocybe</div>'
+            '<div class="rounded-md shadow p-3 mb-2 text-sm">Symptoms\nRings of mushrooms.</div></main>'
+        )
+        mock_aget.return_value = make_response(200, text=html)
+
+        response = await AsyncPerenualPestDiseaseDetailView.as_view()(self.factory.get('/'), pest_id=1)
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(data['name'], 'Fairy ring')
+        self.assertEqual(data['scientific_name'], 'Agrocybe')
+        self.assertEqual(data['sections'][0]['title'], 'Symptoms')
+
+    async def test_pest_detail_unknown_id(self):
+        response = await AsyncPerenualPestDiseaseDetailView.as_view()(self.factory.get('/'), pest_id=999999)
+        self.assertEqual(response.status_code, 404)
+
+
+class AsyncViewRoutingTest(TestCase):
+    def test_async_views_setting_picks_the_view_class(self):
+        with self.settings(ASYNC_VIEWS=True):
+            self.assertIs(_view(WeatherRecommendationView, AsyncWeatherRecommendationView).view_class,
+                          AsyncWeatherRecommendationView)
+        with self.settings(ASYNC_VIEWS=False):
+            self.assertIs(_view(WeatherRecommendationView, AsyncWeatherRecommendationView).view_class,
+                          WeatherRecommendationView)
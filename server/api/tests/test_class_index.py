@@ -0,0 +1,106 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+from api import class_index, prediction_cache
+from api.tests.test_prediction_cache import fake_result
+from api.tests.test_views import create_test_image
+
+PLANTS = [
+    {'id': 1, 'common_name': 'European Silver Fir', 'scientific_name': ['Abies alba'], 'other_name': []},
+    {'id': 2, 'common_name': 'Pyramidalis Silver Fir', 'scientific_name': ["Abies alba 'Pyramidalis'"], 'other_name': []},
+    {'id': 27, 'common_name': 'Japanese Maple', 'scientific_name': ['Acer palmatum'], 'other_name': []},
+]
+
+
+class TempIndexMixin:
+    def use_temp_weights_dir(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        weights = os.path.join(self.tmp, 'best.pt')
+        patcher = patch.dict('api.class_index.MODEL_WEIGHTS', {'plant': weights, 'disease': weights})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class MatchSpeciesTest(SimpleTestCase):
+    def test_exact_match_wins_over_partial(self):
+        self.assertEqual(class_index.match_species(list(reversed(PLANTS)), 'abies_alba'), 1)
+
+    def test_common_and_partial_names(self):
+        self.assertEqual(class_index.match_species(PLANTS, 'Japanese Maple'), 27)
+        self.assertEqual(class_index.match_species(PLANTS, 'Pyramidalis'), 2)
+        self.assertIsNone(class_index.match_species(PLANTS, 'Monstera deliciosa'))
+
+
+class BuildPerenualIndexTest(TempIndexMixin, SimpleTestCase):
+    def setUp(self):
+        self.use_temp_weights_dir()
+        patcher = patch('api.management.commands.build_perenual_index.model_class_names',
+                        return_value=['Abies_alba', 'Acer palmatum', 'Monstera deliciosa'])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_builds_index_from_mock_next_to_weights(self):
+        with patch('api.views.load_species_list_mock', return_value={'data': PLANTS}):
+            call_command('build_perenual_index', '--models', 'plant', stdout=StringIO())
+
+        with open(os.path.join(self.tmp, 'perenual_ids.json')) as f:
+            data = json.load(f)
+        self.assertEqual(data['ids'], {'Abies_alba': 1, 'Acer palmatum': 27, 'Monstera deliciosa': None})
+        self.assertEqual(data['names_sha256'], class_index.names_digest(data['ids']))
+        self.assertEqual(class_index.perenual_id('plant', 'Acer palmatum'), 27)
+        self.assertIsNone(class_index.perenual_id('plant', 'Monstera deliciosa'))
+
+    def test_api_source_only_fetches_unresolved_classes(self):
+        class_index.write_index('plant', {'Abies_alba': 1, 'Acer palmatum': 27, 'Monstera deliciosa': None},
+                                ['Abies_alba', 'Acer palmatum', 'Monstera deliciosa'], 'mock')
+        response = MagicMock(status_code=200)
+        response.json.return_value = {'data': [{'id': 900, 'common_name': 'Swiss Cheese Plant',
+                                                'scientific_name': ['Monstera deliciosa']}]}
+        with patch.dict(os.environ, {'PERENUAL_API_KEY': 'k'}), \
+             patch('api.http_client.get', return_value=response) as mock_get:
+            call_command('build_perenual_index', '--models', 'plant', '--source', 'api', '--delay', '0',
+                         stdout=StringIO())
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(mock_get.call_args.kwargs['params']['q'], 'Monstera deliciosa')
+        self.assertEqual(class_index.perenual_id('plant', 'Monstera deliciosa'), 900)
+
+
+class PredictImageIndexTest(TempIndexMixin, APITestCase):
+    def setUp(self):
+        self.use_temp_weights_dir()
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user(username='indexuser', password='pwd'))
+        prediction_cache.clear()
+        self.addCleanup(prediction_cache.clear)
+        class_index.write_index('plant', {'Acer palmatum': 27, 'Monstera deliciosa': None},
+                                ['Acer palmatum', 'Monstera deliciosa'], 'mock')
+
+    def predict(self, label):
+        with patch.dict(os.environ, {'PERENUAL_API_KEY': 'k'}), \
+             patch('api.views.model.predict', return_value=[fake_result([label], [0], [0.9])]), \
+             patch('api.views.http_client.get') as mock_get:
+            mock_get.return_value = MagicMock(status_code=200, json=lambda: {'data': [{'id': 555}]})
+            resp = self.client.post(reverse('predict-image'), {'image': create_test_image()}, format='multipart')
+        return resp, mock_get
+
+    def test_indexed_class_does_not_call_perenual(self):
+        resp, mock_get = self.predict('Acer palmatum')
+        self.assertEqual(resp.data, {'plant_id': 27})
+        mock_get.assert_not_called()
+
+    def test_unmapped_class_falls_back_to_live_search(self):
+        resp, mock_get = self.predict('Monstera deliciosa')
+        self.assertEqual(resp.data, {'plant_id': 555})
+        self.assertEqual(mock_get.call_count, 1)
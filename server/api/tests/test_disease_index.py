@@ -0,0 +1,91 @@
+import os
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+from api import class_index, prediction_cache
+from api.disease_index import DiseaseMatcher, name_aliases, split_label
+from api.tests.test_class_index import TempIndexMixin
+from api.tests.test_prediction_cache import fake_result
+from api.tests.test_views import create_test_image
+
+ENTRIES = [
+    (5, 'Powdery mildew'),
+    (26, 'Powdery mildew'),
+    (18, 'Brown patch (large patch or Rhizoctonia blight )'),
+    (22, 'Apple scab'),
+    (14, 'Scab'),
+    (92, 'Cercospora leaf spot'),
+    (187, 'Late blight'),
+]
+
+
+class DiseaseMatcherTest(SimpleTestCase):
+    def setUp(self):
+        self.matcher = DiseaseMatcher(ENTRIES)
+
+    def test_split_label(self):
+        self.assertEqual(split_label('Corn_(maize)___Common_rust_'), ('Corn (maize)', 'Common rust'))
+        self.assertEqual(split_label('Late_blight'), ('', 'Late blight'))
+
+    def test_aliases_from_parentheses(self):
+        self.assertEqual(set(name_aliases('Brown patch (large patch or Rhizoctonia blight )')), {
+            'brown patch large patch or rhizoctonia blight', 'brown patch', 'large patch', 'rhizoctonia blight',
+        })
+
+    def test_exact_matches(self):
+        self.assertEqual(self.matcher.match('Tomato___Late_blight')[0], 187)
+        # "planta enfermedad" antes que solo la enfermedad
+        self.assertEqual(self.matcher.match('Apple___Scab')[0], 22)
+        self.assertEqual(self.matcher.match('Peach___Scab')[0], 14)
+        self.assertEqual(self.matcher.match('Turf___Rhizoctonia_blight')[0], 18)
+        # Nombre repetido: el id menor
+        self.assertEqual(self.matcher.match('Squash___Powdery_mildew')[0], 5)
+
+    def test_fuzzy_match_and_threshold(self):
+        issue_id, name, score = self.matcher.match('Corn_(maize)___Cercospora_leaf_spot Gray_leaf_spot')
+        self.assertEqual((issue_id, name), (92, 'cercospora leaf spot'))
+        self.assertLess(score, 1)
+        self.assertEqual(self.matcher.match('Tomato___Target_Spot')[0], None)
+
+    def test_repository_files_cover_common_labels(self):
+        matcher = DiseaseMatcher.from_files()
+        for label in ('Apple___Apple_scab', 'Potato___Early_blight', 'Tomato___Late_blight',
+                      'Orange___Haunglongbing_(Citrus_greening)', 'Apple___Cedar_apple_rust'):
+            self.assertIsNotNone(matcher.match(label)[0], label)
+
+
+class BuildDiseaseIndexTest(TempIndexMixin, SimpleTestCase):
+    def test_builds_disease_index_from_repository_files(self):
+        self.use_temp_weights_dir()
+        labels = ['Apple___Apple_scab', 'Apple___healthy', 'Tomato___Target_Spot']
+        with patch('api.management.commands.build_perenual_index.model_class_names', return_value=labels):
+            call_command('build_perenual_index', '--models', 'disease', stdout=StringIO())
+
+        self.assertEqual(class_index.load_ids('disease'),
+                         {'Apple___Apple_scab': 22, 'Apple___healthy': -1, 'Tomato___Target_Spot': None})
+        self.assertTrue(os.path.exists(os.path.join(self.tmp, 'perenual_issues.json')))
+
+
+class PredictPestDiseaseIndexTest(TempIndexMixin, APITestCase):
+    def setUp(self):
+        self.use_temp_weights_dir()
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user(username='diseaseuser', password='pwd'))
+        prediction_cache.clear()
+        self.addCleanup(prediction_cache.clear)
+        class_index.write_index('disease', {'Apple___Apple_scab': 22}, ['Apple___Apple_scab'], 'mock')
+
+    def test_indexed_label_never_touches_the_network(self):
+        with patch.dict(os.environ, {'PERENUAL_API_KEY': 'k'}), \
+             patch('api.views.model_disease.predict', return_value=[fake_result(['Apple___Apple_scab'], [0], [0.9])]), \
+             patch('api.views.http_client.get') as mock_get:
+            resp = self.client.post(reverse('predict-pest-image'), {'image': create_test_image()}, format='multipart')
+
+        self.assertEqual(resp.data, {'id': 22})
+        mock_get.assert_not_called()
@@ -0,0 +1,42 @@
+import json
+import os
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+from django.test import SimpleTestCase
+
+import diseases_parser
+from api.html_parsing import TagStrainer, has_classes, parse, parse_tree, text
+
+DATA_DIR = Path(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+PAGE = (
+    '<html><body><header><h1 class="text-5xl font-bold">Pests &gt; <b>Rust</b></h1></header>'
+    '<nav><a class="search-container-box" href="/nav">Menu</a></nav>'
+    '<main class="min-h-screen"><a class="search-container-box shadow relative" href="/1">'
+    '<div class="text-xl  font-bold\tline-clamp-2"> Fairy\n   <i>ring</i> </div></a></main></body></html>'
+)
+
+
+class HtmlParsingTest(SimpleTestCase):
+    def test_strainer_builds_only_matching_containers(self):
+        soup = parse(PAGE, TagStrainer(('a', {'class': has_classes('search-container-box', 'shadow')}),
+                                       (None, {'class': has_classes('text-5xl')})))
+        self.assertEqual([tag.name for tag in soup.find_all(recursive=False)], ['h1', 'a'])
+        self.assertEqual(soup.a['href'], '/1')
+        self.assertIsNone(soup.main)
+
+    def test_text_matches_beautifulsoup(self):
+        soup = BeautifulSoup(PAGE, 'html.parser')
+        tree = parse_tree(PAGE)
+        for selector, xpath in (('h1', '//h1'), ('main a div', '//main//div')):
+            self.assertEqual(text(tree.xpath(xpath)[0]), soup.select_one(selector).get_text(strip=True))
+
+    def test_diseases_page(self):
+        items = diseases_parser.parse_diseases(DATA_DIR / 'perenual_diseases.html')
+        with open(DATA_DIR / 'perenual_diseases_list.json', encoding='utf-8') as f:
+            cards = json.load(f)
+        self.assertEqual(len(items), 256)
+        self.assertEqual(items[0], {key: value for key, value in cards[0].items() if key != 'local_image'})
+        self.assertEqual([(item['id'], item['href']) for item in items],
+                         [(card['id'], card['href']) for card in cards])
@@ -0,0 +1,140 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch, MagicMock
+
+import httpx
+import requests
+from django.test import SimpleTestCase, override_settings
+
+from api import http_client
+
+
+class HttpClientTest(SimpleTestCase):
+    def setUp(self):
+        http_client.reset_stats()
+
+    def test_one_session_per_host(self):
+        a = http_client.session_for('https://perenual.com/api/v2/species-list')
+        b = http_client.session_for('https://perenual.com/api/species-care-guide-list')
+        c = http_client.session_for('https://api.openweathermap.org/data/2.5/weather')
+        self.assertIs(a, b)
+        self.assertIsNot(a, c)
+
+    def test_adapter_retries_on_429_and_5xx(self):
+        session = http_client.session_for('https://retry.example.com/')
+        retry = session.get_adapter('https://retry.example.com/').max_retries
+        self.assertGreater(retry.total, 0)
+        for code in (429, 500, 502, 503, 504):
+            self.assertIn(code, retry.status_forcelist)
+        self.assertFalse(retry.raise_on_status)
+
+    @override_settings(OUTBOUND_CONNECT_TIMEOUT=1.5, OUTBOUND_READ_TIMEOUT=7)
+    @patch('requests.Session.request')
+    def test_default_timeout_is_applied(self, mock_request):
+        mock_request.return_value = MagicMock(status_code=200)
+        http_client.get('https://timeout.example.com/a')
+        self.assertEqual(mock_request.call_args.kwargs['timeout'], (1.5, 7))
+
+        http_client.get('https://timeout.example.com/b', timeout=20)
+        self.assertEqual(mock_request.call_args.kwargs['timeout'], 20)
+
+    @patch('requests.Session.request')
+    def test_latency_is_recorded_per_host(self, mock_request):
+        mock_request.return_value = MagicMock(status_code=200)
+        http_client.get('https://metrics.example.com/ok')
+        mock_request.side_effect = requests.ConnectionError('down')
+        with self.assertRaises(requests.RequestException):
+            http_client.get('https://metrics.example.com/down')
+
+        stats = http_client.latency_stats()['metrics.example.com']
+        self.assertEqual(stats['count'], 2)
+        self.assertEqual(stats['errors'], 1)
+        self.assertEqual(sum(stats['buckets'].values()), 2)
+
+
+    @override_settings(OUTBOUND_MAX_RETRY_AFTER=5)
+    def test_long_retry_after_is_returned_without_waiting(self):
+        hits = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                hits.append(self.path)
+                self.send_response(429)
+                self.send_header('Retry-After', '0' if self.path == '/short' else '3600')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        base = f'http://127.0.0.1:{server.server_address[1]}'
+
+        start = time.monotonic()
+        self.assertEqual(http_client.get(f'{base}/long').status_code, 429)
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(hits, ['/long'])
+
+        # Un Retry-After dentro del límite se sigue respetando y reintentando
+        self.assertEqual(http_client.get(f'{base}/short').status_code, 429)
+        self.assertEqual(hits.count('/short'), 1 + http_client.session_for(base).get_adapter(base).max_retries.total)
+
+
+class AsyncHttpClientTest(SimpleTestCase):
+    def setUp(self):
+        http_client.reset_stats()
+
+    def mock_client(self, handler):
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    @override_settings(OUTBOUND_MAX_RETRIES=2, OUTBOUND_BACKOFF_FACTOR=0)
+    async def test_aget_retries_on_5xx(self):
+        statuses = iter([503, 502, 200])
+
+        def handler(request):
+            return httpx.Response(next(statuses), json={'ok': True})
+
+        with patch('api.http_client.async_client', return_value=self.mock_client(handler)):
+            response = await http_client.aget('https://async.example.com/a')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'ok': True})
+        self.assertEqual(http_client.latency_stats()['async.example.com']['count'], 1)
+
+    @override_settings(OUTBOUND_MAX_RETRIES=1, OUTBOUND_BACKOFF_FACTOR=0)
+    async def test_aget_returns_last_response_after_retries(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503)
+
+        with patch('api.http_client.async_client', return_value=self.mock_client(handler)):
+            response = await http_client.aget('https://async.example.com/b')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(http_client.latency_stats()['async.example.com']['errors'], 1)
+
+    @override_settings(OUTBOUND_MAX_RETRIES=2, OUTBOUND_MAX_RETRY_AFTER=5)
+    async def test_aget_does_not_sleep_for_a_long_retry_after(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(429, headers={'Retry-After': '3600'})
+
+        with patch('api.http_client.async_client', return_value=self.mock_client(handler)), \
+                patch('api.http_client.asyncio.sleep') as mock_sleep:
+            response = await http_client.aget('https://async.example.com/limited')
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(len(calls), 1)
+        mock_sleep.assert_not_called()
+
+    async def test_one_async_client_per_event_loop(self):
+        self.assertIs(http_client.async_client(), http_client.async_client())
@@ -0,0 +1,76 @@
+import os
+from io import BytesIO
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient, APITestCase
+
+from api import image_decode, prediction_cache
+
+
+def jpeg_bytes(size, color=(30, 120, 60)):
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+class DecodeImageTest(SimpleTestCase):
+    def test_reduced_flag_keeps_short_side_above_target(self):
+        self.assertEqual(image_decode.reduced_flag(4000, 3000, 224), cv2.IMREAD_REDUCED_COLOR_8)
+        self.assertEqual(image_decode.reduced_flag(1600, 1200, 224), cv2.IMREAD_REDUCED_COLOR_4)
+        self.assertEqual(image_decode.reduced_flag(640, 480, 224), cv2.IMREAD_REDUCED_COLOR_2)
+        self.assertEqual(image_decode.reduced_flag(300, 400, 224), cv2.IMREAD_COLOR)
+
+    def test_large_jpeg_is_decoded_at_reduced_resolution(self):
+        buffer = np.frombuffer(jpeg_bytes((4000, 3000)), dtype=np.uint8)
+        image = image_decode.decode_image(buffer, target_size=224)
+        self.assertEqual(image.shape, (375, 500, 3))
+        with override_settings(IMAGE_REDUCED_DECODE=False):
+            self.assertEqual(image_decode.decode_image(buffer, target_size=224).shape, (3000, 4000, 3))
+
+    def test_small_or_unknown_images(self):
+        small = np.frombuffer(jpeg_bytes((200, 100)), dtype=np.uint8)
+        self.assertEqual(image_decode.decode_image(small, target_size=224).shape, (100, 200, 3))
+        self.assertIsNone(image_decode.decode_image(np.frombuffer(b'not an image', dtype=np.uint8)))
+
+    def test_oversize_inputs_are_rejected_before_decoding(self):
+        buffer = np.frombuffer(jpeg_bytes((3000, 2000)), dtype=np.uint8)
+        with patch('api.image_decode.cv2.imdecode') as mock_decode:
+            with self.assertRaises(image_decode.ImageTooLarge):
+                image_decode.decode_image(buffer, max_pixels=5_000_000)
+            with self.assertRaises(image_decode.ImageTooLarge):
+                image_decode.decode_image(buffer, max_bytes=1024)
+        mock_decode.assert_not_called()
+
+    def test_read_buffer_without_copies(self):
+        data = jpeg_bytes((64, 64))
+        in_memory = image_decode.read_buffer(SimpleUploadedFile('a.jpg', data))
+        self.assertEqual(in_memory.tobytes(), data)
+        self.assertFalse(in_memory.flags.owndata)
+
+        temporary = TemporaryUploadedFile('b.jpg', 'image/jpeg', len(data), None)
+        temporary.write(data)
+        temporary.flush()
+        self.addCleanup(temporary.close)
+        self.assertEqual(image_decode.read_buffer(temporary).tobytes(), data)
+
+
+class PredictOversizeImageTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user(username='bigimg', password='pwd'))
+        prediction_cache.clear()
+
+    @override_settings(IMAGE_MAX_PIXELS=1_000_000)
+    def test_too_many_pixels_returns_413(self):
+        upload = SimpleUploadedFile('big.jpg', jpeg_bytes((1600, 1200)), content_type='image/jpeg')
+        with patch.dict(os.environ, {'PERENUAL_API_KEY': 'k'}), patch('api.views.model.predict') as mock_predict:
+            resp = self.client.post(reverse('predict-image'), {'image': upload}, format='multipart')
+        self.assertEqual(resp.status_code, 413)
+        mock_predict.assert_not_called()
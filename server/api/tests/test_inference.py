@@ -0,0 +1,140 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+import numpy as np
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from api.inference import BatchingPredictor, LazyPredictor
+
+
+class FakeModel:
+    """Devuelve como resultado la suma de cada imagen y anota el tamaño de cada batch."""
+
+    def __init__(self, delay=0.05, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.calls = []
+
+    def predict(self, source, **kwargs):
+        images = source if isinstance(source, list) else [source]
+        self.calls.append(len(images))
+        time.sleep(self.delay)
+        if self.fail_on is not None and any(int(img.sum()) == self.fail_on for img in images):
+            raise ValueError('bad image')
+        return [int(img.sum()) for img in images]
+
+
+class BatchingPredictorTest(SimpleTestCase):
+    def predict_concurrently(self, predictor, values):
+        results, errors = {}, {}
+
+        def one(value):
+            try:
+                results[value] = predictor.predict(np.full((2, 2), value, dtype=np.uint8))
+            except Exception as e:
+                errors[value] = e
+        threads = [threading.Thread(target=one, args=(v,)) for v in values]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results, errors
+
+    def test_concurrent_requests_share_one_forward_pass(self):
+        model = FakeModel()
+        predictor = BatchingPredictor(model, max_batch=8, max_wait_ms=200)
+
+        results, errors = self.predict_concurrently(predictor, range(1, 7))
+
+        self.assertEqual(errors, {})
+        self.assertEqual(results, {v: [v * 4] for v in range(1, 7)})
+        self.assertEqual(model.calls, [6])
+        self.assertEqual(predictor.stats()['largest_batch'], 6)
+
+    def test_batch_size_is_capped(self):
+        model = FakeModel()
+        predictor = BatchingPredictor(model, max_batch=4, max_wait_ms=200)
+        results, _ = self.predict_concurrently(predictor, range(1, 11))
+        self.assertEqual(len(results), 10)
+        self.assertTrue(all(size <= 4 for size in model.calls))
+
+    def test_bad_image_only_fails_its_own_request(self):
+        model = FakeModel(fail_on=12)
+        predictor = BatchingPredictor(model, max_batch=8, max_wait_ms=200)
+
+        results, errors = self.predict_concurrently(predictor, [1, 3, 5])
+
+        self.assertEqual(results, {1: [4], 5: [20]})
+        self.assertIsInstance(errors[3], ValueError)
+        self.assertEqual(predictor.stats()['batch_errors'], 1)
+
+    def test_timed_out_request_is_not_run(self):
+        model = FakeModel(delay=0.3)
+        predictor = BatchingPredictor(model, max_batch=8, max_wait_ms=1, timeout=0.05)
+
+        def first():
+            # Ya está en inferencia cuando vence su timeout: no se puede cancelar
+            with self.assertRaises(FuturesTimeoutError):
+                predictor.predict(np.ones((2, 2), dtype=np.uint8))
+        busy = threading.Thread(target=first)
+        busy.start()
+        time.sleep(0.02)
+        # Se captura como TimeoutError de concurrent.futures (en Python 3.9 no es el TimeoutError integrado)
+        with self.assertRaises(FuturesTimeoutError):
+            predictor.predict(np.full((2, 2), 2, dtype=np.uint8))
+        busy.join()
+        time.sleep(0.05)
+        self.assertEqual(model.calls, [1])
+
+    def test_close_stops_the_worker_thread(self):
+        predictor = BatchingPredictor(FakeModel(delay=0), max_batch=8, max_wait_ms=1)
+        self.assertEqual(predictor.predict(np.ones((2, 2), dtype=np.uint8)), [4])
+        worker = predictor._worker
+        predictor.close()
+        worker.join(timeout=1)
+        self.assertFalse(worker.is_alive())
+
+    def test_urls_and_disabled_batching_call_the_model_directly(self):
+        model = FakeModel(delay=0)
+        model.predict = lambda source, **kwargs: ['direct', source]
+        self.assertEqual(BatchingPredictor(model).predict('https://example.com/a.jpg'), ['direct', 'https://example.com/a.jpg'])
+        image = np.zeros((2, 2), dtype=np.uint8)
+        self.assertEqual(BatchingPredictor(model, max_batch=1).predict(image)[0], 'direct')
+
+
+class LazyPredictorTest(SimpleTestCase):
+    def test_model_is_loaded_once_on_first_prediction(self):
+        loads = []
+
+        def loader(name):
+            loads.append(name)
+            time.sleep(0.05)
+            return BatchingPredictor(FakeModel(delay=0), name=name, max_batch=1)
+        predictor = LazyPredictor('plant', loader=loader)
+        self.assertFalse(predictor.loaded)
+        self.assertEqual(predictor.stats(), {'loaded': False})
+
+        threads = [threading.Thread(target=predictor.predict, args=(np.ones((2, 2)),)) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(loads, ['plant'])
+        self.assertTrue(predictor.stats()['loaded'])
+
+    def test_importing_views_does_not_import_torch(self):
+        code = (
+            "import sys, django; django.setup(); import api.views; "
+            "print('loaded=' + ','.join(m for m in ('torch', 'ultralytics') if m in sys.modules))"
+        )
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='plants.settings', MODEL_WARMUP='False')
+        out = subprocess.run([sys.executable, '-c', code], cwd=settings.BASE_DIR, env=env,
+                             capture_output=True, text=True, timeout=120)
+        self.assertEqual(out.returncode, 0, out.stderr)
+        self.assertIn('loaded=', out.stdout.splitlines())
@@ -0,0 +1,68 @@
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from api import mock_catalog, views
+from api.mock_catalog import MockCatalog
+
+PLANTS = [
+    {'id': 1, 'common_name': 'European Silver Fir', 'scientific_name': ['Abies alba']},
+    {'id': 2, 'common_name': 'Pyramidalis Silver Fir', 'scientific_name': ['Abies alba Pyramidalis']},
+    {'id': 3, 'common_name': 'Japanese Maple', 'scientific_name': ['Acer palmatum']},
+]
+
+
+class MockCatalogTest(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'species.json')
+        self.write({'data': PLANTS})
+        self.catalog = MockCatalog('species.json', {'data': []}, mock_catalog._species_search_fields,
+                                   data_dir=tmp.name)
+
+    def write(self, data):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    def test_lookup_and_search_use_prebuilt_indexes(self):
+        self.assertEqual(self.catalog.get(3)['common_name'], 'Japanese Maple')
+        self.assertIsNone(self.catalog.get(99))
+        self.assertEqual([p['id'] for p in self.catalog.search('SILVER')], [1, 2])
+        self.assertEqual([p['id'] for p in self.catalog.search('palmatum')], [3])
+        self.assertEqual(len(self.catalog.search(None)), 3)
+
+    def test_file_is_read_once_and_reloaded_when_it_changes(self):
+        with patch('api.mock_catalog.json.load', wraps=json.load) as load:
+            self.catalog.get(1)
+            self.catalog.search('fir')
+            self.catalog.data()
+            self.assertEqual(load.call_count, 1)
+
+            self.write({'data': PLANTS[:1]})
+            os.utime(self.path, ns=(0, os.stat(self.path).st_mtime_ns + 10**9))
+            self.assertIsNone(self.catalog.get(3))
+            self.assertEqual(load.call_count, 2)
+
+    def test_missing_file_is_empty(self):
+        os.remove(self.path)
+        self.assertEqual(self.catalog.data(), {'data': []})
+        self.assertIsNone(self.catalog.get(1))
+
+
+class MockSpeciesHelpersTest(SimpleTestCase):
+    def test_species_details_are_copied(self):
+        details = views.get_mock_species_details('1')
+        details['common_name'] = 'changed'
+        self.assertNotEqual(views.get_mock_species_details(1)['common_name'], 'changed')
+        self.assertIsNone(views.get_mock_species_details(10**9))
+
+    def test_search_species_list_pages(self):
+        result = views.search_mock_species_list(None, page=1)
+        self.assertEqual(result['total'], len(mock_catalog.species_list.all()))
+        first = result['data'][0]
+        query = first['scientific_name'][0].upper()
+        self.assertIn(first, views.search_mock_species_list(query)['data'])
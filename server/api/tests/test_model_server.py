@@ -0,0 +1,124 @@
+import os
+import shutil
+import tempfile
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.model_server import ModelServer, ModelServerBusy, ModelServerUnavailable, RemotePredictor
+
+
+def fake_result():
+    probs = SimpleNamespace(top1=1, top1conf=0.9, top5=[1, 0], top5conf=[0.9, 0.1])
+    return SimpleNamespace(names={0: 'rose', 1: 'tulip'}, probs=probs)
+
+
+class FakePredictor:
+    def __init__(self, error=None):
+        self.error = error
+        self.sources = []
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def predict(self, source, **kwargs):
+        self.sources.append(source)
+        if self.error:
+            raise self.error
+        return [fake_result()]
+
+
+class ModelServerTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.address = os.path.join(self.tmp, 'models.sock')
+
+    def start_server(self, predictors, max_pending=4):
+        server = ModelServer(self.address, predictors, max_pending=max_pending)
+        server.listen()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.close)
+        return server
+
+    def test_prediction_round_trip(self):
+        plant = FakePredictor()
+        self.start_server({'plant': plant})
+
+        results = RemotePredictor('plant', self.address).predict('https://example.com/rose.jpg')
+
+        self.assertEqual(plant.sources, ['https://example.com/rose.jpg'])
+        self.assertEqual(results[0].names[results[0].probs.top1], 'tulip')
+        self.assertAlmostEqual(results[0].probs.top1conf.item(), 0.9, places=5)
+
+    def test_server_errors_keep_their_type(self):
+        self.start_server({'plant': FakePredictor(error=TypeError('bad type'))})
+        with self.assertRaises(TypeError):
+            RemotePredictor('plant', self.address).predict('x')
+
+    def test_busy_server_rejects_without_queueing(self):
+        plant = FakePredictor()
+        self.start_server({'plant': plant}, max_pending=0)
+        with self.assertRaises(ModelServerBusy):
+            RemotePredictor('plant', self.address).predict('x')
+        self.assertEqual(plant.sources, [])
+
+    def test_health(self):
+        self.start_server({'plant': FakePredictor()})
+        client = RemotePredictor('plant', self.address)
+        client.predict('x')
+        health = client.health()
+        self.assertEqual(health['status'], 'ok')
+        self.assertEqual(health['served'], 1)
+        self.assertEqual(health['pending'], 0)
+
+    def test_falls_back_to_local_model_when_server_is_down(self):
+        local = FakePredictor()
+        client = RemotePredictor('plant', self.address, fallback=lambda: local, retry_interval=60)
+
+        client.predict('a')
+        client.predict('b')
+
+        self.assertEqual(local.sources, ['a', 'b'])
+        stats = client.stats()
+        self.assertEqual(stats['unavailable'], 1)
+        self.assertEqual(stats['fallback'], 2)
+        self.assertEqual(client.health()['status'], 'down')
+
+    def test_local_model_is_released_when_server_answers_again(self):
+        local = FakePredictor()
+        client = RemotePredictor('plant', self.address, fallback=lambda: local, retry_interval=0)
+        client.predict('a')
+        self.assertTrue(client.stats()['fallback_loaded'])
+
+        self.start_server({'plant': FakePredictor()})
+        self.assertEqual(client.predict('b')[0].probs.top1, 1)
+
+        self.assertEqual(local.sources, ['a'])
+        self.assertTrue(local.closed)
+        stats = client.stats()
+        self.assertFalse(stats['fallback_loaded'])
+        self.assertEqual(stats['fallback_released'], 1)
+
+    def test_without_fallback_unavailable_is_raised(self):
+        with self.assertRaises(ModelServerUnavailable):
+            RemotePredictor('plant', self.address).predict('x')
+
+
+class PredictViewBackpressureTest(SimpleTestCase):
+    @patch('api.views.model.predict', side_effect=ModelServerBusy('busy'))
+    def test_busy_model_server_returns_503(self, _mock_predict):
+        r = APIClient().post(reverse('predict-image'), {'image_url': 'https://example.com/a.jpg'}, format='json')
+        self.assertEqual(r.status_code, 503)
+        self.assertEqual(r['Retry-After'], '1')
+
+    @patch('api.views.model.predict', side_effect=ModelServerUnavailable('down'))
+    def test_unavailable_model_server_returns_503(self, _mock_predict):
+        r = APIClient().post(reverse('predict-image'), {'image_url': 'https://example.com/a.jpg'}, format='json')
+        self.assertEqual(r.status_code, 503)
+        self.assertEqual(r.data['error'], 'Model server unavailable')
@@ -1,8 +1,12 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 from django.contrib.auth.models import User
 from django.db import IntegrityError
 
-from api.models import Garden, UserPlant, Post, Comment, Vote
+from api.models import Garden, UserPlant, Post, Comment, Vote, cast_vote
 
 
 class GardenModelTest(TestCase):
@@ -28,6 +32,43 @@ class UserPlantModelTest(TestCase):
         self.assertEqual(str(up), 'MiPlanta')
 
 
+class UserPlantDueDatesTest(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='due', password='pass')
+
+    def test_due_dates_are_computed_on_save(self):
+        last = date(2026, 1, 1)
+        up = UserPlant.objects.create(
+            owner=self.owner, last_watered_date=last, watering_type='manual',
+            watering_time=2, watering_unit='week', rotation_time=3, rotation_unit='day',
+        )
+        up.refresh_from_db()
+        self.assertEqual(up.next_watering_date, last + timedelta(days=14))
+        self.assertEqual(up.next_rotating_date, up.created_at.date())
+        self.assertIsNone(up.next_pruning_date)
+
+        up.last_rotating_date = last
+        up.save(update_fields=['last_rotating_date'])
+        up.refresh_from_db()
+        self.assertEqual(up.next_rotating_date, last + timedelta(days=3))
+
+    def test_backfill_command_fixes_rows_updated_without_save(self):
+        up = UserPlant.objects.create(owner=self.owner, isWateringReminder=False)
+        UserPlant.objects.filter(pk=up.pk).update(
+            isWateringReminder=True, last_watered_date=date(2026, 3, 1),
+            watering_type='recommended', watering_period={'value': '7-10', 'unit': 'days'},
+        )
+        out = StringIO()
+        call_command('backfill_due_dates', '--dry-run', stdout=out)
+        self.assertIn('1 con fechas desactualizadas', out.getvalue())
+        call_command('backfill_due_dates', stdout=StringIO())
+        up.refresh_from_db()
+        self.assertEqual(up.next_watering_date, date(2026, 3, 9))
+        out = StringIO()
+        call_command('backfill_due_dates', '--dry-run', stdout=out)
+        self.assertIn('0 con fechas desactualizadas', out.getvalue())
+
+
 class PostModelTest(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(username='puser', password='pass')
@@ -35,7 +76,7 @@ class PostModelTest(TestCase):
 
     def test_get_likes_dislikes_and_score(self):
         u2 = User.objects.create_user(username='u2', password='pass')
-        Vote.objects.create(user=u2, vote_type='like', post=self.post)
+        cast_vote(self.post, u2, 'like')
         self.assertEqual(self.post.get_likes_count(), 1)
         self.assertEqual(self.post.get_dislikes_count(), 0)
         self.assertEqual(self.post.get_vote_score(), 1)
@@ -43,9 +84,9 @@ class PostModelTest(TestCase):
     def test_get_vote_score_with_mixed_votes(self):
         # add a dislike and check counts and score (min 0)
         u2 = User.objects.create_user(username='u2', password='pass')
-        Vote.objects.create(user=u2, vote_type='like', post=self.post)
+        cast_vote(self.post, u2, 'like')
         u3 = User.objects.create_user(username='u3', password='pass')
-        Vote.objects.create(user=u3, vote_type='dislike', post=self.post)
+        cast_vote(self.post, u3, 'dislike')
         self.assertEqual(self.post.get_likes_count(), 1)
         self.assertEqual(self.post.get_dislikes_count(), 1)
         self.assertEqual(self.post.get_vote_score(), 0)
@@ -67,6 +108,46 @@ class VoteConstraintsTest(TestCase):
             Vote.objects.create(user=u1, vote_type='dislike', post=p)
 
 
+class CastVoteTest(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='author', password='pass')
+        self.voter = User.objects.create_user(username='voter', password='pass')
+        self.post = Post.objects.create(title='T', content='C', author=self.author)
+
+    def test_create_toggle_and_switch_keep_counters_in_sync(self):
+        self.assertEqual(cast_vote(self.post, self.voter, 'like'), 'created')
+        self.assertEqual((self.post.likes_count, self.post.dislikes_count), (1, 0))
+        self.assertEqual(cast_vote(self.post, self.voter, 'dislike'), 'updated')
+        self.assertEqual((self.post.likes_count, self.post.dislikes_count), (0, 1))
+        self.assertEqual(cast_vote(self.post, self.voter, 'dislike'), 'removed')
+        self.assertEqual((self.post.likes_count, self.post.dislikes_count), (0, 0))
+        self.assertFalse(Vote.objects.filter(post=self.post).exists())
+
+    def test_counters_never_go_negative(self):
+        Vote.objects.create(user=self.voter, vote_type='like', post=self.post)
+        # El contador está a 0 aunque exista el voto (desfase); quitarlo no baja de 0
+        self.assertEqual(cast_vote(self.post, self.voter, 'like'), 'removed')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 0)
+
+    def test_recount_votes_repairs_drift(self):
+        comment = Comment.objects.create(post=self.post, author=self.author, content='c')
+        Vote.objects.create(user=self.voter, vote_type='like', post=self.post)
+        Vote.objects.create(user=self.voter, vote_type='dislike', comment=comment)
+        Post.objects.filter(pk=self.post.pk).update(dislikes_count=5)
+
+        out = StringIO()
+        call_command('recount_votes', '--dry-run', stdout=out)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.dislikes_count, 5)
+
+        call_command('recount_votes', stdout=out)
+        self.post.refresh_from_db()
+        comment.refresh_from_db()
+        self.assertEqual((self.post.likes_count, self.post.dislikes_count), (1, 0))
+        self.assertEqual((comment.likes_count, comment.dislikes_count), (0, 1))
+
+
 class CommentModelTest(TestCase):
     def test_comment_str_and_vote_helpers(self):
         u1 = User.objects.create_user(username='cuser', password='pass')
@@ -75,7 +156,7 @@ class CommentModelTest(TestCase):
         self.assertIn('Comment by', str(comment))
         # votes on comment
         vuser = User.objects.create_user(username='v2', password='p')
-        Vote.objects.create(user=vuser, vote_type='like', comment=comment)
+        cast_vote(comment, vuser, 'like')
         self.assertEqual(comment.get_likes_count(), 1)
         self.assertEqual(comment.get_dislikes_count(), 0)
         self.assertEqual(comment.get_vote_score(), 1)
@@ -0,0 +1,74 @@
+import importlib.util
+import os
+import shutil
+import tempfile
+from unittest import skipUnless
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from api.inference import load_model
+from api.onnx_backend import OnnxClassifier, onnx_path, preprocess
+
+HAS_ONNX = all(importlib.util.find_spec(m) for m in ('onnx', 'onnxruntime'))
+
+
+def build_channel_classifier(path):
+    """Modelo ONNX mínimo: la clase es el canal (R, G, B) con mayor media."""
+    import onnx
+    from onnx import TensorProto, helper
+
+    graph = helper.make_graph(
+        [
+            helper.make_node('GlobalAveragePool', ['images'], ['pooled']),
+            helper.make_node('Flatten', ['pooled'], ['flat']),
+            helper.make_node('Softmax', ['flat'], ['output0'], axis=1),
+        ],
+        'channels',
+        [helper.make_tensor_value_info('images', TensorProto.FLOAT, ['batch', 3, 'height', 'width'])],
+        [helper.make_tensor_value_info('output0', TensorProto.FLOAT, ['batch', 3])],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', 13)], ir_version=8)
+    onnx.helper.set_model_props(model, {'names': "{0: 'red', 1: 'green', 2: 'blue'}", 'imgsz': '[32, 32]'})
+    onnx.save(model, path)
+
+
+class OnnxPathTest(SimpleTestCase):
+    def test_paths_next_to_weights(self):
+        self.assertEqual(onnx_path('./w/best.pt'), './w/best.onnx')
+        self.assertEqual(onnx_path('./w/best.pt', int8=True), './w/best.int8.onnx')
+
+    def test_unknown_backend_is_rejected(self):
+        with self.assertRaises(ValueError):
+            load_model('plant', backend='tensorrt')
+
+
+@skipUnless(HAS_ONNX, "onnx/onnxruntime no instalados")
+class OnnxClassifierTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.path = os.path.join(self.tmp, 'best.onnx')
+        build_channel_classifier(self.path)
+
+    def test_predicts_like_ultralytics_results(self):
+        classifier = OnnxClassifier(self.path)
+        red = np.zeros((40, 60, 3), dtype=np.uint8)
+        red[..., 2] = 255  # BGR
+        blue = np.zeros((50, 30, 3), dtype=np.uint8)
+        blue[..., 0] = 255
+
+        results = classifier.predict([red, blue])
+
+        self.assertEqual([r.names[r.probs.top1] for r in results], ['red', 'blue'])
+        self.assertGreater(results[0].probs.top1conf.item(), 0.4)
+        self.assertEqual(len(classifier.predict(red)), 1)
+
+    def test_preprocess_matches_ultralytics_transforms(self):
+        import cv2
+        from PIL import Image
+        from ultralytics.data.augment import classify_transforms
+
+        image = np.random.default_rng(0).integers(0, 255, (123, 201, 3), dtype=np.uint8)
+        expected = classify_transforms(64)(Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))).numpy()
+        np.testing.assert_allclose(preprocess(image, 64), expected, atol=1e-6)
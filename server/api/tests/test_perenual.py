@@ -0,0 +1,262 @@
+import threading
+import time
+from unittest.mock import patch, MagicMock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api import perenual
+from api.models import UserPlant
+from api.perenual import PerenualError, PerenualConfigError
+
+
+def make_response(status_code, payload=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = payload or {}
+    return response
+
+
+DETAILS = {
+    'id': 42,
+    'common_name': 'Mock Plant',
+    'care_guides': 'https://perenual.com/api/species-care-guide-list?species_id=42',
+}
+CARE_GUIDES = {'data': [{'section': [
+    {'type': 'watering', 'description': 'Water weekly'},
+    {'type': 'sunlight', 'description': 'Full sun'},
+]}]}
+
+
+@patch.dict('os.environ', {'PERENUAL_API_KEY': 'test-key'})
+class SpeciesDetailsCacheTest(TestCase):
+    def setUp(self):
+        perenual.clear_cache()
+
+    def tearDown(self):
+        perenual.clear_cache()
+
+    @patch('api.perenual.http_client.get')
+    def test_details_are_fetched_once_and_include_care_sections(self, mock_get):
+        mock_get.side_effect = [make_response(200, DETAILS), make_response(200, CARE_GUIDES)]
+
+        first = perenual.get_species_details(42)
+        second = perenual.get_species_details(42)
+
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(first['watering_long'], 'Water weekly')
+        self.assertEqual(first['sunlight_long'], 'Full sun')
+        self.assertEqual(second, first)
+        stats = perenual.cache_stats()
+        self.assertEqual(stats['upstream_calls'], 2)
+        self.assertEqual(stats['local_hits'], 2)
+
+    @patch('api.perenual.http_client.get')
+    def test_returned_dict_is_a_copy(self, mock_get):
+        mock_get.side_effect = [make_response(200, DETAILS), make_response(200, CARE_GUIDES)]
+        data = perenual.get_species_details(42)
+        data['posts'] = ['x']
+        self.assertNotIn('posts', perenual.get_species_details(42))
+
+    @patch('api.perenual.http_client.get')
+    def test_shared_cache_is_used_when_local_cache_is_empty(self, mock_get):
+        mock_get.side_effect = [make_response(200, DETAILS), make_response(200, CARE_GUIDES)]
+        perenual.get_species_details(42)
+        perenual._local_cache.clear()
+
+        data = perenual.get_species_details(42)
+
+        self.assertEqual(data['common_name'], 'Mock Plant')
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(perenual.cache_stats()['shared_hits'], 2)
+
+    @patch('api.perenual.http_client.get')
+    def test_not_found_is_cached(self, mock_get):
+        mock_get.return_value = make_response(404)
+        self.assertIsNone(perenual.get_species_details(7))
+        self.assertIsNone(perenual.get_species_details(7))
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(perenual.cache_stats()['negative_hits'], 2)
+
+    @patch('api.perenual.http_client.get')
+    def test_upstream_error_is_raised_and_not_cached(self, mock_get):
+        mock_get.return_value = make_response(503)
+        with self.assertRaises(PerenualError) as ctx:
+            perenual.get_species_details(8)
+        self.assertEqual(ctx.exception.status_code, 503)
+        with self.assertRaises(PerenualError):
+            perenual.get_species_details(8)
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('api.perenual.http_client.get')
+    def test_care_guide_failure_is_retried(self, mock_get):
+        mock_get.side_effect = [
+            make_response(200, DETAILS), make_response(500),
+            make_response(200, CARE_GUIDES),
+        ]
+        self.assertNotIn('watering_long', perenual.get_species_details(42))
+        self.assertEqual(perenual.get_species_details(42)['watering_long'], 'Water weekly')
+
+    @patch.dict('os.environ', {'PERENUAL_API_KEY': ''})
+    def test_missing_api_key_raises_config_error(self):
+        with self.assertRaises(PerenualConfigError) as ctx:
+            perenual.get_species_details(1)
+        self.assertEqual(ctx.exception.status_code, 500)
+        self.assertIn('PERENUAL_API_KEY', str(ctx.exception.data))
+
+
+@patch.dict('os.environ', {'PERENUAL_API_KEY': 'test-key'})
+class SingleFlightTest(TestCase):
+    def setUp(self):
+        perenual.clear_cache()
+
+    def tearDown(self):
+        perenual.clear_cache()
+
+    @patch('api.perenual.http_client.get')
+    def test_concurrent_misses_share_one_upstream_call(self, mock_get):
+        def slow_get(url, **kwargs):
+            time.sleep(0.2)
+            return make_response(200, {'id': 5, 'common_name': 'Slow Plant'})
+        mock_get.side_effect = slow_get
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(perenual.get_raw_species_details(5)))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(r['common_name'] == 'Slow Plant' for r in results))
+        self.assertEqual(perenual.cache_stats()['singleflight']['coalesced_local'], 4)
+
+    @patch('api.perenual.http_client.get')
+    def test_waits_for_lease_held_by_another_worker(self, mock_get):
+        shared = perenual._shared_cache()
+        shared.add('lease:species:6', 1, 5)
+
+        def other_worker():
+            time.sleep(0.1)
+            shared.set('species:6', {'id': 6, 'common_name': 'Remote Plant'})
+            shared.delete('lease:species:6')
+        threading.Thread(target=other_worker).start()
+
+        data = perenual.get_raw_species_details(6)
+
+        self.assertEqual(data['common_name'], 'Remote Plant')
+        mock_get.assert_not_called()
+        self.assertEqual(perenual.cache_stats()['singleflight']['coalesced_remote'], 1)
+
+    @patch('api.perenual.http_client.get')
+    def test_fetches_itself_when_remote_lease_is_released_without_value(self, mock_get):
+        mock_get.return_value = make_response(200, {'id': 7, 'common_name': 'Own Fetch'})
+        shared = perenual._shared_cache()
+        shared.add('lease:species:7', 1, 5)
+        threading.Timer(0.1, lambda: shared.delete('lease:species:7')).start()
+
+        data = perenual.get_raw_species_details(7)
+
+        self.assertEqual(data['common_name'], 'Own Fetch')
+        self.assertEqual(mock_get.call_count, 1)
+
+
+@patch.dict('os.environ', {'PERENUAL_API_KEY': 'test-key', 'USE_MOCK_DATA': 'False'})
+class SpeciesDetailsViewsTest(TestCase):
+    def setUp(self):
+        perenual.clear_cache()
+
+    def tearDown(self):
+        perenual.clear_cache()
+
+    @patch('api.perenual.http_client.get')
+    def test_plant_detail_view_reads_through_cache(self, mock_get):
+        mock_get.side_effect = [make_response(200, DETAILS), make_response(200, CARE_GUIDES)]
+        url = reverse('perenual-plant-detail', kwargs={'plant_id': 42})
+
+        first = self.client.get(url)
+        second = self.client.get(url)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data['watering_long'], 'Water weekly')
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('api.perenual.http_client.get')
+    def test_plant_detail_view_returns_404_for_unknown_plant(self, mock_get):
+        mock_get.return_value = make_response(404)
+        url = reverse('perenual-plant-detail', kwargs={'plant_id': 9})
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(mock_get.call_count, 1)
+
+
+@patch.dict('os.environ', {'PERENUAL_API_KEY': 'test-key', 'USE_MOCK_DATA': 'False'})
+class UserPlantDetailFanOutTest(TestCase):
+    def setUp(self):
+        perenual.clear_cache()
+        self.user = User.objects.create_user(username='fanout', password='pass1234')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.plant = UserPlant.objects.create(owner=self.user, plant_id=42)
+        self.url = reverse('plant-detail', kwargs={'pk': self.plant.id})
+
+    def tearDown(self):
+        perenual.clear_cache()
+
+    @patch('api.perenual.http_client.get')
+    def test_details_and_care_guides_are_requested_in_parallel(self, mock_get):
+        def slow_get(url, **kwargs):
+            time.sleep(0.3)
+            if 'care-guide' in url:
+                return make_response(200, CARE_GUIDES)
+            return make_response(200, DETAILS)
+        mock_get.side_effect = slow_get
+
+        start = time.monotonic()
+        r = self.client.get(self.url)
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.data['perenual_details']['watering_long'], 'Water weekly')
+        self.assertNotIn('partial', r.data['perenual_details'])
+        self.assertIn('posts', r.data)
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertLess(elapsed, 0.55)
+
+    @override_settings(PERENUAL_DETAIL_DEADLINE=0.3)
+    @patch('api.perenual.http_client.get')
+    def test_slow_care_guide_returns_partial_details(self, mock_get):
+        def slow_care_get(url, **kwargs):
+            if 'care-guide' in url:
+                time.sleep(1)
+                return make_response(200, CARE_GUIDES)
+            return make_response(200, DETAILS)
+        mock_get.side_effect = slow_care_get
+
+        r = self.client.get(self.url)
+
+        self.assertEqual(r.status_code, 200)
+        details = r.data['perenual_details']
+        self.assertEqual(details['common_name'], 'Mock Plant')
+        self.assertTrue(details['partial'])
+        self.assertNotIn('watering_long', details)
+
+    @override_settings(PERENUAL_DETAIL_DEADLINE=0.2)
+    @patch('api.perenual.http_client.get')
+    def test_slow_details_return_timeout_error_in_body(self, mock_get):
+        def slow_get(url, **kwargs):
+            time.sleep(0.6)
+            return make_response(200, DETAILS)
+        mock_get.side_effect = slow_get
+
+        r = self.client.get(self.url)
+
+        self.assertEqual(r.status_code, 200)
+        self.assertIn('Timeout', r.data['perenual_details']['error'])
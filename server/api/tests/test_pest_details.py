@@ -0,0 +1,102 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import pest_details
+from api.models import PestDetail
+from api.pest_details import format_sections
+
+HREF = 'https://perenual.com/pest-disease-search-finder/pest-disease/1'
+PAGE = (
+    '<main><div class="text-5xl font-bold">Pests > Fairy ring</div>'
+    '<div class="italic main-t-c my-2">Agrocybe</div><img src="/storage/ring.jpg">'
+    '<div class="rounded-md shadow p-3 mb-2 text-sm"><p>Symptoms</p><p>Rings of mushrooms.</p></div></main>'
+)
+
+
+def make_response(status_code, text='', headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.text = text
+    response.headers = headers or {}
+    return response
+
+
+class FormatSectionsTest(SimpleTestCase):
+    def test_headings_paragraphs_and_bullets(self):
+        raw = ("Intro line.\nkeeps going\nSymptoms\n- yellow leaves\n• spots\nThey spread.\n"
+               "1 - Remove leaves\nBurn them.\nWhy does it happen?")
+        self.assertEqual(format_sections([raw]), [
+            {'title': None, 'subtitle': None, 'paragraphs': ['Intro line. keeps going'], 'bullets': []},
+            {'title': 'Symptoms', 'subtitle': None, 'paragraphs': ['They spread.'],
+             'bullets': ['yellow leaves', 'spots']},
+            {'title': 'Remove leaves', 'subtitle': '1', 'paragraphs': ['Burn them.'], 'bullets': []},
+            {'title': 'Why does it happen?', 'subtitle': None, 'paragraphs': [], 'bullets': []},
+        ])
+
+
+class PestDetailStoreTest(TestCase):
+    def setUp(self):
+        pest_details.clear()
+
+    @patch('api.pest_details.http_client.get', return_value=make_response(200, PAGE, {'ETag': '"v1"'}))
+    def test_miss_is_parsed_once_and_stored(self, mock_get):
+        data = pest_details.get_detail(1, HREF)
+        self.assertEqual((data['name'], data['image']), ('Fairy ring', '/storage/ring.jpg'))
+        self.assertEqual(pest_details.get_detail(1, HREF), data)
+        pest_details.clear()
+        self.assertEqual(pest_details.get_detail(1, HREF), data)
+        mock_get.assert_called_once()
+        self.assertEqual(PestDetail.objects.get(pk=1).etag, '"v1"')
+
+    def test_stale_copy_is_revalidated_with_a_conditional_request(self):
+        with patch('api.pest_details.http_client.get', return_value=make_response(200, PAGE, {'ETag': '"v1"'})):
+            pest_details.get_detail(1, HREF)
+        PestDetail.objects.update(checked_at=timezone.now() - timedelta(days=30))
+        pest_details.clear()
+
+        with patch('api.pest_details.schedule_refresh') as mock_schedule:
+            self.assertEqual(pest_details.get_detail(1, HREF)['name'], 'Fairy ring')
+        mock_schedule.assert_called_once_with(1, HREF)
+
+        with patch('api.pest_details.http_client.get', return_value=make_response(304)) as mock_get:
+            self.assertEqual(pest_details.refresh(1, HREF)['name'], 'Fairy ring')
+        self.assertEqual(mock_get.call_args.kwargs['headers'], {'If-None-Match': '"v1"'})
+        self.assertGreater(PestDetail.objects.get(pk=1).checked_at, timezone.now() - timedelta(minutes=1))
+        self.assertEqual(pest_details.stats()['not_modified'], 1)
+
+    @patch('api.pest_details.http_client.get', return_value=make_response(200, PAGE))
+    def test_prefetch_command_skips_stored_pages(self, mock_get):
+        out = StringIO()
+        call_command('prefetch_pest_details', '--ids', '1', '2', '--delay', '0', stdout=out, stderr=StringIO())
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(PestDetail.objects.count(), 2)
+
+        call_command('prefetch_pest_details', '--ids', '1', '2', '--delay', '0', stdout=out, stderr=StringIO())
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertIn('0 de 2', out.getvalue())
+
+
+class PestDetailViewTest(TestCase):
+    def setUp(self):
+        pest_details.clear()
+        self.client = APIClient()
+
+    @patch('api.pest_details.http_client.get', return_value=make_response(200, PAGE))
+    def test_detail_is_served_from_the_store(self, mock_get):
+        for _ in range(2):
+            resp = self.client.get(reverse('perenual-pest-disease', args=[1]))
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(resp.data['sections'][0]['title'], 'Symptoms')
+        mock_get.assert_called_once()
+
+    @patch('api.pest_details.http_client.get', return_value=make_response(500))
+    def test_errors(self, _):
+        self.assertEqual(self.client.get(reverse('perenual-pest-disease', args=[1])).status_code, 502)
+        self.assertEqual(self.client.get(reverse('perenual-pest-disease', args=[999999])).status_code, 404)
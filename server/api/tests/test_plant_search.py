@@ -0,0 +1,89 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+from api.plant_search import PlantSearchIndex, parse_filters
+
+PLANTS = [
+    {'id': 1, 'common_name': 'European Silver Fir', 'scientific_name': ['Abies alba'],
+     'other_name': ['Common Silver Fir'], 'family': 'Pinaceae'},
+    {'id': 2, 'common_name': 'White Fir', 'scientific_name': ['Abies concolor'],
+     'other_name': ['Silver Fir'], 'family': 'Pinaceae'},
+    {'id': 3, 'common_name': 'Japanese Maple', 'scientific_name': ['Acer palmatum'],
+     'other_name': ['Momiji'], 'family': 'Sapindaceae'},
+    {'id': 4, 'common_name': 'Silverberry', 'scientific_name': ['Elaeagnus commutata'],
+     'other_name': [], 'family': None},
+    {'id': 5, 'common_name': 'Mimosa púdica', 'scientific_name': ['Mimosa pudica'],
+     'other_name': ['Sensitive plant'], 'family': 'Fabaceae'},
+]
+
+DETAILS = {
+    1: {'indoor': False, 'watering': 'Frequent', 'sunlight': ['full sun'], 'hardiness': {'min': '4', 'max': '6'}},
+    2: {'indoor': False, 'watering': 'Average', 'sunlight': ['Full sun', 'part shade'],
+        'hardiness': {'min': '3', 'max': '7'}},
+    3: {'indoor': False, 'watering': 'Average', 'sunlight': ['part sun/part shade'],
+        'hardiness': {'min': '5', 'max': '8'}},
+    5: {'indoor': True, 'watering': 'Average', 'sunlight': ['filtered shade'],
+        'hardiness': {'min': '10', 'max': '11'}},
+}
+
+
+def ids(results):
+    return [plant['id'] for plant in results]
+
+
+class PlantSearchIndexTest(SimpleTestCase):
+    def setUp(self):
+        self.index = PlantSearchIndex(PLANTS, DETAILS)
+
+    def test_prefix_typeahead_requires_every_word(self):
+        # Primero los nombres que empiezan por la consulta
+        self.assertEqual(ids(self.index.search('silv')), [4, 2, 1])
+        self.assertEqual(ids(self.index.search('silv fi')), [1, 2])
+        self.assertEqual(ids(self.index.search('abies con')), [2])
+        self.assertEqual(ids(self.index.search('fir maple')), [])
+
+    def test_ranking_prefers_common_names_and_whole_tokens(self):
+        # Nombre común por delante del sinónimo
+        self.assertEqual(ids(self.index.search('silver fir')), [1, 2])
+        # Familia y sinónimos también se indexan
+        self.assertEqual(ids(self.index.search('pinaceae')), [1, 2])
+        self.assertEqual(ids(self.index.search('momiji')), [3])
+
+    def test_accents_and_case_are_ignored(self):
+        self.assertEqual(ids(self.index.search('PUDICA')), [5])
+        self.assertEqual(ids(self.index.search('púd')), [5])
+
+    def test_empty_query_keeps_catalog_order(self):
+        self.assertEqual(ids(self.index.search('')), [1, 2, 3, 4, 5])
+
+    def test_filters(self):
+        search = self.index.search
+        self.assertEqual(ids(search(filters=parse_filters({'indoor': '1'}))), [5])
+        self.assertEqual(ids(search('fir', parse_filters({'watering': 'average'}))), [2])
+        self.assertEqual(ids(search(filters=parse_filters({'sunlight': 'full_sun'}))), [1, 2])
+        self.assertEqual(ids(search(filters=parse_filters({'sunlight': 'part_shade'}))), [2, 5])
+        self.assertEqual(ids(search(filters=parse_filters({'sunlight': 'sun-part_shade'}))), [3])
+        self.assertEqual(ids(search(filters=parse_filters({'hardiness': '7-9'}))), [2, 3])
+        self.assertEqual(ids(search(filters=parse_filters({'hardiness': '11'}))), [5])
+
+    def test_parse_filters_ignores_invalid_values(self):
+        self.assertEqual(parse_filters({'indoor': 'maybe', 'hardiness': 'cold', 'q': 'fir'}), {})
+
+
+class PerenualPlantListSearchTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user(username='searcher', password='pwd'))
+
+    @patch('api.views.should_use_mock_data', return_value=True)
+    def test_mock_mode_search_with_filters(self, _mock):
+        resp = self.client.get(reverse('perenual-plant-list'), {'q': 'fir', 'watering': 'frequent'})
+        self.assertEqual(resp.status_code, 200)
+        names = [plant['common_name'] for plant in resp.data['data']]
+        self.assertTrue(names)
+        self.assertTrue(all('Fir' in name for name in names))
+        self.assertEqual(resp.data['total'], len(names))
@@ -0,0 +1,136 @@
+import os
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+from api import prediction_cache
+from api.model_server import expand_result
+from api.tests.test_views import create_test_image
+
+
+def fake_result(names, top5, top5conf):
+    return expand_result({'names': names, 'top1': top5[0], 'top1conf': top5conf[0],
+                          'top5': top5, 'top5conf': top5conf})
+
+
+class PredictionCacheKeyTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.weights = os.path.join(self.tmp, 'best.pt')
+        with open(self.weights, 'wb') as f:
+            f.write(b'v1')
+        patcher = patch.dict('api.prediction_cache.MODEL_WEIGHTS', {'plant': self.weights})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_same_bytes_same_key(self):
+        self.assertEqual(prediction_cache.image_key('plant', data=b'abc'),
+                         prediction_cache.image_key('plant', data=b'abc'))
+        self.assertNotEqual(prediction_cache.image_key('plant', data=b'abc'),
+                            prediction_cache.image_key('plant', data=b'abd'))
+        self.assertNotEqual(prediction_cache.image_key('plant', data=b'http://x/a.jpg'),
+                            prediction_cache.image_key('plant', url='http://x/a.jpg'))
+
+    def test_new_weights_change_the_key(self):
+        key = prediction_cache.image_key('plant', data=b'abc')
+        with open(self.weights, 'wb') as f:
+            f.write(b'retrained')
+        os.utime(self.weights, ns=(1, 1))
+        self.assertNotEqual(prediction_cache.image_key('plant', data=b'abc'), key)
+
+    def test_backend_changes_the_key(self):
+        key = prediction_cache.image_key('plant', data=b'abc')
+        with override_settings(INFERENCE_BACKEND='onnx'):
+            self.assertNotEqual(prediction_cache.image_key('plant', data=b'abc'), key)
+
+    def test_top_k(self):
+        result = fake_result({0: 'rose', 1: 'fern', 2: 'cactus'}, [2, 0, 1], [0.75, 0.125, 0.125])
+        self.assertEqual(prediction_cache.top_k(result, k=2), [
+            {'label': 'cactus', 'confidence': 0.75},
+            {'label': 'rose', 'confidence': 0.125},
+        ])
+
+
+class PredictViewsCacheTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user(username='cacheuser', password='pwd'))
+        prediction_cache.clear()
+        self.addCleanup(prediction_cache.clear)
+        env = patch.dict(os.environ, {'PERENUAL_API_KEY': 'test-key'})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def perenual_response(self, issue_or_plant_id):
+        response = MagicMock(status_code=200)
+        response.json.return_value = {'data': [{'id': issue_or_plant_id}]}
+        return response
+
+    def test_repeated_upload_skips_model_and_perenual(self):
+        url = reverse('predict-image')
+        with patch('api.views.model.predict') as mock_predict, patch('api.views.http_client.get') as mock_get:
+            mock_predict.return_value = [fake_result(['Monstera', 'Ficus'], [0, 1], [0.9, 0.1])]
+            mock_get.return_value = self.perenual_response(321)
+
+            first = self.client.post(url, {'image': create_test_image('a.jpg')}, format='multipart')
+            second = self.client.post(url, {'image': create_test_image('b.jpg')}, format='multipart')
+
+        self.assertEqual(first.data, {'plant_id': 321})
+        self.assertEqual(second.data, {'plant_id': 321})
+        self.assertEqual(mock_predict.call_count, 1)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(prediction_cache.stats()['hits'], 1)
+
+    def test_different_images_and_urls_are_cached_separately(self):
+        url = reverse('predict-image')
+        with patch('api.views.model.predict') as mock_predict, patch('api.views.http_client.get') as mock_get:
+            mock_predict.return_value = [fake_result(['Monstera'], [0], [0.9])]
+            mock_get.return_value = self.perenual_response(321)
+
+            self.client.post(url, {'image': create_test_image(color='red')}, format='multipart')
+            self.client.post(url, {'image': create_test_image(color='blue')}, format='multipart')
+            self.client.post(url, {'image_url': 'http://example.com/a.jpg'}, format='json')
+            self.client.post(url, {'image_url': 'http://example.com/a.jpg'}, format='json')
+
+        self.assertEqual(mock_predict.call_count, 3)
+
+    def test_unresolved_plant_is_retried_without_running_the_model(self):
+        url = reverse('predict-image')
+        with patch('api.views.model.predict') as mock_predict, patch('api.views.http_client.get') as mock_get:
+            mock_predict.return_value = [fake_result(['Monstera'], [0], [0.9])]
+            mock_get.side_effect = [Exception('timeout'), self.perenual_response(321)]
+
+            self.client.post(url, {'image': create_test_image()}, format='multipart')
+            resp = self.client.post(url, {'image': create_test_image()}, format='multipart')
+
+        self.assertEqual(resp.data, {'plant_id': 321})
+        self.assertEqual(mock_predict.call_count, 1)
+        self.assertEqual(mock_get.call_count, 2)
+
+    def test_repeated_disease_upload_returns_cached_issue(self):
+        url = reverse('predict-pest-image')
+        with patch('api.views.model_disease.predict') as mock_predict, patch('api.views.http_client.get') as mock_get:
+            mock_predict.return_value = [fake_result(['Tomato___Late_blight'], [0], [0.95])]
+            mock_get.return_value = self.perenual_response(555)
+
+            first = self.client.post(url, {'image': create_test_image()}, format='multipart')
+            second = self.client.post(url, {'image': create_test_image()}, format='multipart')
+
+        self.assertEqual(first.data, {'id': 555})
+        self.assertEqual(second.data, {'id': 555})
+        self.assertEqual(mock_predict.call_count, 1)
+        self.assertEqual(mock_get.call_count, 1)
+
+    def test_corrupt_upload_is_not_cached(self):
+        url = reverse('predict-image')
+        with patch('api.image_decode.cv2.imdecode', return_value=None) as mock_decode:
+            self.client.post(url, {'image': create_test_image()}, format='multipart')
+            resp = self.client.post(url, {'image': create_test_image()}, format='multipart')
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(mock_decode.call_count, 2)
@@ -9,7 +9,7 @@ from api.serializers import (
     VoteSerializer, CommentSerializer, PostSerializer,
     UserPlantSerializer, UserRegisterSerializer, ChangePasswordSerializer
 )
-from api.models import Post, Comment, Vote, UserPlant
+from api.models import Post, Comment, UserPlant, cast_vote
 
 
 class VoteSerializerTest(TestCase):
@@ -60,7 +60,7 @@ class PostSerializerTest(TestCase):
 
     def test_vote_and_counts(self):
         u2 = User.objects.create_user('u2', 'u2@example.com', 'p')
-        Vote.objects.create(user=u2, vote_type='like', post=self.post)
+        cast_vote(self.post, u2, 'like')
         s = PostSerializer(self.post, context={'request': None})
         self.assertEqual(s.data['likes_count'], 1)
         self.assertEqual(s.data['dislikes_count'], 0)
@@ -0,0 +1,196 @@
+import os
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
+
+from api import species_mirror
+from api.management.commands.sync_species import RateLimiter
+from api.models import Species, SpeciesCareSection, SyncCheckpoint
+from api.perenual import PerenualError
+
+
+def list_item(plant_id, name):
+    return {'id': plant_id, 'common_name': name, 'scientific_name': [f'Plantus {name.lower()}'],
+            'other_name': [], 'family': 'Testaceae', 'genus': 'Plantus',
+            'default_image': {'thumbnail': f'https://img.example/{plant_id}.jpg'}}
+
+
+def details(plant_id, name, **extra):
+    return {**list_item(plant_id, name), 'indoor': False, 'watering': 'Average', 'sunlight': ['full sun'],
+            'hardiness': {'min': '5', 'max': '7'}, 'care_guides': 'https://perenual.example/care',
+            'watering_long': f'Water {name} weekly.', 'pruning': 'Prune in spring.', **extra}
+
+
+class SpeciesMirrorTestMixin:
+    def setUp(self):
+        super().setUp()
+        species_mirror.clear()
+        env = patch.dict(os.environ, {'PERENUAL_API_KEY': 'k'})
+        env.start()
+        self.addCleanup(env.stop)
+
+
+class SpeciesMirrorStoreTest(SpeciesMirrorTestMixin, TestCase):
+    def test_details_round_trip_with_care_sections(self):
+        species_mirror.store_details(1, details(1, 'Fir'))
+        species = Species.objects.get(pk=1)
+        self.assertEqual((species.hardiness_min, species.hardiness_max, species.watering), (5, 7, 'Average'))
+        self.assertNotIn('watering_long', species.details)
+        self.assertEqual(species_mirror.row_details(species_mirror.load(1)), details(1, 'Fir'))
+
+    def test_missing_care_sections_keep_the_previous_copy(self):
+        species_mirror.store_details(1, details(1, 'Fir'))
+        data = details(1, 'Fir', watering='Frequent')
+        del data['watering_long'], data['pruning']
+        species_mirror.store_details(1, data)
+        result = species_mirror.row_details(species_mirror.load(1))
+        self.assertEqual(result['watering'], 'Frequent')
+        self.assertEqual(result['watering_long'], 'Water Fir weekly.')
+        self.assertEqual(SpeciesCareSection.objects.count(), 2)
+
+    def test_list_pages_do_not_mark_details_as_synced(self):
+        species_mirror.store_list_page([list_item(1, 'Fir'), list_item(2, 'Maple')])
+        species_mirror.store_list_page([list_item(2, 'Red Maple')])
+        self.assertEqual(Species.objects.get(pk=2).common_name, 'Red Maple')
+        self.assertIsNone(species_mirror.load(1))
+
+
+class SpeciesMirrorDetailsTest(SpeciesMirrorTestMixin, TestCase):
+    def make_stale(self, plant_id):
+        Species.objects.filter(pk=plant_id).update(details_synced_at=timezone.now() - timedelta(days=400))
+
+    @patch('api.species_mirror.perenual.get_species_details', return_value=details(3, 'Maple'))
+    def test_miss_fetches_once_and_stores(self, mock_api):
+        self.assertEqual(species_mirror.get_species_details(3)['common_name'], 'Maple')
+        self.assertEqual(species_mirror.get_species_details('3')['watering_long'], 'Water Maple weekly.')
+        mock_api.assert_called_once()
+
+    @patch('api.species_mirror.schedule_refresh')
+    def test_stale_copy_is_served_and_refreshed_in_background(self, mock_schedule):
+        species_mirror.store_details(1, details(1, 'Fir'))
+        self.make_stale(1)
+        self.assertEqual(species_mirror.get_species_details(1)['common_name'], 'Fir')
+        mock_schedule.assert_called_once_with(1)
+
+    @override_settings(SPECIES_MIRROR_STALE_WHILE_REVALIDATE=False)
+    def test_stale_copy_is_refreshed_before_answering(self):
+        species_mirror.store_details(1, details(1, 'Fir'))
+        self.make_stale(1)
+        with patch('api.species_mirror.perenual.fetch_species_details', return_value=details(1, 'Noble Fir')):
+            self.assertEqual(species_mirror.get_species_details(1)['common_name'], 'Noble Fir')
+        self.make_stale(1)
+        with patch('api.species_mirror.perenual.fetch_species_details', side_effect=PerenualError('down')):
+            self.assertEqual(species_mirror.get_species_details(1)['common_name'], 'Noble Fir')
+
+
+@override_settings(SPECIES_MIRROR=True)
+class SpeciesMirrorViewsTest(SpeciesMirrorTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user(username='mirror', password='pwd'))
+        mock_data = patch('api.views.should_use_mock_data', return_value=False)
+        mock_data.start()
+        self.addCleanup(mock_data.stop)
+        species_mirror.store_details(1, details(1, 'European Silver Fir'))
+        species_mirror.store_details(2, details(2, 'Japanese Maple', watering='Frequent'))
+
+    @patch('api.views.http_client.get')
+    def test_plant_detail_and_list_are_served_locally(self, mock_get):
+        resp = self.client.get(reverse('perenual-plant-detail', args=[1]))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['watering_long'], 'Water European Silver Fir weekly.')
+
+        resp = self.client.get(reverse('perenual-plant-list'), {'q': 'japan'})
+        self.assertEqual([p['id'] for p in resp.data['data']], [2])
+        resp = self.client.get(reverse('perenual-plant-list'), {'watering': 'frequent'})
+        self.assertEqual(resp.data['total'], 1)
+        mock_get.assert_not_called()
+
+
+class SyncSpeciesCommandTest(SpeciesMirrorTestMixin, TestCase):
+    PAGES = {1: [list_item(1, 'Fir'), list_item(2, 'Maple')], 2: [list_item(3, 'Oak')], 3: [list_item(4, 'Rose')]}
+
+    def fetch_page(self, page):
+        self.pages_fetched.append(page)
+        return {'data': self.PAGES[page], 'last_page': len(self.PAGES)}
+
+    def fetch_details(self, plant_id):
+        self.details_fetched.append(plant_id)
+        return details(plant_id, self.names[plant_id])
+
+    def sync(self, *args):
+        out = StringIO()
+        with patch('api.perenual.fetch_species_list_page', side_effect=self.fetch_page), \
+                patch('api.perenual.fetch_species_details', side_effect=self.fetch_details):
+            call_command('sync_species', '--rate', '0', *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def setUp(self):
+        super().setUp()
+        self.pages_fetched, self.details_fetched = [], []
+        self.names = {item['id']: item['common_name'] for page in self.PAGES.values() for item in page}
+
+    def test_full_sync(self):
+        output = self.sync()
+        self.assertIn('completada', output)
+        self.assertEqual(sorted(self.pages_fetched), [1, 2, 3])
+        self.assertEqual(sorted(self.details_fetched), [1, 2, 3, 4])
+        self.assertEqual(Species.objects.filter(details_synced_at__isnull=False).count(), 4)
+        self.assertTrue(SyncCheckpoint.objects.get(name='species_list').data['completed_at'])
+
+    def test_interrupted_sync_resumes_without_repeating_work(self):
+        # 1 página + 2 para la siguiente + 1 especie (2 llamadas) = 5 llamadas
+        output = self.sync('--max-requests', '5', '--concurrency', '1')
+        self.assertIn('Interrumpido', output)
+        self.assertEqual(self.pages_fetched, [1, 2, 3])
+        self.assertEqual(self.details_fetched, [1])
+
+        self.sync()
+        self.assertEqual(self.pages_fetched, [1, 2, 3])
+        self.assertEqual(self.details_fetched, [1, 2, 3, 4])
+
+    def test_rate_limited_by_perenual_stops_and_keeps_progress(self):
+        def fetch_details(plant_id):
+            if plant_id == 3:
+                raise PerenualError('Too many requests', status_code=429)
+            return details(plant_id, self.names[plant_id])
+
+        self.fetch_details = fetch_details
+        output = self.sync('--concurrency', '1')
+        self.assertIn('429', output)
+        self.assertEqual(list(Species.objects.filter(details_synced_at__isnull=True).values_list('id', flat=True)),
+                         [3, 4])
+
+    def test_refresh_by_ids(self):
+        self.sync()
+        self.names[2] = 'Red Maple'
+        self.details_fetched = []
+        self.sync('--ids', '2')
+        self.assertEqual(self.details_fetched, [2])
+        self.assertEqual(Species.objects.get(pk=2).common_name, 'Red Maple')
+
+
+class RateLimiterTest(TestCase):
+    def test_spacing_and_budget(self):
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        limiter = RateLimiter(per_minute=60, budget=5, clock=lambda: now[0], sleep=sleep)
+        self.assertTrue(limiter.acquire())
+        self.assertTrue(limiter.acquire(2))
+        self.assertTrue(limiter.acquire())
+        self.assertEqual(sleeps, [1.0, 2.0])
+        self.assertFalse(limiter.acquire(2))
+        self.assertTrue(limiter.acquire())
@@ -0,0 +1,91 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api import suggest
+from api.suggest import SuggestIndex
+
+
+def names(results):
+    return [item['name'] for item in results]
+
+
+class SuggestIndexTest(SimpleTestCase):
+    def setUp(self):
+        self.index = SuggestIndex([
+            ('plant', 1, 'Japanese Maple', ['Acer palmatum']),
+            ('plant', 2, 'Maple', []),
+            ('plant', 3, 'Red Maple', ['Acer rubrum', 'Swamp Maple']),
+            ('plant', 4, 'Amur Maple', ['Acer ginnala']),
+            ('plant', 5, 'Árbol del Fuego', []),
+        ])
+
+    def lookup(self, prefix, limit=10):
+        ranked = sorted(self.index.lookup(prefix), key=lambda candidate: candidate[0])
+        return [suggestion for _, suggestion in ranked[:limit]]
+
+    def test_name_prefix_before_interior_words_then_shorter(self):
+        self.assertEqual(names(self.lookup('map')), ['Maple', 'Red Maple', 'Amur Maple', 'Japanese Maple'])
+        self.assertEqual(names(self.lookup('japanese m')), ['Japanese Maple'])
+
+    def test_aliases_match_and_say_which(self):
+        self.assertEqual(self.lookup('swamp'), [{'type': 'plant', 'id': 3, 'name': 'Red Maple',
+                                                 'matched': 'Swamp Maple'}])
+        self.assertEqual(names(self.lookup('acer')), ['Red Maple', 'Amur Maple', 'Japanese Maple'])
+
+    def test_keys_are_normalized(self):
+        self.assertEqual(names(self.lookup('arbol')), ['Árbol del Fuego'])
+        self.assertEqual(names(self.lookup('fue')), ['Árbol del Fuego'])
+        self.assertEqual(self.lookup('zzz'), [])
+
+
+class SuggestTest(SimpleTestCase):
+    def setUp(self):
+        suggest.clear()
+
+    def test_plants_and_pests_from_local_data(self):
+        results, _ = suggest.suggest('rus', limit=3)
+        self.assertEqual(results[0], {'type': 'pest', 'id': 6, 'name': 'Rust'})
+        results, _ = suggest.suggest('noble', kinds=('plant',))
+        self.assertEqual(results, [{'type': 'plant', 'id': 9, 'name': 'Noble Fir'}])
+
+    def test_responses_are_cached_per_prefix(self):
+        first = suggest.suggest('fir', limit=5)
+        with patch.object(SuggestIndex, 'lookup', side_effect=AssertionError('not cached')):
+            self.assertIs(suggest.suggest(' FIR ', limit=5), first)
+        self.assertNotEqual(suggest.suggest('fir', limit=6)[1], first[1])
+
+
+@patch('api.views.should_use_mock_data', return_value=True)
+class SuggestViewTest(SimpleTestCase):
+    def setUp(self):
+        suggest.clear()
+        self.client = APIClient()
+
+    @override_settings(SUGGEST_MAX_AGE=120)
+    def test_etag_and_cache_control(self, _):
+        resp = self.client.get(reverse('suggest'), {'q': 'fir', 'type': 'plant', 'limit': 3})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['query'], 'fir')
+        self.assertEqual(len(resp.data['results']), 3)
+        self.assertIn('max-age=120', resp['Cache-Control'])
+        self.assertIn('public', resp['Cache-Control'])
+
+        resp = self.client.get(reverse('suggest'), {'q': 'fir', 'type': 'plant', 'limit': 3},
+                               HTTP_IF_NONE_MATCH=resp['ETag'])
+        self.assertEqual(resp.status_code, 304)
+        self.assertFalse(resp.content)
+
+    @override_settings(SUGGEST_MAX_LIMIT=2)
+    def test_limit_is_capped_and_type_validated(self, _):
+        resp = self.client.get(reverse('suggest'), {'q': 'a', 'limit': 50})
+        self.assertEqual(len(resp.data['results']), 2)
+        self.assertEqual(self.client.get(reverse('suggest'), {'q': 'a', 'type': 'tree'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('suggest'), {'q': 'a', 'limit': 'x'}).status_code, 400)
+
+    def test_pest_list_search(self, _):
+        resp = self.client.get(reverse('perenual-pest-disease'), {'q': 'RUST'})
+        self.assertTrue(resp.data)
+        self.assertTrue(all('rust' in card['name'].lower() for card in resp.data))
@@ -0,0 +1,153 @@
+import hashlib
+import tracemalloc
+from io import BytesIO
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.http.multipartparser import MultiPartParser
+from django.test import SimpleTestCase, override_settings
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+from api.image_decode import HEADER_BYTES
+from api.tests.test_image_decode import jpeg_bytes
+from api.uploads import ImageUploadHandler, UnsupportedImage, UploadTooLarge, sniff_image_type
+
+MB = 1024 * 1024
+
+
+class CountingStream(BytesIO):
+    """Cuerpo de la petición que cuenta cuántos bytes ha leído el parser."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+class ChunkedBuffer(BytesIO):
+    """Buffer en memoria de la subida que anota cada lectura y no admite copiarlo entero."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.reads = []
+
+    def read(self, size=-1):
+        self.reads.append(size)
+        return super().read(size)
+
+    def getvalue(self):
+        raise AssertionError("el buffer se copia entero")
+
+
+def multipart_body(content, name='photo.jpg'):
+    return encode_multipart(BOUNDARY, {'image': SimpleUploadedFile(name, content)})
+
+
+def parse(body, **handler_options):
+    meta = {'CONTENT_TYPE': MULTIPART_CONTENT, 'CONTENT_LENGTH': str(len(body))}
+    handler = ImageUploadHandler(**handler_options)
+    return MultiPartParser(meta, BytesIO(body), [handler]).parse()[1]
+
+
+class SniffImageTypeTest(SimpleTestCase):
+    def test_signatures(self):
+        self.assertEqual(sniff_image_type(jpeg_bytes((8, 8))[:16]), 'image/jpeg')
+        self.assertEqual(sniff_image_type(b'\x89PNG\r\n\x1a\n\x00\x00'), 'image/png')
+        self.assertEqual(sniff_image_type(b'RIFF\x00\x00\x00\x00WEBPVP8 '), 'image/webp')
+        self.assertIsNone(sniff_image_type(b'%PDF-1.7'))
+        self.assertIsNone(sniff_image_type(b'<html><body>'))
+
+
+class ImageUploadHandlerTest(SimpleTestCase):
+    def test_small_upload_stays_in_memory_with_streamed_hash(self):
+        content = jpeg_bytes((64, 64))
+        files = parse(multipart_body(content))
+        upload = files['image']
+        self.assertNotIsInstance(upload, TemporaryUploadedFile)
+        self.assertEqual(upload.read(), content)
+        self.assertEqual(upload.sha256, hashlib.sha256(content).hexdigest())
+
+    def test_large_upload_spools_to_disk_within_memory_ceiling(self):
+        # JPEG válido seguido de relleno: 6 MB en total
+        content = jpeg_bytes((640, 480))
+        content += b'\0' * (6 * MB - len(content))
+        body = multipart_body(content)
+        memory_limit = 1 * MB
+
+        tracemalloc.start()
+        try:
+            files = parse(body, memory_limit=memory_limit, max_bytes=8 * MB)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        upload = files['image']
+        self.addCleanup(upload.close)
+        self.assertIsInstance(upload, TemporaryUploadedFile)
+        self.assertEqual(upload.size, len(content))
+        self.assertEqual(upload.sha256, hashlib.sha256(content).hexdigest())
+        # Techo documentado: límite en memoria + un trozo + cabecera para PIL (+ margen del parser)
+        ceiling = memory_limit + ImageUploadHandler.chunk_size + HEADER_BYTES + 512 * 1024
+        self.assertLess(peak, ceiling)
+
+    def test_spooling_streams_the_memory_buffer_in_chunks(self):
+        content = jpeg_bytes((64, 64)) + b'\1' * (MB // 2)
+        handler = ImageUploadHandler()
+        handler.new_file('image', 'photo.jpg', 'image/jpeg', None)
+        buffer = handler.file = ChunkedBuffer(content)
+        buffer.seek(0, 2)
+
+        handler._spool_to_disk()
+
+        spooled = handler.file
+        self.addCleanup(spooled.close)
+        self.assertIsInstance(spooled, TemporaryUploadedFile)
+        self.assertGreater(len(buffer.reads), 1)
+        self.assertTrue(all(0 < size <= ImageUploadHandler.chunk_size for size in buffer.reads))
+        spooled.seek(0)
+        self.assertEqual(spooled.read(), content)
+
+    def test_non_image_is_rejected_on_first_chunk(self):
+        body = multipart_body(b'%PDF-1.7\n' + b'x' * (5 * MB), name='doc.pdf')
+        stream = CountingStream(body)
+        meta = {'CONTENT_TYPE': MULTIPART_CONTENT, 'CONTENT_LENGTH': str(len(body))}
+        with self.assertRaises(UnsupportedImage):
+            MultiPartParser(meta, stream, [ImageUploadHandler()]).parse()
+        self.assertLess(stream.bytes_read, 256 * 1024)
+
+    def test_content_length_over_limit_is_rejected_before_reading(self):
+        body = multipart_body(jpeg_bytes((64, 64)) + b'\0' * (2 * MB))
+        stream = CountingStream(body)
+        meta = {'CONTENT_TYPE': MULTIPART_CONTENT, 'CONTENT_LENGTH': str(len(body))}
+        with self.assertRaises(UploadTooLarge):
+            MultiPartParser(meta, stream, [ImageUploadHandler(max_bytes=1 * MB)]).parse()
+        self.assertEqual(stream.bytes_read, 0)
+
+    def test_too_many_pixels_is_rejected_from_the_header(self):
+        with self.assertRaises(UploadTooLarge):
+            parse(multipart_body(jpeg_bytes((2000, 2000))), max_pixels=1_000_000)
+
+
+class ImageEndpointUploadTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user(username='uploader', password='pwd'))
+
+    def test_predict_rejects_non_images_with_415(self):
+        upload = SimpleUploadedFile('notes.txt', b'just some text, not a photo', content_type='image/jpeg')
+        resp = self.client.post(reverse('predict-image'), {'image': upload}, format='multipart')
+        self.assertEqual(resp.status_code, 415)
+
+    @override_settings(MEDIA_UPLOAD_MAX_BYTES=64 * 1024)
+    def test_post_image_over_endpoint_limit_returns_413(self):
+        content = jpeg_bytes((64, 64)) + b'\0' * (128 * 1024)
+        upload = SimpleUploadedFile('big.jpg', content, content_type='image/jpeg')
+        resp = self.client.post(reverse('user-posts'), {'title': 't', 'content': 'c', 'image': upload},
+                                format='multipart')
+        self.assertEqual(resp.status_code, 413)
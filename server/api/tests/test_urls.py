@@ -66,3 +66,8 @@ class UrlsTest(SimpleTestCase):
         url = reverse('comment-detail', kwargs={'pk': 1})
         resolver = resolve(url)
         self.assertEqual(resolver.func.view_class, views.CommentDetailView)
+
+    def test_metrics_url_resolves(self):
+        url = reverse('metrics')
+        resolver = resolve(url)
+        self.assertEqual(resolver.func.view_class, views.MetricsView)
@@ -10,9 +10,11 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework.test import APIRequestFactory
 from rest_framework_simplejwt.views import TokenVerifyView
 from PIL import Image
-from io import BytesIO
+from io import BytesIO, StringIO
+from django.core.management import call_command
 import os
 
+from api import prediction_cache
 from api.models import Garden, UserPlant, Post, Comment, Vote
 
 
@@ -185,6 +187,10 @@ class ViewsTest(APITestCase):
         resp = self.client.post(url, {'vote_type': 'like'}, format='json')
         self.assertEqual(resp.status_code, 200)
         self.assertEqual(resp.data['action'], 'updated')
+        self.assertEqual(resp.data['likes_count'], 1)
+        self.assertEqual(resp.data['dislikes_count'], 0)
+        post.refresh_from_db()
+        self.assertEqual((post.likes_count, post.dislikes_count), (1, 0))
 
     def test_comment_vote(self):
         post = Post.objects.create(title='V2', content='C', author=self.other)
@@ -232,7 +238,7 @@ class UserPlantViewsTest(APITestCase):
 
     @patch('api.views.should_use_mock_data', return_value=True)
     @patch('api.views.get_mock_species_details')
-    @patch('api.views.requests.get')
+    @patch('api.views.http_client.get')
     def test_create_userplant_success(self, mock_requests_get, mock_get_mock, _mock_should):
         perenual_data = {
             'common_name': 'Test Plant',
@@ -285,7 +291,7 @@ class UserPlantViewsTest(APITestCase):
 
     @patch('api.views.should_use_mock_data', return_value=True)
     @patch('api.views.get_mock_species_details')
-    @patch('api.views.requests.get')
+    @patch('api.views.http_client.get')
     def test_create_userplant_image_download_fail_returns_400(self, mock_requests_get, mock_get_mock, _mock_should):
         perenual_data = {
             'common_name': 'MockPlant',
@@ -346,6 +352,33 @@ class UserPlantViewsTest(APITestCase):
         self.assertEqual(len(r.data['next_tasks']), 0)
         self.assertEqual(len(r.data['previous_tasks']), 0)
 
+    def test_user_tasks_are_bucketed_and_reference_plants_by_id(self):
+        today = timezone.localdate()
+        due = UserPlant.objects.create(
+            owner=self.user, plant_id=1, last_watered_date=today - timedelta(days=7),
+            watering_type='manual', watering_time=1, watering_unit='week',
+            pruning_time=1, pruning_time_unit='month', last_pruning_date=today - timedelta(days=40),
+        )
+        later = UserPlant.objects.create(
+            owner=self.user, plant_id=2, last_watered_date=today,
+            watering_type='manual', watering_time=3, watering_unit='day',
+        )
+        UserPlant.objects.create(owner=self.user, plant_id=3, isWateringReminder=False)
+        with self.assertNumQueries(2):
+            r = self.client.get(reverse('user-tasks'))
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.data['today_tasks'], [{'type': 'watering', 'next_date': today, 'user_plant': due.id}])
+        self.assertEqual(r.data['previous_tasks'], [
+            {'type': 'pruning', 'next_date': today - timedelta(days=10), 'user_plant': due.id},
+        ])
+        self.assertEqual(r.data['next_tasks'], [
+            {'type': 'watering', 'next_date': today + timedelta(days=3), 'user_plant': later.id},
+        ])
+        # Cada planta con tareas aparece una sola vez; la planta sin tareas no se serializa
+        self.assertEqual(set(r.data['plants']), {due.id, later.id})
+        self.assertEqual(r.data['plants'][due.id]['plant_id'], 1)
+
+
 
 class AuthTokenFlowTests(APITestCase):
     def setUp(self):
@@ -436,6 +469,7 @@ class UploadImageHandlingTests(APITestCase):
         self.client = APIClient()
         self.user = User.objects.create_user(username='imguser', password='pwd123')
         self.client.force_authenticate(user=self.user)
+        prediction_cache.clear()
 
     @skipIf(os.getenv('CI', 'false').lower() == 'true', "Skip in CI - model loading issues")
     def test_predict_image_from_file(self):
@@ -443,9 +477,9 @@ class UploadImageHandlingTests(APITestCase):
         upload = create_test_image('img.jpg')
 
         # Prepare mocks for cv2.imdecode, model.predict and requests.get
-        with patch('api.views.cv2.imdecode') as mock_imdecode, \
+        with patch('api.image_decode.cv2.imdecode') as mock_imdecode, \
              patch('api.views.model.predict') as mock_predict, \
-             patch('api.views.requests.get') as mock_requests_get:
+             patch('api.views.http_client.get') as mock_requests_get:
 
             # cv2.imdecode should return a numpy-like object (non-None)
             mock_imdecode.return_value = MagicMock()
@@ -474,7 +508,7 @@ class UploadImageHandlingTests(APITestCase):
         url = reverse('predict-image')
         upload = create_test_image('bad.jpg')
 
-        with patch('api.views.cv2.imdecode') as mock_imdecode:
+        with patch('api.image_decode.cv2.imdecode') as mock_imdecode:
             mock_imdecode.return_value = None
             resp = self.client.post(url, {'image': upload}, format='multipart')
             self.assertEqual(resp.status_code, 400)
@@ -512,12 +546,13 @@ class AdditionalEdgeCaseTests(APITestCase):
         self.client = APIClient()
         self.user = User.objects.create_user(username='edgeuser', password='edgepwd')
         self.client.force_authenticate(user=self.user)
+        prediction_cache.clear()
 
     @skipIf(os.getenv('CI', 'false').lower() == 'true', "Skip in CI - model loading issues")
     def test_predict_image_with_image_url_uses_model_and_returns_plant(self):
         url = reverse('predict-image')
         image_url = 'http://example.com/remote.jpg'
-        with patch('api.views.model.predict') as mock_predict, patch('api.views.requests.get') as mock_requests_get:
+        with patch('api.views.model.predict') as mock_predict, patch('api.views.http_client.get') as mock_requests_get:
             mock_result = MagicMock()
             probs = MagicMock()
             probs.top1 = 0
@@ -544,7 +579,7 @@ class AdditionalEdgeCaseTests(APITestCase):
     def test_predict_image_model_raises_typeerror_returns_400_with_hint(self):
         url = reverse('predict-image')
         upload = create_test_image('img.jpg')
-        with patch('api.views.cv2.imdecode') as mock_imdecode, patch('api.views.model.predict') as mock_predict:
+        with patch('api.image_decode.cv2.imdecode') as mock_imdecode, patch('api.views.model.predict') as mock_predict:
             mock_imdecode.return_value = MagicMock()
             mock_predict.side_effect = TypeError('bad type')
             resp = self.client.post(url, {'image': upload}, format='multipart')
@@ -554,7 +589,7 @@ class AdditionalEdgeCaseTests(APITestCase):
     def test_diagnose_healthy_plant(self):
         url = reverse('predict-pest-image')
         upload = create_test_image('d.jpg')
-        with patch('api.views.cv2.imdecode') as mock_imdecode, patch('api.views.model_disease.predict') as mock_predict:
+        with patch('api.image_decode.cv2.imdecode') as mock_imdecode, patch('api.views.model_disease.predict') as mock_predict:
             mock_imdecode.return_value = MagicMock()
             # healthy label
             mock_result = MagicMock()
@@ -573,7 +608,7 @@ class AdditionalEdgeCaseTests(APITestCase):
     def test_diagnose_diseased_plant(self):
         url = reverse('predict-pest-image')
         upload = create_test_image('d.jpg')
-        with patch('api.views.cv2.imdecode') as mock_imdecode, patch('api.views.model_disease.predict') as mock_predict, patch('api.views.requests.get') as mock_requests_get:
+        with patch('api.image_decode.cv2.imdecode') as mock_imdecode, patch('api.views.model_disease.predict') as mock_predict, patch('api.views.http_client.get') as mock_requests_get:
             mock_imdecode.return_value = MagicMock()
             # disease found -> mock requests.get search
             mock_result = MagicMock()
@@ -596,7 +631,7 @@ class AdditionalEdgeCaseTests(APITestCase):
     def test_predict_image_missing_perenual_api_key_returns_500(self):
         url = reverse('predict-image')
         upload = create_test_image('img.jpg')
-        with patch('api.views.cv2.imdecode') as mock_imdecode, patch('api.views.model.predict') as mock_predict, patch('api.views.os.getenv') as mock_getenv:
+        with patch('api.image_decode.cv2.imdecode') as mock_imdecode, patch('api.views.model.predict') as mock_predict, patch('api.views.os.getenv') as mock_getenv:
             mock_imdecode.return_value = MagicMock()
             mock_result = MagicMock()
             probs = MagicMock()
@@ -654,3 +689,146 @@ class AdditionalEdgeCaseTests(APITestCase):
         r = self.client.post(url, {'content': 'only'}, format='json')
         self.assertEqual(r.status_code, 400)
         self.assertIn('title', str(r.data))
+
+
+class VoteQueryCountTest(APITestCase):
+    """El número de consultas de las vistas de posts no depende de cuántos posts,
+    comentarios o votos haya (sin N+1)."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='reader', password='pass1234')
+        self.voters = [User.objects.create_user(username=f'voter{i}', password='pass1234') for i in range(3)]
+        self.client.force_authenticate(user=self.user)
+
+    def create_posts(self, count, comments_per_post=3):
+        posts = []
+        for i in range(count):
+            post = Post.objects.create(title=f'Post {i}', content='c', author=self.user, plant_id=42)
+            for voter in self.voters:
+                Vote.objects.create(user=voter, post=post, vote_type='like')
+            Vote.objects.create(user=self.user, post=post, vote_type='dislike')
+            for j in range(comments_per_post):
+                comment = Comment.objects.create(post=post, author=self.voters[j % 3], content=f'c{j}')
+                Vote.objects.create(user=self.voters[0], comment=comment, vote_type='dislike')
+                Vote.objects.create(user=self.user, comment=comment, vote_type='like')
+            posts.append(post)
+        # Los votos se crean directamente: recalcular los contadores
+        call_command('recount_votes', stdout=StringIO())
+        return posts
+
+    def test_user_posts_query_count_is_constant(self):
+        self.create_posts(10)
+        # posts + votos del usuario en posts + comentarios + votos del usuario en comentarios
+        with self.assertNumQueries(4):
+            r = self.client.get(reverse('user-posts'))
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(len(r.data), 10)
+        post = r.data[0]
+        self.assertEqual(post['likes_count'], 3)
+        self.assertEqual(post['dislikes_count'], 1)
+        self.assertEqual(post['vote_score'], 2)
+        self.assertEqual(post['user_vote'], 'dislike')
+        comment = post['comments'][0]
+        self.assertEqual(comment['likes_count'], 1)
+        self.assertEqual(comment['dislikes_count'], 1)
+        self.assertEqual(comment['user_vote'], 'like')
+        self.assertEqual(comment['post']['id'], post['id'])
+
+    def test_post_detail_query_count_is_constant(self):
+        post = self.create_posts(1, comments_per_post=10)[0]
+        with self.assertNumQueries(4):
+            r = self.client.get(reverse('post-detail', kwargs={'pk': post.id}))
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(len(r.data['comments']), 10)
+        self.assertEqual(r.data['user_vote'], 'dislike')
+
+    @patch('api.views.should_use_mock_data', return_value=True)
+    @patch('api.views.get_mock_species_details', return_value={'id': 42, 'common_name': 'Mock'})
+    def test_perenual_plant_detail_query_count_is_constant(self, _mock_details, _mock_should):
+        self.create_posts(10)
+        # posts + votos del usuario en posts (la ficha no incluye los comentarios)
+        with self.assertNumQueries(2):
+            r = self.client.get(reverse('perenual-plant-detail', kwargs={'plant_id': 42}))
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(len(r.data['posts']), 10)
+        self.assertNotIn('comments', r.data['posts'][0])
+
+    def test_anonymous_reader_does_not_prefetch_user_votes(self):
+        self.create_posts(5)
+        post = Post.objects.first()
+        anon = APIClient()
+        # post + comentarios
+        with self.assertNumQueries(2):
+            r = anon.get(reverse('post-detail', kwargs={'pk': post.id}))
+        self.assertIsNone(r.data['user_vote'])
+        self.assertEqual(r.data['likes_count'], 3)
+
+
+class PostFeedPaginationTest(APITestCase):
+    """Feed de posts y comentarios paginados por cursor (keyset sobre created_at, id)."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='feeder', password='pass1234')
+        self.client.force_authenticate(user=self.user)
+        now = timezone.now()
+        self.posts = []
+        for i in range(25):
+            post = Post.objects.create(title=f'Post {i}', content='c', author=self.user, plant_id=42 if i % 2 else 7)
+            # Varios posts comparten created_at: el id desempata
+            Post.objects.filter(pk=post.pk).update(created_at=now - timedelta(minutes=i // 3))
+            self.posts.append(post)
+
+    def collect(self, url, params=None):
+        ids, cursor = [], None
+        while True:
+            query = dict(params or {}, limit=4)
+            if cursor:
+                query['cursor'] = cursor
+            r = self.client.get(url, query)
+            self.assertEqual(r.status_code, 200)
+            ids.extend(item['id'] for item in r.data['results'])
+            cursor = r.data['next_cursor']
+            if not cursor:
+                return ids
+
+    def test_feed_walks_all_posts_newest_first_without_duplicates(self):
+        ids = self.collect(reverse('post-feed'))
+        expected = list(Post.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_feed_filters_by_plant(self):
+        ids = self.collect(reverse('post-feed'), {'plant_id': 42})
+        self.assertEqual(sorted(ids), sorted(p.id for p in self.posts if p.plant_id == 42))
+
+    def test_invalid_cursor_and_plant_id_return_400(self):
+        self.assertEqual(self.client.get(reverse('post-feed'), {'cursor': 'nope'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('post-feed'), {'plant_id': 'x'}).status_code, 400)
+
+    def test_post_comments_are_paginated_oldest_first(self):
+        post = self.posts[0]
+        comments = [Comment.objects.create(post=post, author=self.user, content=f'c{i}') for i in range(9)]
+        Comment.objects.filter(pk=comments[1].pk).update(is_deleted=True)
+        ids = self.collect(reverse('post-comments', kwargs={'pk': post.id}))
+        self.assertEqual(ids, [c.id for c in comments if c.pk != comments[1].pk])
+        self.assertEqual(self.client.get(reverse('post-comments', kwargs={'pk': 999999})).status_code, 404)
+
+    @patch('api.views.should_use_mock_data', return_value=True)
+    @patch('api.views.get_mock_species_details', return_value={'id': 42, 'common_name': 'Mock'})
+    def test_plant_detail_embeds_first_page_only(self, _mock_details, _mock_should):
+        with self.settings(POSTS_PAGE_SIZE=5):
+            r = self.client.get(reverse('perenual-plant-detail', kwargs={'plant_id': 42}))
+        self.assertEqual(len(r.data['posts']), 5)
+        r2 = self.client.get(reverse('post-feed'), {'plant_id': 42, 'cursor': r.data['posts_next_cursor'], 'limit': 50})
+        ids = [p['id'] for p in r.data['posts']] + [p['id'] for p in r2.data['results']]
+        self.assertEqual(sorted(ids), sorted(p.id for p in self.posts if p.plant_id == 42))
+        self.assertIsNone(r2.data['next_cursor'])
+
+    def test_user_posts_keeps_list_without_pagination_params(self):
+        r = self.client.get(reverse('user-posts'))
+        self.assertIsInstance(r.data, list)
+        self.assertEqual(len(r.data), 25)
+        r = self.client.get(reverse('user-posts'), {'limit': 10})
+        self.assertEqual(len(r.data['results']), 10)
+        self.assertIsNotNone(r.data['next_cursor'])
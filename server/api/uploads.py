@@ -0,0 +1,176 @@
+"""Subida de imágenes en streaming para las vistas que reciben fotos.
+
+Con los handlers por defecto de Django una subida grande se guarda entera (en
+memoria o en disco) antes de que la vista pueda validarla. ImageUploadHandler la
+procesa trozo a trozo (chunk_size, 64 KB):
+
+- Rechaza la petición antes de leer el cuerpo si Content-Length ya supera el
+  máximo del endpoint (413), y en cuanto los bytes recibidos lo superan.
+- Comprueba la firma (magic bytes) del primer trozo: lo que no es JPEG, PNG, WebP,
+  GIF, BMP o TIFF se rechaza (415) sin leer el resto.
+- Lee las dimensiones de la cabecera en cuanto llegan y rechaza (413) las que
+  superan IMAGE_MAX_PIXELS, sin decodificar la imagen.
+- Calcula el sha256 a medida que llegan los datos (`uploaded.sha256`), que usa la
+  caché de predicciones en lugar de volver a leer el fichero.
+- Guarda hasta IMAGE_UPLOAD_MEMORY_LIMIT bytes en memoria; a partir de ahí copia lo
+  recibido a un fichero temporal, trozo a trozo para no duplicar el buffer, y sigue
+  escribiendo en disco.
+
+Memoria por subida en curso, como máximo: IMAGE_UPLOAD_MEMORY_LIMIT (2.5 MB por
+defecto) + un trozo (64 KB) + la cabecera que se pasa a PIL (image_decode.HEADER_BYTES,
+256 KB), es decir ~2.8 MB, sea cual sea el tamaño del fichero.
+"""
+import hashlib
+import shutil
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .image_decode import HEADER_BYTES, ImageTooLarge, image_size
+
+# Margen para los campos de texto y las cabeceras multipart al comprobar Content-Length
+FORM_OVERHEAD = 256 * 1024
+SNIFF_BYTES = 16
+
+
+class UploadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Uploaded file is too large.'
+    default_code = 'upload_too_large'
+
+
+class UnsupportedImage(APIException):
+    status_code = status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+    default_detail = 'Unsupported image type. Upload a jpg, png, webp, gif, bmp or tiff file.'
+    default_code = 'unsupported_image'
+
+
+def sniff_image_type(head):
+    """Tipo MIME según los primeros bytes del fichero, o None si no es una imagen soportada."""
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    if head.startswith((b'GIF87a', b'GIF89a')):
+        return 'image/gif'
+    if head.startswith(b'BM'):
+        return 'image/bmp'
+    if head.startswith((b'II*\x00', b'MM\x00*')):
+        return 'image/tiff'
+    return None
+
+
+class ImageUploadHandler(FileUploadHandler):
+    chunk_size = 64 * 1024
+
+    def __init__(self, request=None, max_bytes=None, memory_limit=None, max_pixels=None):
+        super().__init__(request)
+        self.max_bytes = max_bytes or getattr(settings, 'IMAGE_MAX_BYTES', 20 * 1024 * 1024)
+        self.memory_limit = memory_limit or getattr(settings, 'IMAGE_UPLOAD_MEMORY_LIMIT',
+                                                    settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+        self.max_pixels = max_pixels or getattr(settings, 'IMAGE_MAX_PIXELS', 50_000_000)
+        self.file = None
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length and content_length > self.max_bytes + FORM_OVERHEAD:
+            raise UploadTooLarge(self._too_large_message())
+        return None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.file = BytesIO()
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+        self.head = bytearray()
+        self.sniffed = False
+        self.dimensions_checked = False
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+        if self.size > self.max_bytes:
+            self._reject(UploadTooLarge(self._too_large_message()))
+        if not self.dimensions_checked:
+            self.head += raw_data[:HEADER_BYTES - len(self.head)]
+            self._inspect_head(complete=False)
+        self.sha256.update(raw_data)
+        if isinstance(self.file, BytesIO) and self.size > self.memory_limit:
+            self._spool_to_disk()
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if not self.dimensions_checked:
+            self._inspect_head(complete=True)
+        self.file.seek(0)
+        if isinstance(self.file, TemporaryUploadedFile):
+            uploaded = self.file
+            uploaded.size = file_size
+        else:
+            uploaded = InMemoryUploadedFile(
+                file=self.file, field_name=self.field_name, name=self.file_name,
+                content_type=self.content_type, size=file_size, charset=self.charset,
+                content_type_extra=self.content_type_extra,
+            )
+        uploaded.sha256 = self.sha256.hexdigest()
+        self.file, self.head = None, None
+        return uploaded
+
+    def upload_interrupted(self):
+        if self.file is not None:
+            self.file.close()
+
+    def _inspect_head(self, complete):
+        if not self.sniffed and (len(self.head) >= SNIFF_BYTES or complete):
+            if sniff_image_type(bytes(self.head[:SNIFF_BYTES])) is None:
+                self._reject(UnsupportedImage())
+            self.sniffed = True
+        if not self.sniffed:
+            return
+        try:
+            size = image_size(self.head)
+        except ImageTooLarge as e:
+            self._reject(UploadTooLarge(str(e)))
+        if size is not None:
+            width, height = size
+            if width * height > self.max_pixels:
+                self._reject(UploadTooLarge(
+                    f"Image is {width}x{height}; the limit is {self.max_pixels // 1_000_000} MP."))
+            self.dimensions_checked = True
+        elif complete or len(self.head) >= HEADER_BYTES:
+            # PIL no encuentra las dimensiones en la cabecera: se decide al decodificar
+            self.dimensions_checked = True
+        if self.dimensions_checked:
+            self.head = None
+
+    def _spool_to_disk(self):
+        spooled = TemporaryUploadedFile(self.file_name, self.content_type, 0, self.charset, self.content_type_extra)
+        self.file.seek(0)
+        shutil.copyfileobj(self.file, spooled, self.chunk_size)
+        self.file.close()
+        self.file = spooled
+
+    def _reject(self, exc):
+        self.upload_interrupted()
+        self.file = None
+        raise exc
+
+    def _too_large_message(self):
+        return f"Uploaded file is larger than {self.max_bytes // (1024 * 1024)} MB."
+
+
+class ImageUploadMixin:
+    """Para APIViews que reciben imágenes multipart: usa ImageUploadHandler con el
+    máximo de bytes del ajuste `upload_max_bytes_setting`."""
+
+    upload_max_bytes_setting = 'IMAGE_MAX_BYTES'
+
+    def initialize_request(self, request, *args, **kwargs):
+        max_bytes = getattr(settings, self.upload_max_bytes_setting, None)
+        request.upload_handlers = [ImageUploadHandler(request, max_bytes=max_bytes)]
+        return super().initialize_request(request, *args, **kwargs)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework_simplejwt.views import TokenRefreshView
 
@@ -8,6 +9,8 @@ from .views import (
     PostVoteView,
     CommentVoteView,
     UserPostView,
+    PostFeedView,
+    PostCommentsView,
     PostDetailView,
     CommentView,
     CommentDetailView,
@@ -27,8 +30,20 @@ from .views import (
     CurrentUserView,
     ChangePasswordView,
     GardenTemplatesView,
+    MetricsView,
+    SuggestView,
+    AsyncPerenualPlantListView,
+    AsyncPerenualPlantDetailView,
+    AsyncWeatherRecommendationView,
+    AsyncPerenualPestDiseaseDetailView,
 )
 
+
+def _view(sync_view, async_view):
+    """Con ASGI las vistas que solo esperan a APIs externas se sirven en su versión async."""
+    return (async_view if settings.ASYNC_VIEWS else sync_view).as_view()
+
+
 urlpatterns = [
     path('gardens/', GardenListCreateView.as_view(), name='garden-list-create'),
     path('gardens/simple/', GardenListNameView.as_view(), name='user-gardens-simple'),
@@ -45,15 +60,19 @@ urlpatterns = [
     path('user-tasks/', UserTasksView.as_view(), name='user-tasks'),
     path('predict/', PredictImageView.as_view(), name='predict-image'),
     path('predict/pest/', PredictPestDiseaseView.as_view(), name='predict-pest-image'),
-    path('weather/', WeatherRecommendationView.as_view(), name='weather-recommendation'),
+    path('weather/', _view(WeatherRecommendationView, AsyncWeatherRecommendationView), name='weather-recommendation'),
     path('user-posts/', UserPostView.as_view(), name='user-posts'),
+    path('posts/', PostFeedView.as_view(), name='post-feed'),
     path('posts/<int:pk>/', PostDetailView.as_view(), name='post-detail'),
+    path('posts/<int:pk>/comments/', PostCommentsView.as_view(), name='post-comments'),
     path('posts/<int:pk>/vote/', PostVoteView.as_view(), name='post-vote'),
     path('comments/', CommentView.as_view(), name='comment-list-create'),
     path('comments/<int:pk>/', CommentDetailView.as_view(), name='comment-detail'),
     path('comments/<int:pk>/vote/', CommentVoteView.as_view(), name='comment-vote'),
-    path('perenual/plants/', PerenualPlantListView.as_view(), name='perenual-plant-list'),
-    path('perenual/plants/<int:plant_id>/', PerenualPlantDetailView.as_view(), name='perenual-plant-detail'),
+    path('perenual/plants/', _view(PerenualPlantListView, AsyncPerenualPlantListView), name='perenual-plant-list'),
+    path('perenual/plants/<int:plant_id>/', _view(PerenualPlantDetailView, AsyncPerenualPlantDetailView), name='perenual-plant-detail'),
     path('perenual/pests/', PerenualPestDiseaseView.as_view(), name='perenual-pest-disease'),
-    path('perenual/pests/<int:pest_id>/', PerenualPestDiseaseDetailView.as_view(), name='perenual-pest-disease'),
+    path('perenual/pests/<int:pest_id>/', _view(PerenualPestDiseaseDetailView, AsyncPerenualPestDiseaseDetailView), name='perenual-pest-disease'),
+    path('suggest/', SuggestView.as_view(), name='suggest'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
 ]
\ No newline at end of file
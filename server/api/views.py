@@ -3,34 +3,44 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework import generics
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
 import requests
+import httpx
+from asgiref.sync import sync_to_async
 from django.http import JsonResponse
+from django.views import View
+from django.contrib.auth.models import AnonymousUser
 from django.core.files.uploadedfile import SimpleUploadedFile
-from .models import Garden, UserPlant, Post, Comment, Vote
-from .serializers import PostSerializer, CommentSerializer, GardenSimpleSerializer, UserRegisterSerializer, GardenSerializer, UserPlantSerializer, CustomTokenObtainPairSerializer, VoteSerializer, UserSerializer, UserUpdateSerializer, ChangePasswordSerializer
-from bs4 import BeautifulSoup
+from django.conf import settings
+from .models import Garden, UserPlant, Post, Comment, cast_vote
+from .pagination import InvalidCursor, keyset_page, page_size
+from .serializers import PostSerializer, PostSummarySerializer, CommentSerializer, GardenSimpleSerializer, UserRegisterSerializer, GardenSerializer, UserPlantSerializer, CustomTokenObtainPairSerializer, VoteSerializer, UserSerializer, UserUpdateSerializer, ChangePasswordSerializer
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
 from django.db.models import Q
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-import numpy as np
 import json
-from ultralytics import YOLO
-import cv2
 import os
 from dotenv import load_dotenv
 from urllib.parse import urlparse
+from . import care_tasks, class_index, html_parsing, http_client, image_decode, mock_catalog, perenual, pest_details, plant_search, prediction_cache, species_mirror, suggest
+from .html_parsing import TagStrainer
+from .inference import LazyPredictor, load_predictor
+from .pest_details import PestDetailError
+from .model_server import ModelServerBusy, ModelServerUnavailable, RemotePredictor
+from .uploads import ImageUploadMixin
+from .perenual import PERENUAL_API_URL, PERENUAL_PEST_API_URL, PerenualError, PerenualConfigError, apply_care_sections
 
 # Ensure environment variables are loaded if a .env exists
 load_dotenv()
 
-PERENUAL_API_URL = "https://perenual.com/api/v2"
-PERENUAL_PEST_API_URL = "https://perenual.com/api"
-
 
 # Mock data helpers
 def should_use_mock_data():
@@ -38,94 +48,63 @@ def should_use_mock_data():
     return os.getenv('USE_MOCK_DATA', 'True').lower() == 'true'
 
 def load_perenual_diseases_cards():
-    """Lee el JSON generado desde perenual_diseases.html y devuelve la lista de enfermedades (tarjetas).
-    Formato esperado: array de objetos con href, image, name, solutions_count.
+    """Lista de enfermedades (tarjetas) del JSON generado desde perenual_diseases.html
+    (compartida: no modificar). Formato: array de objetos con href, image, name, solutions_count.
     """
-    try:
-        json_path = os.path.join(os.path.dirname(__file__), '..', 'perenual_diseases_list.json')
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return data if isinstance(data, list) else []
-    except FileNotFoundError:
-        print("Warning: perenual_diseases_list.json not found")
-        return []
-    except Exception as e:
-        print(f"Error reading perenual_diseases_list.json: {e}")
-        return []
+    return mock_catalog.disease_cards.all()
 
 def load_species_details_mock():
-    """Carga los datos mock de species-details"""
-    try:
-        with open(os.path.join(os.path.dirname(__file__), '..', 'species-details-mock.json'), 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print("Warning: species-details-mock.json not found")
-        return []
+    """Carga los datos mock de species-details (compartidos: no modificar)"""
+    return mock_catalog.species_details.data()
 
 def load_species_list_mock():
-    """Carga los datos mock de species-list"""
-    try:
-        with open(os.path.join(os.path.dirname(__file__), '..', 'species-list-mock.json'), 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print("Warning: species-list-mock.json not found")
-        return {"data": []}
+    """Carga los datos mock de species-list (compartidos: no modificar)"""
+    return mock_catalog.species_list.data()
 
 def load_disease_list_mock():
-    """Carga los datos mock de pest/disease list"""
-    try:
-        with open(os.path.join(os.path.dirname(__file__), '..', 'disease-list-mock.json'), 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print("Warning: disease-list-mock.json not found")
-        return {"data": []}
+    """Carga los datos mock de pest/disease list (compartidos: no modificar)"""
+    return mock_catalog.disease_list.data()
 
 def get_mock_species_details(plant_id):
-    """Obtiene los detalles de una planta específica desde los datos mock"""
-    mock_data = load_species_details_mock()
-    for plant in mock_data:
-        if plant.get('id') == int(plant_id):
-            return plant
-    return None
-
-def search_mock_species_list(query=None, page=1):
-    """Busca plantas en los datos mock"""
-    mock_data = load_species_list_mock()
-    plants = mock_data.get('data', [])
-    
-    if query:
-        # Filtrar por nombre común o científico
-        query_lower = query.lower()
-        filtered_plants = []
-        for plant in plants:
-            common_name = plant.get('common_name', '').lower()
-            scientific_names = plant.get('scientific_name', [])
-            scientific_match = any(name.lower() for name in scientific_names if query_lower in name.lower())
-            
-            if query_lower in common_name or scientific_match:
-                filtered_plants.append(plant)
-        plants = filtered_plants
-    
-    # Simular paginación (30 plantas por página)
-    per_page = 30
+    """Obtiene una copia de los detalles de una planta específica desde los datos mock"""
+    plant = mock_catalog.species_details.get(int(plant_id))
+    # get_plant_details añade las secciones de cuidados: no tocar el registro compartido
+    return dict(plant) if plant is not None else None
+
+def get_plant_details(plant_id):
+    """Detalles de Perenual (mock, copia local o API cacheada) con las descripciones de cuidados.
+    Devuelve None si la planta no existe y lanza PerenualError si falla la API.
+    """
+    if should_use_mock_data():
+        print("Using mock data for Perenual API")
+        perenual_data = get_mock_species_details(plant_id)
+        if perenual_data:
+            apply_care_sections(perenual_data, perenual_data.get('care_guides'))
+        return perenual_data
+    if species_mirror.enabled():
+        return species_mirror.get_species_details(plant_id)
+    return perenual.get_species_details(plant_id)
+
+def mock_page(items, page, per_page=30):
+    """Simula la paginación de Perenual (30 elementos por página)"""
     start_index = (page - 1) * per_page
     end_index = start_index + per_page
-    
     return {
-        'data': plants[start_index:end_index],
-        'to': min(end_index, len(plants)),
+        'data': items[start_index:end_index],
+        'to': min(end_index, len(items)),
         'per_page': per_page,
         'current_page': page,
-        'from': start_index + 1 if plants else 0,
-        'last_page': (len(plants) + per_page - 1) // per_page,
-        'total': len(plants)
+        'from': start_index + 1 if items else 0,
+        'last_page': (len(items) + per_page - 1) // per_page,
+        'total': len(items)
     }
 
+def search_mock_species_list(query=None, page=1, filters=None):
+    """Busca plantas en los datos mock (índice local de plant_search, con los filtros de species-list)"""
+    return mock_page(plant_search.search(query, filters), page)
+
 def search_mock_disease_list(query=None, page=1, item_id=None):
     """Busca plagas/enfermedades en los datos mock"""
-    mock_data = load_disease_list_mock()
-    items = mock_data.get('data', [])
-
     # Filtrar por id si se proporciona
     if item_id:
         try:
@@ -133,32 +112,12 @@ def search_mock_disease_list(query=None, page=1, item_id=None):
         except (TypeError, ValueError):
             item_id_int = None
         if item_id_int is not None:
-            items = [i for i in items if i.get('id') == item_id_int]
+            item = mock_catalog.disease_list.get(item_id_int)
+            items = [item] if item is not None else []
             return {'data': items, 'total': len(items), 'current_page': 1, 'per_page': len(items), 'from': 1 if items else 0, 'to': len(items), 'last_page': 1}
 
-    if query:
-        query_lower = query.lower()
-        filtered = []
-        for item in items:
-            name = str(item.get('name', '')).lower()
-            desc = str(item.get('description', '')).lower()
-            if query_lower in name or query_lower in desc:
-                filtered.append(item)
-        items = filtered
-
-    # Paginación simple
-    per_page = 30
-    start_index = (page - 1) * per_page
-    end_index = start_index + per_page
-    return {
-        'data': items[start_index:end_index],
-        'to': min(end_index, len(items)),
-        'per_page': per_page,
-        'current_page': page,
-        'from': start_index + 1 if items else 0,
-        'last_page': (len(items) + per_page - 1) // per_page,
-        'total': len(items)
-    }
+    # Filtrar por nombre o descripción
+    return mock_page(mock_catalog.disease_list.search(query), page)
 
 # CRUD para Garden
 class GardenListCreateView(APIView):
@@ -239,34 +198,13 @@ class GardenSuitabilityView(APIView):
             return Response({"error": "plant_id is required"}, status=status.HTTP_400_BAD_REQUEST)
 
         # Obtiene la información de la planta
-        if should_use_mock_data():
-            print("Using mock data for Perenual API")
-            plant = get_mock_species_details(plant_id)
-        else:
-            print("Fetching plant details from Perenual API")
-            # Read API key at request time and validate
-            api_key = os.getenv('PERENUAL_API_KEY')
-            if not api_key:
-                return Response(
-                    {"error": "Perenual API key not configured", "env": "Missing PERENUAL_API_KEY"},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-            try:
-                url = f"{PERENUAL_API_URL}/species/details/{plant_id}"
-                params = {
-                    'key': api_key
-                }
-
-                response = requests.get(url, params=params)
+        try:
+            plant = get_plant_details(plant_id)
+        except PerenualError as e:
+            return Response(e.data, status=e.status_code)
+        if not plant:
+            return Response({"error": "Plant not found"}, status=status.HTTP_404_NOT_FOUND)
 
-                if response.status_code == 200:
-                    plant = response.json()
-            except Exception as e:
-                return Response(
-                    {"error": "Error connecting to Perenual API", "details": str(e)}, 
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-        
         print(f"Evaluating suitability for plant: {plant.get('common_name')}")
 
         gardens = Garden.objects.filter(owner=request.user)
@@ -361,7 +299,8 @@ class GardenSuitabilityView(APIView):
         return Response(results)
 
 # CRUD para Plant
-class UserPlantListCreateView(APIView):
+class UserPlantListCreateView(ImageUploadMixin, APIView):
+    upload_max_bytes_setting = 'MEDIA_UPLOAD_MAX_BYTES'
     permission_classes = [IsAuthenticated]
     """Obtener todas las plantas o crear una nueva"""
     parser_classes = [MultiPartParser, FormParser, JSONParser]
@@ -381,37 +320,17 @@ class UserPlantListCreateView(APIView):
         plant_id = request.data.get('plant_id')
         if plant_id and (not request.data.get('common_name') or not request.data.get('watering_period') or not request.data.get('image')):
             try:
-                if should_use_mock_data():
-                    print("Using mock data for Perenual API")
-                    perenual_data = get_mock_species_details(plant_id)
-                    if not perenual_data:
-                        return Response(
-                            {"error": "Plant not found in mock data"},
-                            status=status.HTTP_404_NOT_FOUND
-                        )
-                    request_data = request.data.copy()
-                    return self.set_perenual_info(request_data, perenual_data, serializer, plant_id)
-                else:
-                    print("Fetching plant details from Perenual API")
-                    api_key = os.getenv('PERENUAL_API_KEY')
-                    if not api_key:
-                        return Response(
-                        {"error": "Perenual API key not configured", "env": "Missing PERENUAL_API_KEY"},
-                        status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                        )
-                    url = f"{PERENUAL_API_URL}/species/details/{plant_id}"
-                    params = {'key': api_key}
-                    response = requests.get(url, params=params)
-
-                    if response.status_code == 200:
-                        perenual_data = response.json()
-
-                        # Actualizar datos del request con información de Perenual
-                        request_data = request.data.copy()
-
-                        return self.set_perenual_info(request_data, perenual_data, serializer, plant_id)
-                    else:
-                        return Response(response.json(), status=status.HTTP_429_TOO_MANY_REQUESTS)
+                perenual_data = get_plant_details(plant_id)
+                if not perenual_data:
+                    return Response(
+                        {"error": "Plant not found"},
+                        status=status.HTTP_404_NOT_FOUND
+                    )
+                # Actualizar datos del request con información de Perenual
+                request_data = request.data.copy()
+                return self.set_perenual_info(request_data, perenual_data, serializer, plant_id)
+            except PerenualError as e:
+                return Response(e.data, status=e.status_code)
             except Exception as e:
                 print(f"Error fetching plant details from Perenual: {str(e)}")
         
@@ -440,7 +359,7 @@ class UserPlantListCreateView(APIView):
         try:
             img_url = perenual_data['default_image']['original_url']
             print(img_url)
-            img_resp = requests.get(img_url, timeout=20)
+            img_resp = http_client.get(img_url, timeout=20)
             if img_resp.status_code == 200:
                 print("Image downloaded successfully")
                 img_content = img_resp.content
@@ -463,7 +382,8 @@ class UserPlantListCreateView(APIView):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserPlantDetailView(APIView):
+class UserPlantDetailView(ImageUploadMixin, APIView):
+    upload_max_bytes_setting = 'MEDIA_UPLOAD_MAX_BYTES'
     permission_classes = [IsAuthenticated]
     """Obtener, actualizar o eliminar una planta específica"""
     parser_classes = [MultiPartParser, FormParser, JSONParser]
@@ -473,102 +393,57 @@ class UserPlantDetailView(APIView):
         except UserPlant.DoesNotExist:
             return None
 
+    def get_perenual_details(self, plant_id, pending=None):
+        """Detalles de Perenual para incluir en la respuesta.
+        Los errores de la API se devuelven como {'error': ...} para no bloquear la respuesta.
+        `pending` es una SpeciesDetailsRequest ya lanzada en paralelo.
+        """
+        try:
+            if pending is not None:
+                return pending.result()
+            return get_plant_details(plant_id)
+        except PerenualConfigError:
+            raise
+        except PerenualError as e:
+            return e.data
+        except Exception as e:
+            return {'error': f"Error connecting to Perenual API: {str(e)}"}
+
     def get(self, request, pk):
         plant = self.get_object(pk)
         if not plant:
             return Response({"error": "Plant not found"}, status=status.HTTP_404_NOT_FOUND)
         
+        # Lanzar las llamadas a Perenual (detalles y cuidados en paralelo) antes del
+        # trabajo local para que avancen mientras se consultan los posts
+        pending = None
+        if plant.plant_id and not should_use_mock_data() and not species_mirror.enabled():
+            pending = perenual.SpeciesDetailsRequest(
+                plant.plant_id, timeout=settings.PERENUAL_DETAIL_DEADLINE
+            )
+
         serializer = UserPlantSerializer(plant, context={'request': request})
         plant_data = serializer.data
-        
-        # Hacer petición a Perenual para obtener detalles adicionales
-        if plant.plant_id:
-            try:
-                if should_use_mock_data():
-                    print("Using mock data for Perenual API")
-                    perenual_data = get_mock_species_details(plant.plant_id)
-                    if perenual_data:
-                        care_data = perenual_data.get('care_guides')
-                        # Procesar la información de cuidados
-                        if care_data.get('data') and len(care_data['data']) > 0:
-                            first_guide = care_data['data'][0]
-                            if 'section' in first_guide:
-                                # Extraer watering, pruning y sunlight descriptions
-                                for section in first_guide['section']:
-                                    section_type = section.get('type')
-                                    if section_type == 'watering':
-                                        perenual_data['watering_long'] = section.get('description', '')
-                                    elif section_type == 'pruning':
-                                        perenual_data['pruning'] = section.get('description', '')
-                                    elif section_type == 'sunlight':
-                                        perenual_data['sunlight_long'] = section.get('description', '')
-                        plant_data['perenual_details'] = perenual_data
-                else:
-                    print("Fetching plant details from Perenual API")
-                    api_key = os.getenv('PERENUAL_API_KEY')
-                    if not api_key:
-                        return Response(
-                        {"error": "Perenual API key not configured", "env": "Missing PERENUAL_API_KEY"},
-                        status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                        )
-                    url = f"{PERENUAL_API_URL}/species/details/{plant.plant_id}"
-                    params = {
-                        'key': api_key
-                    }
 
-                    response = requests.get(url, params=params)
-
-                    if response.status_code == 200:
-                        perenual_data = response.json()
-
-                        # Obtener información de cuidados desde care_guides si existe
-                        if 'care_guides' in perenual_data:
-                            care_guides_url = perenual_data['care_guides']
-                            try:
-                                care_response = requests.get(care_guides_url)
-                                if care_response.status_code == 200:
-                                    care_data = care_response.json()
-                                    # Procesar la información de cuidados
-                                    if care_data.get('data') and len(care_data['data']) > 0:
-                                        first_guide = care_data['data'][0]
-                                        if 'section' in first_guide:
-                                            # Extraer watering, pruning y sunlight descriptions
-                                            for section in first_guide['section']:
-                                                section_type = section.get('type')
-                                                if section_type == 'watering':
-                                                    perenual_data['watering_long'] = section.get('description', '')
-                                                elif section_type == 'pruning':
-                                                    perenual_data['pruning'] = section.get('description', '')
-                                                elif section_type == 'sunlight':
-                                                    perenual_data['sunlight_long'] = section.get('description', '')
-                            except Exception as care_e:
-                                print(f"Error fetching care guides: {str(care_e)}")
-
-                        # Agregar los datos de Perenual a la respuesta
-                        plant_data['perenual_details'] = perenual_data
-
-                    elif response.status_code != 404:
-                        # Si hay error pero no es 404, agregar información del error
-                        plant_data['perenual_details'] = {
-                            'error': f"Failed to fetch plant details from Perenual API (status: {response.status_code})"
-                        }
-                    
-            except Exception as e:
-                # En caso de error de conexión, agregar información del error pero continuar
-                plant_data['perenual_details'] = {
-                    'error': f"Error connecting to Perenual API: {str(e)}"
-                }
-        
-        # Añadir posts relacionados con esta planta (por plant_id)
+        # Añadir la primera página de posts relacionados con esta planta (por plant_id);
+        # el resto se pide a /api/posts/?plant_id=...&cursor=posts_next_cursor
         try:
             if plant.plant_id:
-                posts_qs = Post.objects.filter(plant_id=plant.plant_id).order_by('-created_at')
-                posts_serialized = PostSerializer(posts_qs, many=True, context={'request': request})
-                plant_data['posts'] = posts_serialized.data
+                plant_data['posts'], plant_data['posts_next_cursor'] = plant_posts_page(request, plant.plant_id)
         except Exception as posts_e:
             # No bloquear la respuesta si falla la consulta de posts
             plant_data['posts_error'] = str(posts_e)
 
+        # Añadir detalles de Perenual (cacheados); si la guía de cuidados no llega a
+        # tiempo se devuelven los detalles marcados como parciales
+        if plant.plant_id:
+            try:
+                perenual_data = self.get_perenual_details(plant.plant_id, pending)
+            except PerenualConfigError as e:
+                return Response(e.data, status=e.status_code)
+            if perenual_data:
+                plant_data['perenual_details'] = perenual_data
+
         return Response(plant_data)
 
     def put(self, request, pk):
@@ -583,83 +458,14 @@ class UserPlantDetailView(APIView):
             updated_serializer = UserPlantSerializer(updated_plant, context={'request': request})
             plant_data = updated_serializer.data
             
-            # Hacer petición a Perenual para obtener detalles adicionales
+            # Añadir detalles de Perenual (cacheados)
             if updated_plant.plant_id:
                 try:
-                    if should_use_mock_data():
-                        print("Using mock data for Perenual API")
-                        perenual_data = get_mock_species_details(plant.plant_id)
-                        if perenual_data:
-                            care_data = perenual_data.get('care_guides')
-                            # Procesar la información de cuidados
-                            if care_data.get('data') and len(care_data['data']) > 0:
-                                first_guide = care_data['data'][0]
-                                if 'section' in first_guide:
-                                    # Extraer watering, pruning y sunlight descriptions
-                                    for section in first_guide['section']:
-                                        section_type = section.get('type')
-                                        if section_type == 'watering':
-                                            perenual_data['watering_long'] = section.get('description', '')
-                                        elif section_type == 'pruning':
-                                            perenual_data['pruning'] = section.get('description', '')
-                                        elif section_type == 'sunlight':
-                                            perenual_data['sunlight_long'] = section.get('description', '')
-                            plant_data['perenual_details'] = perenual_data
-                    else:
-                        print("Fetching plant details from Perenual API")
-                        api_key = os.getenv('PERENUAL_API_KEY')
-                        if not api_key:
-                            return Response(
-                            {"error": "Perenual API key not configured", "env": "Missing PERENUAL_API_KEY"},
-                            status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                            )
-                        url = f"{PERENUAL_API_URL}/species/details/{updated_plant.plant_id}"
-                        params = {
-                            'key': api_key
-                        }
-
-                        response = requests.get(url, params=params)
-
-                        if response.status_code == 200:
-                            perenual_data = response.json()
-
-                            # Obtener información de cuidados desde care_guides si existe
-                            if 'care_guides' in perenual_data:
-                                care_guides_url = perenual_data['care_guides']
-                                try:
-                                    care_response = requests.get(care_guides_url)
-                                    if care_response.status_code == 200:
-                                        care_data = care_response.json()
-                                        # Procesar la información de cuidados
-                                        if care_data.get('data') and len(care_data['data']) > 0:
-                                            first_guide = care_data['data'][0]
-                                            if 'section' in first_guide:
-                                                # Extraer watering, pruning y sunlight descriptions
-                                                for section in first_guide['section']:
-                                                    section_type = section.get('type')
-                                                    if section_type == 'watering':
-                                                        perenual_data['watering_long'] = section.get('description', '')
-                                                    elif section_type == 'pruning':
-                                                        perenual_data['pruning'] = section.get('description', '')
-                                                    elif section_type == 'sunlight':
-                                                        perenual_data['sunlight_long'] = section.get('description', '')
-                                except Exception as care_e:
-                                    print(f"Error fetching care guides: {str(care_e)}")
-
-                            # Agregar los datos de Perenual a la respuesta
-                            plant_data['perenual_details'] = perenual_data
-
-                        elif response.status_code != 404:
-                            # Si hay error pero no es 404, agregar información del error
-                            plant_data['perenual_details'] = {
-                                'error': f"Failed to fetch plant details from Perenual API (status: {response.status_code})"
-                            }
-                        
-                except Exception as e:
-                    # En caso de error de conexión, agregar información del error pero continuar
-                    plant_data['perenual_details'] = {
-                        'error': f"Error connecting to Perenual API: {str(e)}"
-                    }
+                    perenual_data = self.get_perenual_details(updated_plant.plant_id)
+                except PerenualConfigError as e:
+                    return Response(e.data, status=e.status_code)
+                if perenual_data:
+                    plant_data['perenual_details'] = perenual_data
             
             return Response(plant_data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -676,83 +482,14 @@ class UserPlantDetailView(APIView):
             updated_serializer = UserPlantSerializer(updated_plant, context={'request': request})
             plant_data = updated_serializer.data
             
-            # Hacer petición a Perenual para obtener detalles adicionales
+            # Añadir detalles de Perenual (cacheados)
             if updated_plant.plant_id:
                 try:
-                    if should_use_mock_data():
-                        print("Using mock data for Perenual API")
-                        perenual_data = get_mock_species_details(plant.plant_id)
-                        if perenual_data:
-                            care_data = perenual_data.get('care_guides')
-                            # Procesar la información de cuidados
-                            if care_data.get('data') and len(care_data['data']) > 0:
-                                first_guide = care_data['data'][0]
-                                if 'section' in first_guide:
-                                    # Extraer watering, pruning y sunlight descriptions
-                                    for section in first_guide['section']:
-                                        section_type = section.get('type')
-                                        if section_type == 'watering':
-                                            perenual_data['watering_long'] = section.get('description', '')
-                                        elif section_type == 'pruning':
-                                            perenual_data['pruning'] = section.get('description', '')
-                                        elif section_type == 'sunlight':
-                                            perenual_data['sunlight_long'] = section.get('description', '')
-                            plant_data['perenual_details'] = perenual_data
-                    else:
-                        print("Fetching plant details from Perenual API")
-                        api_key = os.getenv('PERENUAL_API_KEY')
-                        if not api_key:
-                            return Response(
-                            {"error": "Perenual API key not configured", "env": "Missing PERENUAL_API_KEY"},
-                            status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                            )
-                        url = f"{PERENUAL_API_URL}/species/details/{updated_plant.plant_id}"
-                        params = {
-                            'key': api_key
-                        }
-
-                        response = requests.get(url, params=params)
-
-                        if response.status_code == 200:
-                            perenual_data = response.json()
-
-                            # Obtener información de cuidados desde care_guides si existe
-                            if 'care_guides' in perenual_data:
-                                care_guides_url = perenual_data['care_guides']
-                                try:
-                                    care_response = requests.get(care_guides_url)
-                                    if care_response.status_code == 200:
-                                        care_data = care_response.json()
-                                        # Procesar la información de cuidados
-                                        if care_data.get('data') and len(care_data['data']) > 0:
-                                            first_guide = care_data['data'][0]
-                                            if 'section' in first_guide:
-                                                # Extraer watering, pruning y sunlight descriptions
-                                                for section in first_guide['section']:
-                                                    section_type = section.get('type')
-                                                    if section_type == 'watering':
-                                                        perenual_data['watering_long'] = section.get('description', '')
-                                                    elif section_type == 'pruning':
-                                                        perenual_data['pruning'] = section.get('description', '')
-                                                    elif section_type == 'sunlight':
-                                                        perenual_data['sunlight_long'] = section.get('description', '')
-                                except Exception as care_e:
-                                    print(f"Error fetching care guides: {str(care_e)}")
-
-                            # Agregar los datos de Perenual a la respuesta
-                            plant_data['perenual_details'] = perenual_data
-
-                        elif response.status_code != 404:
-                            # Si hay error pero no es 404, agregar información del error
-                            plant_data['perenual_details'] = {
-                                'error': f"Failed to fetch plant details from Perenual API (status: {response.status_code})"
-                            }
-                        
-                except Exception as e:
-                    # En caso de error de conexión, agregar información del error pero continuar
-                    plant_data['perenual_details'] = {
-                        'error': f"Error connecting to Perenual API: {str(e)}"
-                    }
+                    perenual_data = self.get_perenual_details(updated_plant.plant_id)
+                except PerenualConfigError as e:
+                    return Response(e.data, status=e.status_code)
+                if perenual_data:
+                    plant_data['perenual_details'] = perenual_data
             
             return Response(plant_data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -833,89 +570,83 @@ class ChangePasswordView(APIView):
         return Response({'message': 'Contraseña cambiada correctamente'})
     
 class UserTasksView(APIView):
+    """Tareas de cuidado del usuario repartidas en hoy / próximas / atrasadas.
+
+    Cada tarea referencia su planta por id en `user_plant`; las plantas se
+    serializan una sola vez en `plants`, indexadas por id.
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         today = timezone.localdate()
-        user_plants = UserPlant.objects.filter(owner=request.user)
-        today_tasks = []
-        next_tasks = []
-        previous_tasks = []
-        
-        for plant in user_plants:
-            serializer = UserPlantSerializer(plant, context={'request': request})
-            plant_data = serializer.data
-
-            # Riego
-            next_watering_date = serializer.get_next_watering_date(plant)
-            if next_watering_date and plant_data.get('is_watering_enabled', True):
-                date = next_watering_date.date() if hasattr(next_watering_date, "date") else next_watering_date
-                task = {"type": "watering", "next_date": date, "user_plant": plant_data}
-                if date == today:
-                    today_tasks.append(task)
-                elif date > today:
-                    next_tasks.append(task)
-                elif date < today:
-                    previous_tasks.append(task)
-
-            # Poda
-            next_pruning_date = serializer.get_next_pruning_date(plant) if hasattr(serializer, "get_next_pruning_date") else None
-            if next_pruning_date:
-                date = next_pruning_date.date() if hasattr(next_pruning_date, "date") else next_pruning_date
-                task = {"type": "pruning", "next_date": date, "user_plant": plant_data}
-                if date == today:
-                    today_tasks.append(task)
-                elif date > today:
-                    next_tasks.append(task)
-                elif date < today:
-                    previous_tasks.append(task)
-
-            # Pulverización
-            next_spraying_date = serializer.get_next_spraying_date(plant) if hasattr(serializer, "get_next_spraying_date") else None
-            if next_spraying_date:
-                date = next_spraying_date.date() if hasattr(next_spraying_date, "date") else next_spraying_date
-                task = {"type": "spraying", "next_date": date, "user_plant": plant_data}
-                if date == today:
-                    today_tasks.append(task)
-                elif date > today:
-                    next_tasks.append(task)
-                elif date < today:
-                    previous_tasks.append(task)
-
-            # Rotación
-            next_rotating_date = serializer.get_next_rotating_date(plant) if hasattr(serializer, "get_next_rotating_date") else None
-            if next_rotating_date:
-                date = next_rotating_date.date() if hasattr(next_rotating_date, "date") else next_rotating_date
-                task = {"type": "rotating", "next_date": date, "user_plant": plant_data}
-                if date == today:
-                    today_tasks.append(task)
-                elif date > today:
-                    next_tasks.append(task)
-                elif date < today:
-                    previous_tasks.append(task)
-
-            # Fertilización
-            next_fertilizing_date = serializer.get_next_fertilizing_date(plant) if hasattr(serializer, "get_next_fertilizing_date") else None
-            if next_fertilizing_date:
-                date = next_fertilizing_date.date() if hasattr(next_fertilizing_date, "date") else next_fertilizing_date
-                task = {"type": "fertilizing", "next_date": date, "user_plant": plant_data}
-                if date == today:
-                    today_tasks.append(task)
-                elif date > today:
-                    next_tasks.append(task)
-                elif date < today:
-                    previous_tasks.append(task)
+        rows = UserPlant.objects.filter(owner=request.user).values('id', *care_tasks.DUE_DATE_FIELDS.values())
+        tasks, plant_ids = care_tasks.bucket_tasks(rows.iterator(), today)
 
-        return Response({
-            "today_tasks": today_tasks,
-            "next_tasks": next_tasks,
-            "previous_tasks": previous_tasks
-        })
+        plants = UserPlant.objects.filter(owner=request.user, id__in=plant_ids).select_related('garden')
+        plants_data = UserPlantSerializer(plants, many=True, context={'request': request}).data
+        tasks['plants'] = {plant['id']: plant for plant in plants_data}
+        return Response(tasks)
         
-model = YOLO("./model/results/plantify_model_v1/weights/best.pt")
-model_disease = YOLO("./model/results_disease/plantify_disease_model_v1/weights/best.pt")
-
-class PredictImageView(APIView):
+def _predictor(name):
+    """Con MODEL_SERVER_SOCKET las predicciones van al servidor de modelos compartido
+    (manage.py model_server); si este no responde se devuelve 503, o con
+    MODEL_SERVER_LOCAL_FALLBACK se carga el modelo en el worker mientras tanto.
+    Sin él, el modelo se carga en la primera predicción (ver MODEL_WARMUP)."""
+    if settings.MODEL_SERVER_SOCKET:
+        fallback = (lambda: load_predictor(name)) if settings.MODEL_SERVER_LOCAL_FALLBACK else None
+        return RemotePredictor(name, settings.MODEL_SERVER_SOCKET, fallback=fallback)
+    return LazyPredictor(name)
+
+model = _predictor('plant')
+model_disease = _predictor('disease')
+
+def model_server_busy_response():
+    return Response(
+        {"error": "Model server overloaded", "hint": "Retry in a few seconds."},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={'Retry-After': '1'},
+    )
+
+def model_server_unavailable_response():
+    return Response(
+        {"error": "Model server unavailable", "hint": "Retry in a few seconds."},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={'Retry-After': str(max(1, int(settings.MODEL_SERVER_RETRY_INTERVAL)))},
+    )
+
+def classify_image(predictor, name, image_file=None, image_url=None):
+    """Clasifica una imagen subida o una URL con `predictor` pasando por la caché de predicciones.
+
+    Devuelve (clave, entrada); la entrada tiene el top-k en 'top' y, si ya se resolvió
+    antes, el id de Perenual. La entrada es None si la imagen no se puede decodificar;
+    lanza ImageTooLarge si supera IMAGE_MAX_BYTES o IMAGE_MAX_PIXELS.
+    """
+    if image_file:
+        data = image_decode.read_buffer(image_file)
+        image_decode.check_bytes(data)
+        key = prediction_cache.image_key(name, data=data, digest=getattr(image_file, 'sha256', None))
+    else:
+        key = prediction_cache.image_key(name, url=image_url)
+    prediction = prediction_cache.lookup(key)
+    if prediction is not None:
+        return key, prediction
+
+    if image_file:
+        # Decodificar a la resolución reducida que necesita el clasificador
+        img = image_decode.decode_image(data)
+        if img is None:
+            return key, None
+        results = predictor.predict(img)
+    else:
+        # Si se proporciona URL, Ultralytics acepta rutas/URLs directamente
+        results = predictor.predict(image_url)
+    prediction = {'top': prediction_cache.top_k(results[0])}
+    prediction_cache.store(key, prediction)
+    return key, prediction
+
+
+class PredictImageView(ImageUploadMixin, APIView):
+    upload_max_bytes_setting = 'PREDICT_UPLOAD_MAX_BYTES'
     parser_classes = [MultiPartParser, JSONParser]
 
     def post(self, request):
@@ -927,17 +658,15 @@ class PredictImageView(APIView):
             return Response({"error": "No image provided. Upload a file as 'image' or provide 'image_url'."}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            if image_file:
-                # Convertir archivo subido (InMemoryUploadedFile) a np.ndarray soportado por Ultralytics
-                image_file.seek(0)
-                file_bytes = np.frombuffer(image_file.read(), dtype=np.uint8)
-                img = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
-                if img is None:
-                    return Response({"error": "Unsupported or corrupt image file."}, status=status.HTTP_400_BAD_REQUEST)
-                results = model.predict(img)
-            else:
-                # Si se proporciona URL, Ultralytics acepta rutas/URLs directamente
-                results = model.predict(image_url)
+            cache_key, prediction = classify_image(model, 'plant', image_file, image_url)
+            if prediction is None:
+                return Response({"error": "Unsupported or corrupt image file."}, status=status.HTTP_400_BAD_REQUEST)
+        except ModelServerBusy:
+            return model_server_busy_response()
+        except ModelServerUnavailable:
+            return model_server_unavailable_response()
+        except image_decode.ImageTooLarge as e:
+            return Response({"error": str(e)}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
         except TypeError as te:
             # Captura el error de tipo de Ultralytics y devuelve un mensaje claro
             return Response({
@@ -949,16 +678,23 @@ class PredictImageView(APIView):
             return Response({"error": "Failed to process image", "detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
         # Obtener el resultado más probable
-        top1 = results[0].probs.top1
-        confianza = results[0].probs.top1conf.item()
-        nombre_planta = results[0].names[top1]
+        confianza = prediction['top'][0]['confidence']
+        nombre_planta = prediction['top'][0]['label']
         
         print("\n" + "="*30)
         print(f"🌿 PLANTA DETECTADA: {nombre_planta}")
         print(f"🌿 PLANTA DETECTADA: {nombre_planta.upper()}")
         print(f"📊 Confianza: {confianza:.2%}")
         print("="*30 + "\n")
-        # Buscar en Perenual API por nombre de planta
+        if prediction.get('plant_id') is not None:
+            return Response({'plant_id': prediction['plant_id']})
+        # Id precalculado con manage.py build_perenual_index
+        perenual_plant_id = class_index.perenual_id('plant', nombre_planta)
+        if perenual_plant_id is not None:
+            print(f"🔍 Perenual Plant ID (índice): {perenual_plant_id}")
+            prediction_cache.store(cache_key, {**prediction, 'plant_id': perenual_plant_id})
+            return Response({'plant_id': perenual_plant_id})
+        # Clase sin id en el índice: buscar en Perenual API por nombre de planta
         try:
             api_key = os.getenv('PERENUAL_API_KEY')
             if not api_key:
@@ -971,7 +707,7 @@ class PredictImageView(APIView):
             'key': api_key,
             'q': nombre_planta
             }
-            search_response = requests.get(search_url, params=search_params)
+            search_response = http_client.get(search_url, params=search_params)
             
             perenual_plant_id = None
             if search_response.status_code == 200:
@@ -979,6 +715,7 @@ class PredictImageView(APIView):
                 if search_data.get('data') and len(search_data['data']) > 0:
                     perenual_plant_id = search_data['data'][0].get('id')
                     print(f"🔍 Perenual Plant ID: {perenual_plant_id}")
+                    prediction_cache.store(cache_key, {**prediction, 'plant_id': perenual_plant_id})
                     return Response({
                         'plant_id': perenual_plant_id
                     })
@@ -988,7 +725,8 @@ class PredictImageView(APIView):
                 'error': str(e)
             })
 
-class PredictPestDiseaseView(APIView):
+class PredictPestDiseaseView(ImageUploadMixin, APIView):
+    upload_max_bytes_setting = 'PREDICT_UPLOAD_MAX_BYTES'
     parser_classes = [MultiPartParser, JSONParser]
 
     def post(self, request):
@@ -1000,17 +738,15 @@ class PredictPestDiseaseView(APIView):
             return Response({"error": "No image provided. Upload a file as 'image' or provide 'image_url'."}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            if image_file:
-                # Convertir archivo subido (InMemoryUploadedFile) a np.ndarray soportado por Ultralytics
-                image_file.seek(0)
-                file_bytes = np.frombuffer(image_file.read(), dtype=np.uint8)
-                img = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
-                if img is None:
-                    return Response({"error": "Unsupported or corrupt image file."}, status=status.HTTP_400_BAD_REQUEST)
-                results = model_disease.predict(img)
-            else:
-                # Si se proporciona URL, Ultralytics acepta rutas/URLs directamente
-                results = model_disease.predict(image_url)
+            cache_key, prediction = classify_image(model_disease, 'disease', image_file, image_url)
+            if prediction is None:
+                return Response({"error": "Unsupported or corrupt image file."}, status=status.HTTP_400_BAD_REQUEST)
+        except ModelServerBusy:
+            return model_server_busy_response()
+        except ModelServerUnavailable:
+            return model_server_unavailable_response()
+        except image_decode.ImageTooLarge as e:
+            return Response({"error": str(e)}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
         except TypeError as te:
             # Captura el error de tipo de Ultralytics y devuelve un mensaje claro
             return Response({
@@ -1022,9 +758,8 @@ class PredictPestDiseaseView(APIView):
             return Response({"error": "Failed to process image", "detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
         # Obtener el resultado más probable
-        top1 = results[0].probs.top1
-        confianza = results[0].probs.top1conf.item()
-        nombre_disease = results[0].names[top1]
+        confianza = prediction['top'][0]['confidence']
+        nombre_disease = prediction['top'][0]['label']
         # Extrae nombre de planta y enfermedad del formato "planta___enfermedad" y normaliza la enfermedad
         plant_name = None
         disease_label = nombre_disease or ""
@@ -1040,10 +775,20 @@ class PredictPestDiseaseView(APIView):
         print(f"📊 Confianza: {confianza:.2%}")
         print("="*30 + "\n")
         
+        if prediction.get('issue_id') is not None:
+            return Response({'id': prediction['issue_id']})
         if disease_query.lower() == "healthy":
+            prediction_cache.store(cache_key, {**prediction, 'issue_id': -1})
             return Response({
                 'id': -1
             })
+        # Id precalculado con manage.py build_perenual_index --models disease
+        issue_id = class_index.perenual_id('disease', nombre_disease)
+        if issue_id is not None:
+            print(f"🔍 Perenual Issue ID (índice): {issue_id}")
+            prediction_cache.store(cache_key, {**prediction, 'issue_id': issue_id})
+            return Response({'id': issue_id})
+        # Etiqueta sin id en el índice: buscar en Perenual
         # Buscar en Perenual API por nombre de planta
         try:
             api_key = os.getenv('PERENUAL_API_KEY')
@@ -1059,7 +804,7 @@ class PredictPestDiseaseView(APIView):
             print(f"🔗 Perenual search URL (ID lookup): {full_url}")
             detail_url = None
             try:
-                lookup_resp = requests.get(full_url, timeout=15)
+                lookup_resp = http_client.get(full_url, timeout=15)
                 if lookup_resp.status_code == 200:
                     lookup_data = lookup_resp.json() or {}
                     first_item = (lookup_data.get('data') or [])[:1]
@@ -1077,9 +822,9 @@ class PredictPestDiseaseView(APIView):
                     # Paso 2.1: cargar la página inicial y verificar el input
                     encoded_q2 = requests.utils.quote(disease_query)
                     results_url = f"{page_url}?search={encoded_q2}"
-                    res_resp = requests.get(results_url, timeout=15)
+                    res_resp = http_client.get(results_url, timeout=15)
                     if res_resp.status_code == 200:
-                        rsoup = BeautifulSoup(res_resp.text, 'html.parser')
+                        rsoup = html_parsing.parse(res_resp.text, TagStrainer((None, {'id': 'search-container-display'})))
                         first_a = rsoup.select_one('#search-container-display > a')
                         if first_a and first_a.get('href'):
                             href = first_a['href']
@@ -1107,6 +852,8 @@ class PredictPestDiseaseView(APIView):
             except Exception:
                 issue_id = None
             print(f"🔍 Perenual Issue ID: {issue_id}")
+            if issue_id is not None:
+                prediction_cache.store(cache_key, {**prediction, 'issue_id': issue_id})
             return Response({
                 'id': issue_id
             })
@@ -1117,6 +864,65 @@ class PredictPestDiseaseView(APIView):
             })
         
         
+WEATHER_API_URL = "https://api.openweathermap.org/data/2.5/weather"
+
+# Mapear condiciones de OpenWeather a las de weather_conditions.json
+WEATHER_CONDITION_MAP = {
+    "rain": "rain",
+    "clear": "sunny",
+    "clouds": "cloudy",
+    "wind": "windy",
+    "snow": "frost",
+    "drizzle": "rain",
+    "thunderstorm": "rain",
+    # Puedes añadir más mapeos si lo necesitas
+}
+
+
+def weather_request_url(lat, lon):
+    OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY") or "065567f9c5b59e914f4353d5869c52ce"
+    return f"{WEATHER_API_URL}?lat={lat}&lon={lon}&appid={OPENWEATHER_API_KEY}&units=metric&lang=es"
+
+
+def load_weather_conditions():
+    with open(os.path.join(os.path.dirname(__file__), "../weather_conditions.json"), "r", encoding="utf-8") as f:
+        return json.load(f)["weather_conditions"]
+
+
+def weather_recommendation(weather_data):
+    """Cuerpo de la respuesta de /weather/ a partir de la respuesta de OpenWeather."""
+    # Determina la condición principal
+    main_condition = weather_data.get("weather", [{}])[0].get("main", "").lower()
+    temp = weather_data.get("main", {}).get("temp")
+    mapped_condition = WEATHER_CONDITION_MAP.get(main_condition, main_condition)
+
+    # Lógica adicional para hot/cold/dry/humid
+    if temp is not None:
+        if temp >= 30:
+            mapped_condition = "hot"
+        elif temp <= 5:
+            mapped_condition = "cold"
+        elif temp <= 0:
+            mapped_condition = "frost"
+        elif weather_data.get("main", {}).get("humidity", 50) >= 80:
+            mapped_condition = "humid"
+        elif weather_data.get("main", {}).get("humidity", 50) <= 30:
+            mapped_condition = "dry"
+
+    # Carga recomendaciones
+    conditions = load_weather_conditions()
+    recommendation = next(
+        (c["recommendation"] for c in conditions if c["condition"] == mapped_condition),
+        "No hay recomendación específica para este clima."
+    )
+
+    return {
+        "weather": weather_data,
+        "recommendation": recommendation,
+        "condition": mapped_condition
+    }
+
+
 class WeatherRecommendationView(APIView):
     """
     Recibe la localización (lat, lon) y devuelve el tiempo actual y una recomendación según weather_conditions.json
@@ -1127,67 +933,84 @@ class WeatherRecommendationView(APIView):
         if not lat or not lon:
             return Response({"error": "lat and lon are required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY") or "065567f9c5b59e914f4353d5869c52ce"
-        url = f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={OPENWEATHER_API_KEY}&units=metric&lang=es"
-        response = requests.get(url)
+        try:
+            response = http_client.get(weather_request_url(lat, lon))
+        except requests.RequestException:
+            return Response({"error": "Error fetching weather"}, status=status.HTTP_502_BAD_GATEWAY)
         if response.status_code != 200:
             return Response({"error": "Error fetching weather"}, status=status.HTTP_502_BAD_GATEWAY)
-        weather_data = response.json()
-
-        # Determina la condición principal
-        main_condition = weather_data.get("weather", [{}])[0].get("main", "").lower()
-        temp = weather_data.get("main", {}).get("temp")
-        # Puedes añadir lógica extra para hot/cold/frost/dry/humid según temp y otros datos
-
-        # Mapear condiciones de OpenWeather a tus condiciones
-        condition_map = {
-            "rain": "rain",
-            "clear": "sunny",
-            "clouds": "cloudy",
-            "wind": "windy",
-            "snow": "frost",
-            "drizzle": "rain",
-            "thunderstorm": "rain",
-            # Puedes añadir más mapeos si lo necesitas
-        }
-        mapped_condition = condition_map.get(main_condition, main_condition)
-
-        # Lógica adicional para hot/cold/dry/humid
-        if temp is not None:
-            if temp >= 30:
-                mapped_condition = "hot"
-            elif temp <= 5:
-                mapped_condition = "cold"
-            elif temp <= 0:
-                mapped_condition = "frost"
-            elif weather_data.get("main", {}).get("humidity", 50) >= 80:
-                mapped_condition = "humid"
-            elif weather_data.get("main", {}).get("humidity", 50) <= 30:
-                mapped_condition = "dry"
-
-        # Carga recomendaciones
-        with open(os.path.join(os.path.dirname(__file__), "../weather_conditions.json"), "r", encoding="utf-8") as f:
-            conditions = json.load(f)["weather_conditions"]
-
-        recommendation = next(
-            (c["recommendation"] for c in conditions if c["condition"] == mapped_condition),
-            "No hay recomendación específica para este clima."
-        )
+        return Response(weather_recommendation(response.json()))
 
+def plant_posts_page(request, plant_id, cursor=None, limit=None):
+    """Página de posts de una planta (la primera si no hay cursor) y el cursor de la siguiente."""
+    posts = Post.objects.filter(plant_id=plant_id).with_votes(request.user, comments=False)
+    items, next_cursor = keyset_page(posts, cursor, limit)
+    return PostSummarySerializer(items, many=True, context={'request': request}).data, next_cursor
+
+class PostFeedView(APIView):
+    """Feed de posts, opcionalmente de una planta, paginado por cursor.
+    GET /api/posts/?plant_id=<id>&cursor=<next_cursor>&limit=<n>
+    """
+    def get(self, request):
+        posts = Post.objects.all()
+        plant_id = request.GET.get('plant_id')
+        if plant_id:
+            try:
+                posts = posts.filter(plant_id=int(plant_id))
+            except ValueError:
+                return Response({"error": "plant_id must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            items, next_cursor = keyset_page(
+                posts.with_votes(request.user, comments=False),
+                request.GET.get('cursor'),
+                page_size(request.GET.get('limit')),
+            )
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         return Response({
-            "weather": weather_data,
-            "recommendation": recommendation,
-            "condition": mapped_condition
+            'results': PostSummarySerializer(items, many=True, context={'request': request}).data,
+            'next_cursor': next_cursor,
         })
 
-class UserPostView(APIView):
+class PostCommentsView(APIView):
+    """Comentarios visibles de un post, del más antiguo al más reciente, paginados por cursor.
+    GET /api/posts/<pk>/comments/?cursor=<next_cursor>&limit=<n>
+    """
+    def get(self, request, pk):
+        if not Post.objects.filter(pk=pk).exists():
+            return Response({"error": "Post not found"}, status=status.HTTP_404_NOT_FOUND)
+        comments = Comment.objects.filter(post_id=pk, is_deleted=False).with_votes(request.user)
+        try:
+            items, next_cursor = keyset_page(
+                comments, request.GET.get('cursor'), page_size(request.GET.get('limit')), descending=False
+            )
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'results': CommentSerializer(items, many=True, context={'request': request}).data,
+            'next_cursor': next_cursor,
+        })
+
+class UserPostView(ImageUploadMixin, APIView):
+    upload_max_bytes_setting = 'MEDIA_UPLOAD_MAX_BYTES'
     parser_classes = [MultiPartParser, FormParser, JSONParser]
     permission_classes = [IsAuthenticated]
     """CRUD para posts de usuarios"""
     # Permitir tanto JSON como multipart/form-data
     def get(self, request):
-        posts = request.user.posts.all()
-        serializer = PostSerializer(posts, many=True, context={'request': request})
+        posts = request.user.posts.with_votes(request.user)
+        # Con ?cursor= o ?limit= se devuelve una página {'results', 'next_cursor'};
+        # sin ellos, la lista completa como hasta ahora
+        if 'cursor' in request.GET or 'limit' in request.GET:
+            try:
+                items, next_cursor = keyset_page(posts, request.GET.get('cursor'), page_size(request.GET.get('limit')))
+            except InvalidCursor as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            return Response({
+                'results': PostSerializer(items, many=True, context={'request': request}).data,
+                'next_cursor': next_cursor,
+            })
+        serializer = PostSerializer(posts.order_by('-created_at', '-id'), many=True, context={'request': request})
         
         return Response(serializer.data)
 
@@ -1200,7 +1023,8 @@ class UserPostView(APIView):
             return Response(response_serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)  
     
-class PostDetailView(APIView):
+class PostDetailView(ImageUploadMixin, APIView):
+    upload_max_bytes_setting = 'MEDIA_UPLOAD_MAX_BYTES'
     parser_classes = [MultiPartParser, FormParser, JSONParser]
     """Obtener, actualizar o eliminar un post específico"""
     def get_object(self, pk):
@@ -1210,7 +1034,7 @@ class PostDetailView(APIView):
             return None
 
     def get(self, request, pk):
-        post = self.get_object(pk)
+        post = Post.objects.with_votes(request.user).filter(pk=pk).first()
         if not post:
             return Response({"error": "Post not found"}, status=status.HTTP_404_NOT_FOUND)
         serializer = PostSerializer(post, context={'request': request})
@@ -1252,7 +1076,7 @@ class CommentView(APIView):
     permission_classes = [IsAuthenticated]
     """CRUD para comentarios de usuarios"""
     def get(self, request):
-        comments = request.user.comments.filter(is_deleted=False)
+        comments = request.user.comments.filter(is_deleted=False).with_votes(request.user)
         serializer = CommentSerializer(comments, many=True, context={'request': request})
         return Response(serializer.data)
 
@@ -1277,7 +1101,7 @@ class CommentDetailView(APIView):
         except Comment.DoesNotExist:
             return None
     def get(self, request, pk):
-        comment = self.get_object(pk)
+        comment = Comment.objects.with_votes(request.user).filter(pk=pk).first()
         if not comment:
             return Response({"error": "Comment not found"}, status=status.HTTP_404_NOT_FOUND)
         serializer = CommentSerializer(comment, context={'request': request})
@@ -1308,6 +1132,17 @@ class CommentDetailView(APIView):
         # Return a JSON body with 200 to avoid some mobile clients treating empty 204 responses as network errors
         return Response({"message": "Comment deleted"}, status=status.HTTP_200_OK)
 
+def vote_response(target, action, vote_type):
+    user_vote = vote_type if action != 'removed' else None
+    return Response({
+        'action': action,
+        'vote_type': user_vote,
+        'vote_score': target.get_vote_score(),
+        'likes_count': target.likes_count,
+        'dislikes_count': target.dislikes_count,
+        'user_vote': user_vote
+    })
+
 class PostVoteView(APIView):
     permission_classes = [IsAuthenticated]
     """Votar en un post"""
@@ -1325,36 +1160,9 @@ class PostVoteView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Buscar voto existente del usuario para este post
-        vote, created = Vote.objects.get_or_create(
-            user=request.user,
-            post=post,
-            defaults={'vote_type': vote_type}
-        )
-        
-        if not created:
-            # Si ya existe un voto
-            if vote.vote_type == vote_type:
-                # Si es el mismo voto, lo eliminamos (toggle)
-                vote.delete()
-                action = 'removed'
-            else:
-                # Si es diferente, lo actualizamos
-                vote.vote_type = vote_type
-                vote.save()
-                action = 'updated'
-        else:
-            action = 'created'
-        
+        action = cast_vote(post, request.user, vote_type)
         # Devolver estado actualizado
-        return Response({
-            'action': action,
-            'vote_type': vote_type if action != 'removed' else None,
-            'vote_score': post.get_vote_score(),
-            'likes_count': post.get_likes_count(),
-            'dislikes_count': post.get_dislikes_count(),
-            'user_vote': post.get_user_vote(request.user)
-        })
+        return vote_response(post, action, vote_type)
 
 class CommentVoteView(APIView):
     permission_classes = [IsAuthenticated]
@@ -1373,120 +1181,89 @@ class CommentVoteView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Buscar voto existente del usuario para este comentario
-        vote, created = Vote.objects.get_or_create(
-            user=request.user,
-            comment=comment,
-            defaults={'vote_type': vote_type}
-        )
-        
-        if not created:
-            # Si ya existe un voto
-            if vote.vote_type == vote_type:
-                # Si es el mismo voto, lo eliminamos (toggle)
-                vote.delete()
-                action = 'removed'
-            else:
-                # Si es diferente, lo actualizamos
-                vote.vote_type = vote_type
-                vote.save()
-                action = 'updated'
-        else:
-            action = 'created'
-        
+        action = cast_vote(comment, request.user, vote_type)
         # Devolver estado actualizado
-        return Response({
-            'action': action,
-            'vote_type': vote_type if action != 'removed' else None,
-            'vote_score': comment.get_vote_score(),
-            'likes_count': comment.get_likes_count(),
-            'dislikes_count': comment.get_dislikes_count(),
-            'user_vote': comment.get_user_vote(request.user)
-        })
+        return vote_response(comment, action, vote_type)
+
+def filter_species_list(data):
+    """Deja solo los campos que usa el frontend en cada planta de species-list."""
+    if 'data' in data:
+        filtered_data = []
+        for plant in data['data']:
+            filtered_plant = {
+                'id': plant.get('id'),
+                'common_name': plant.get('common_name'),
+                'scientific_name': plant.get('scientific_name'),
+                'default_image': plant.get('default_image')
+            }
+            filtered_data.append(filtered_plant)
+        data['data'] = filtered_data
+    return data
+
+def mock_species_list(query_params):
+    query = query_params.get('q', None)
+    page = int(query_params.get('page', 1))
+    return filter_species_list(search_mock_species_list(query, page, plant_search.parse_filters(query_params)))
+
+def serve_species_list_from_mirror():
+    """La lista de plantas sale de la copia local si SPECIES_MIRROR está activo y ya tiene especies."""
+    return species_mirror.enabled() and species_mirror.has_species()
+
+def mirror_species_list(query_params):
+    """species-list desde la copia local de Perenual, con la búsqueda y los filtros de plant_search"""
+    query = query_params.get('q', None)
+    page = int(query_params.get('page', 1))
+    plants = plant_search.search(query, plant_search.parse_filters(query_params), origin='mirror')
+    return filter_species_list(mock_page(plants, page))
+
+def species_list_params(query_params, api_key):
+    """Parámetros de species-list a partir de los de la petición."""
+    params = {
+        'key': api_key,
+        'page': query_params.get('page', 1)
+    }
+    q = query_params.get('q', '')  # Búsqueda por nombre
+    indoor = query_params.get('indoor', None)  # Filtro para plantas de interior
+    hardiness = query_params.get('hardiness', None)  # Zona de resistencia
+    watering = query_params.get('watering', None)  # Frecuencia de riego
+    sunlight = query_params.get('sunlight', None)  # Requerimientos de luz
+
+    # Añadir parámetros de filtros si están presentes
+    if q:
+        params['q'] = q
+    if indoor is not None:
+        params['indoor'] = indoor
+    if hardiness:
+        params['hardiness'] = hardiness
+    if watering:
+        params['watering'] = watering
+    if sunlight:
+        params['sunlight'] = sunlight
+    return params
+
+def species_list_error(response):
+    # Pass through status and add details for debugging
+    return {"error": "Failed to fetch plants from Perenual API", "status": response.status_code, "details": response.text[:300]}
 
 class PerenualPlantListView(APIView):
     """Obtener lista de plantas desde Perenual API"""
     def get(self, request):
         if should_use_mock_data():
             print("/perenual/plants Using mock data for Perenual API")
-            query = request.GET.get('q', None)
-            page = int(request.GET.get('page', 1))
-            
-            data = search_mock_species_list(query, page)
-            if 'data' in data:
-                filtered_data = []
-                for plant in data['data']:
-                    filtered_plant = {
-                        'id': plant.get('id'),
-                        'common_name': plant.get('common_name'),
-                        'scientific_name': plant.get('scientific_name'),
-                        'default_image': plant.get('default_image')
-                    }
-                    filtered_data.append(filtered_plant)
-                data['data'] = filtered_data
-            return Response(data)
+            return Response(mock_species_list(request.GET))
+        if serve_species_list_from_mirror():
+            return Response(mirror_species_list(request.GET))
             
         # Read API key at request time and validate
         api_key = os.getenv('PERENUAL_API_KEY')
         if not api_key:
-            return Response(
-                {"error": "Perenual API key not configured", "env": "Missing PERENUAL_API_KEY"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-        page = request.GET.get('page', 1)
-        q = request.GET.get('q', '')  # Búsqueda por nombre
-        indoor = request.GET.get('indoor', None)  # Filtro para plantas de interior
-        hardiness = request.GET.get('hardiness', None)  # Zona de resistencia
-        watering = request.GET.get('watering', None)  # Frecuencia de riego
-        sunlight = request.GET.get('sunlight', None)  # Requerimientos de luz
-        
+            return Response(PerenualConfigError().data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
         try:
-            url = f"{PERENUAL_API_URL}/species-list"
-            params = {
-                'key': api_key,
-                'page': page
-            }
-            
-            # Añadir parámetros de filtros si están presentes
-            if q:
-                params['q'] = q
-            if indoor is not None:
-                params['indoor'] = indoor
-            if hardiness:
-                params['hardiness'] = hardiness
-            if watering:
-                params['watering'] = watering
-            if sunlight:
-                params['sunlight'] = sunlight
-            
-            response = requests.get(url, params=params)
-            
-            if response.status_code == 200:
-                data = response.json()
-                # Filtrar solo los campos deseados
-                if 'data' in data:
-                    filtered_data = []
-                    for plant in data['data']:
-                        filtered_plant = {
-                            'id': plant.get('id'),
-                            'common_name': plant.get('common_name'),
-                            'scientific_name': plant.get('scientific_name'),
-                            'default_image': plant.get('default_image')
-                        }
-                        filtered_data.append(filtered_plant)
-                    data['data'] = filtered_data
-                return Response(data)
-            
+            response = http_client.get(f"{PERENUAL_API_URL}/species-list", params=species_list_params(request.GET, api_key))
             if response.status_code == 200:
-                data = response.json()
-                return Response(data)
-            else:
-                # Pass through status and add details for debugging
-                return Response(
-                    {"error": "Failed to fetch plants from Perenual API", "status": response.status_code, "details": response.text[:300]}, 
-                    status=response.status_code
-                )
-                
+                return Response(filter_species_list(response.json()))
+            return Response(species_list_error(response), status=response.status_code)
         except Exception as e:
             return Response(
                 {"error": "Error connecting to Perenual API", "details": str(e)}, 
@@ -1496,244 +1273,199 @@ class PerenualPlantListView(APIView):
 class PerenualPlantDetailView(APIView):
     """Obtener detalles de una planta específica desde Perenual API"""
     def get(self, request, plant_id):
-        if should_use_mock_data():
-            print("Using mock data for Perenual API")
-            perenual_data = get_mock_species_details(plant_id)
-            if perenual_data:
-                care_data = perenual_data.get('care_guides')
-                # Procesar la información de cuidados
-                if care_data.get('data') and len(care_data['data']) > 0:
-                    first_guide = care_data['data'][0]
-                    if 'section' in first_guide:
-                        # Extraer watering, pruning y sunlight descriptions
-                        for section in first_guide['section']:
-                            section_type = section.get('type')
-                            if section_type == 'watering':
-                                perenual_data['watering_long'] = section.get('description', '')
-                            elif section_type == 'pruning':
-                                perenual_data['pruning'] = section.get('description', '')
-                            elif section_type == 'sunlight':
-                                perenual_data['sunlight_long'] = section.get('description', '')
-            # Añadir posts relacionados por plant_id (si existen)
-            try:
-                posts_qs = Post.objects.filter(plant_id=plant_id).order_by('-created_at')
-                perenual_data['posts'] = PostSerializer(posts_qs, many=True, context={'request': request}).data
-            except Exception as posts_e:
-                perenual_data['posts_error'] = str(posts_e)
-
-            return Response(perenual_data)
-        # Read API key at request time and validate
-        api_key = os.getenv('PERENUAL_API_KEY')
-        if not api_key:
+        try:
+            data = get_plant_details(plant_id)
+        except PerenualError as e:
+            return Response(e.data, status=e.status_code)
+        if not data:
             return Response(
-                {"error": "Perenual API key not configured", "env": "Missing PERENUAL_API_KEY"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {"error": "Plant not found"},
+                status=status.HTTP_404_NOT_FOUND
             )
+
+        # Añadir la primera página de posts relacionados por plant_id (si existen)
         try:
-            url = f"{PERENUAL_API_URL}/species/details/{plant_id}"
-            params = {
-                'key': api_key
-            }
-            
-            response = requests.get(url, params=params)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                # Obtener información de cuidados desde care_guides si existe
-                if 'care_guides' in data:
-                    care_guides_url = data['care_guides']
-                    try:
-                        care_response = requests.get(care_guides_url)
-                        if care_response.status_code == 200:
-                            care_data = care_response.json()
-                            # Procesar la información de cuidados
-                            if care_data.get('data') and len(care_data['data']) > 0:
-                                first_guide = care_data['data'][0]
-                                if 'section' in first_guide:
-                                    # Extraer watering, pruning y sunlight descriptions
-                                    for section in first_guide['section']:
-                                        section_type = section.get('type')
-                                        if section_type == 'watering':
-                                            data['watering_long'] = section.get('description', '')
-                                        elif section_type == 'pruning':
-                                            data['pruning'] = section.get('description', '')
-                                        elif section_type == 'sunlight':
-                                            data['sunlight_long'] = section.get('description', '')
-                    except Exception as care_e:
-                        print(f"Error fetching care guides: {str(care_e)}")
-                
-                # Añadir posts relacionados por plant_id (si existen)
-                try:
-                    posts_qs = Post.objects.filter(plant_id=plant_id).order_by('-created_at')
-                    data['posts'] = PostSerializer(posts_qs, many=True, context={'request': request}).data
-                except Exception as posts_e:
-                    data['posts_error'] = str(posts_e)
+            data['posts'], data['posts_next_cursor'] = plant_posts_page(request, plant_id)
+        except Exception as posts_e:
+            data['posts_error'] = str(posts_e)
 
-                return Response(data)
-            elif response.status_code == 404:
-                return Response(
-                    {"error": "Plant not found"}, 
-                    status=status.HTTP_404_NOT_FOUND
-                )
-            else:
-                return Response(
-                    {"error": "Failed to fetch plant details from Perenual API"}, 
-                    status=response.status_code
-                )
-                
-        except Exception as e:
-            return Response(
-                {"error": "Error connecting to Perenual API", "details": str(e)}, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        return Response(data)
 
 class PerenualPestDiseaseView(APIView):
     """Devuelve la lista local de enfermedades parseadas desde perenual_diseases.html (JSON generado).
     Soporta filtro opcional por 'q' en el nombre.
     """
     def get(self, request):
-        items = load_perenual_diseases_cards()
-        q = request.GET.get('q')
-        if q:
-            ql = q.lower()
-            items = [it for it in items if (it.get('name') or '').lower().find(ql) != -1]
-        return Response(items)
-    
+        return Response(mock_catalog.disease_cards.search(request.GET.get('q')))
+
+class SuggestView(APIView):
+    """Sugerencias de plantas y plagas para el buscador: ?q=<prefijo>&type=all|plant|pest&limit=N.
+    Las plantas salen de la copia local si está activa y si no de los datos mock.
+    """
+    def get(self, request):
+        query = request.GET.get('q', '')
+        kind = request.GET.get('type', 'all')
+        if kind not in ('all', *suggest.KINDS):
+            return Response({"error": "type debe ser all, plant o pest"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.GET.get('limit', getattr(settings, 'SUGGEST_LIMIT', 10)))
+        except ValueError:
+            return Response({"error": "limit debe ser un número"}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(max(limit, 1), getattr(settings, 'SUGGEST_MAX_LIMIT', 25))
+        origin = 'mirror' if not should_use_mock_data() and serve_species_list_from_mirror() else 'mock'
+        kinds = suggest.KINDS if kind == 'all' else (kind,)
+
+        results, etag = suggest.suggest(query, kinds, limit, origin)
+        if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response({'query': query, 'results': results})
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=getattr(settings, 'SUGGEST_MAX_AGE', 300))
+        return response
+
+def find_pest_card(target_id):
+    """Tarjeta del JSON local de enfermedades con ese id (o None)."""
+    return mock_catalog.disease_cards.get(target_id)
+
 class PerenualPestDiseaseDetailView(APIView):
-    """Devuelve el href de la enfermedad buscando por id en el JSON local.
+    """Detalle de la enfermedad (nombre, imagen y secciones) ya parseado de su página de Perenual
+    (api/pest_details.py), buscando su href por id en el JSON local.
     Se espera `pest_id` en la URL (por ejemplo, /api/perenual/pest-disease/<pest_id>/).
     """
     def get(self, request, pest_id):
-        items = load_perenual_diseases_cards()
         try:
             target_id = int(pest_id)
         except (TypeError, ValueError):
             return Response({"error": "Parámetro id inválido"}, status=status.HTTP_400_BAD_REQUEST)
-        for it in items:
-            if it.get('id') == target_id:
-                href = it.get('href')
-                print(f"🕸️ Scraping detail page for pest disease ID {pest_id}: {href}")
-                dresp = requests.get(href, timeout=20)
-                print(dresp)
-                if dresp.status_code != 200:
-                    return Response({'error': 'No se pudo cargar la página de detalle'}, status=status.HTTP_502_BAD_GATEWAY)
-                dsoup = BeautifulSoup(dresp.text, 'html.parser')
-
-                # Título (visible en el header)
-                title = None
-                header_title_div = dsoup.select_one('.text-5xl.font-bold')
-                if header_title_div:
-                    raw = header_title_div.get_text(separator=' ', strip=True)
-                    print(header_title_div)
-                    parts = [p.strip() for p in raw.split('>') if p.strip()]
-                    if parts:
-                        title = parts[-1]
-
-                # Subtítulo (nombre científico)
-                scientific_name = None
-                sci_block = dsoup.select_one('.italic.main-t-c.my-2')
-                if sci_block:
-                    scientific_name = sci_block.get_text(strip=True)
-
-                # Imagen principal dentro de main (evitando logos)
-                image_url = None
-                candidate_imgs = dsoup.select('main img') or []
-                for im in candidate_imgs:
-                    src = im.get('src') or ''
-                    alt = (im.get('alt') or '').lower()
-                    if 'logo' in src or 'logo' in alt:
-                        continue
-                    if 'storage' in src or 'perenual.com/storage' in src:
-                        image_url = src
-                        break
-                if not image_url:
-                    for im in candidate_imgs:
-                        src = im.get('src') or ''
-                        if 'logo' not in src:
-                            image_url = src
-                            break
-
-                # Secciones (clase exacta indicada)
-                sections = []
-                for sec in dsoup.select('div.rounded-md.shadow.p-3.mb-2.text-sm'):
-                    text = sec.get_text('\n', strip=True)
-                    if text:
-                        sections.append(text)
-                # Formatear secciones para el frontend: títulos, párrafos y viñetas
-                def _format_sections(raw_sections):
-                    import re
-                    formatted = []
-                    for raw in raw_sections:
-                        lines = [l.strip() for l in raw.split('\n') if l.strip()]
-                        current = None
-                        para_buf = []
-
-                        def flush_para():
-                            nonlocal para_buf, current
-                            if para_buf:
-                                text = ' '.join(para_buf)
-                                if current is None:
-                                    current = {'title': None, 'subtitle': None, 'paragraphs': [], 'bullets': []}
-                                current['paragraphs'].append(text)
-                                para_buf = []
-
-                        def is_heading(line: str) -> bool:
-                            # Casos típicos: "Symptoms", "Solutions", líneas que acaban en '?' o patrones "N - Subtítulo"
-                            if line in ('Symptoms', 'Solutions'):
-                                return True
-                            if line.endswith('?') and len(line) < 200:
-                                return True
-                            if re.match(r'^\d+\s*-\s+.+', line):
-                                return True
-                            # Título corto con inicial mayúscula y sin punto final
-                            if len(line) <= 80 and re.match(r'^[A-Z][A-Za-z0-9\-\(\)\s]+$', line) and not line.endswith('.'):
-                                return True
-                            return False
-
-                        def is_bullet(line: str) -> bool:
-                            return bool(re.match(r'^[•\-\*]\s+', line)) or line.startswith('•') or line.startswith('- ') or line.startswith('* ')
-
-                        for ln in lines:
-                            if is_heading(ln):
-                                flush_para()
-                                # cerrar sección previa
-                                if current:
-                                    formatted.append(current)
-                                # iniciar nueva
-                                current = {'title': ln, 'subtitle': None, 'paragraphs': [], 'bullets': []}
-                                m = re.match(r'^\s*(\d+)\s*-\s*(.+)$', ln)
-                                if m:
-                                    # usar texto tras el número como título y guardar el número como subtítulo opcional
-                                    current['title'] = m.group(2)
-                                    current['subtitle'] = f"{m.group(1)}"
-                                continue
-                            if is_bullet(ln):
-                                flush_para()
-                                if current is None:
-                                    current = {'title': None, 'subtitle': None, 'paragraphs': [], 'bullets': []}
-                                bullet = re.sub(r'^[•\-\*]\s*', '', ln)
-                                current['bullets'].append(bullet)
-                            else:
-                                para_buf.append(ln)
-                        # cerrar buffers al terminar
-                        flush_para()
-                        if current:
-                            formatted.append(current)
-                    return formatted
-
-                structured_sections = _format_sections(sections)
-
-                print(f"✅ Found disease detail: {title}, scientific name: {scientific_name}, image: {image_url}, sections: {len(sections)}")
-                print("="*30 + "\n")
-                print(structured_sections[:2])  # muestra las 2 primeras secciones formateadas
+        card = find_pest_card(target_id)
+        if card is None:
+            return Response({"error": "Enfermedad no encontrada"}, status=status.HTTP_404_NOT_FOUND)
 
-                return Response({
-                    'name': title,
-                    'scientific_name': scientific_name,
-                    'image': image_url,
-                    'sections': structured_sections,
-                })
+        try:
+            return Response(pest_details.get_detail(target_id, card.get('href')))
+        except PestDetailError as e:
+            print(f"Error loading pest detail {pest_id}: {e}")
+            return Response({'error': 'No se pudo cargar la página de detalle'}, status=status.HTTP_502_BAD_GATEWAY)
+
+
+class MetricsView(APIView):
+    """Métricas de caché y de llamadas salientes del worker que atiende la petición.
+    Cada worker de gunicorn tiene sus propios contadores.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            'pid': os.getpid(),
+            'perenual_cache': perenual.cache_stats(),
+            'species_mirror': species_mirror.stats(),
+            'pest_details': pest_details.stats(),
+            'outbound_latency': http_client.latency_stats(),
+            'inference': {'plant': model.stats(), 'disease': model_disease.stats()},
+            'model_server': model.health() if isinstance(model, RemotePredictor) else None,
+            'prediction_cache': prediction_cache.stats(),
+        })
+
+
+# Vistas asíncronas (ASGI)
+# Variantes de las vistas que solo hacen de proxy de APIs externas. Con uvicorn
+# (SERVER_MODE=asgi) cada worker puede mantener muchas peticiones esperando a
+# Perenual/OpenWeather en lugar de una por hilo. Devuelven los mismos cuerpos que
+# las vistas de DRF; api/urls.py elige unas u otras con ASYNC_VIEWS.
+
+def _authenticate(request):
+    """Aplica la autenticación JWT de DRF a una petición de Django (para user_vote)."""
+    result = JWTAuthentication().authenticate(request)
+    if result is not None:
+        request.user = result[0]
+    elif not hasattr(request, 'user'):
+        request.user = AnonymousUser()
+
+
+class AsyncPerenualPlantListView(View):
+    """Versión asíncrona de PerenualPlantListView"""
+    async def get(self, request):
+        if should_use_mock_data():
+            print("/perenual/plants Using mock data for Perenual API")
+            return JsonResponse(await sync_to_async(mock_species_list)(request.GET))
+        if await sync_to_async(serve_species_list_from_mirror)():
+            return JsonResponse(await sync_to_async(mirror_species_list)(request.GET))
 
-        return Response({"error": "Enfermedad no encontrada"}, status=status.HTTP_404_NOT_FOUND)
+        api_key = os.getenv('PERENUAL_API_KEY')
+        if not api_key:
+            return JsonResponse(PerenualConfigError().data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+        try:
+            response = await http_client.aget(f"{PERENUAL_API_URL}/species-list", params=species_list_params(request.GET, api_key))
+            if response.status_code == 200:
+                return JsonResponse(filter_species_list(response.json()))
+            return JsonResponse(species_list_error(response), status=response.status_code)
+        except Exception as e:
+            return JsonResponse(
+                {"error": "Error connecting to Perenual API", "details": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class AsyncPerenualPlantDetailView(View):
+    """Versión asíncrona de PerenualPlantDetailView"""
+    async def get(self, request, plant_id):
+        try:
+            await sync_to_async(_authenticate)(request)
+        except AuthenticationFailed as e:
+            return JsonResponse({"detail": str(e.detail)}, status=status.HTTP_401_UNAUTHORIZED)
+
+        try:
+            if should_use_mock_data() or species_mirror.enabled():
+                data = await sync_to_async(get_plant_details)(plant_id)
+            else:
+                data = await perenual.aget_species_details(plant_id)
+        except PerenualError as e:
+            return JsonResponse(e.data, status=e.status_code)
+        if not data:
+            return JsonResponse({"error": "Plant not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        # Añadir la primera página de posts relacionados por plant_id (si existen)
+        try:
+            data['posts'], data['posts_next_cursor'] = await sync_to_async(plant_posts_page)(request, plant_id)
+        except Exception as posts_e:
+            data['posts_error'] = str(posts_e)
+
+        return JsonResponse(data)
+
+
+class AsyncWeatherRecommendationView(View):
+    """Versión asíncrona de WeatherRecommendationView"""
+    async def get(self, request):
+        lat = request.GET.get('lat')
+        lon = request.GET.get('lon')
+        if not lat or not lon:
+            return JsonResponse({"error": "lat and lon are required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            response = await http_client.aget(weather_request_url(lat, lon))
+        except httpx.HTTPError:
+            return JsonResponse({"error": "Error fetching weather"}, status=status.HTTP_502_BAD_GATEWAY)
+        if response.status_code != 200:
+            return JsonResponse({"error": "Error fetching weather"}, status=status.HTTP_502_BAD_GATEWAY)
+        return JsonResponse(await sync_to_async(weather_recommendation, thread_sensitive=False)(response.json()))
+
+
+class AsyncPerenualPestDiseaseDetailView(View):
+    """Versión asíncrona de PerenualPestDiseaseDetailView"""
+    async def get(self, request, pest_id):
+        try:
+            target_id = int(pest_id)
+        except (TypeError, ValueError):
+            return JsonResponse({"error": "Parámetro id inválido"}, status=status.HTTP_400_BAD_REQUEST)
+        card = await sync_to_async(find_pest_card, thread_sensitive=False)(target_id)
+        if card is None:
+            return JsonResponse({"error": "Enfermedad no encontrada"}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            return JsonResponse(await pest_details.aget_detail(target_id, card.get('href')))
+        except PestDetailError as e:
+            print(f"Error loading pest detail {pest_id}: {e}")
+            return JsonResponse({'error': 'No se pudo cargar la página de detalle'}, status=status.HTTP_502_BAD_GATEWAY)
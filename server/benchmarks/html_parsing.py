@@ -0,0 +1,116 @@
+"""Tiempo y memoria de extraer las tarjetas de perenual_diseases.html (~490 KB, 256 tarjetas).
+
+Variantes:
+- anterior: diseases_parser.py antes de api/html_parsing.py (BeautifulSoup con
+  html.parser sobre el documento entero y selectores CSS por tarjeta);
+- bs4 + lxml: el mismo código con lxml como parser de BeautifulSoup;
+- bs4 + lxml + strainer: además con SoupStrainer (solo se construyen las tarjetas);
+- lxml + XPath: diseases_parser.parse_diseases actual (árbol de lxml, sin BeautifulSoup).
+
+Cada variante se mide en su propio proceso: mediana de --repeat ejecuciones y pico de
+memoria del proceso (RSS) durante el parseo, porque tracemalloc no ve la memoria que
+reserva libxml2. Se comprueba que todas devuelven las mismas tarjetas.
+
+Uso (desde server/):
+    python benchmarks/html_parsing.py --repeat 10
+"""
+import argparse
+import json
+import os
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import diseases_parser  # noqa: E402
+from api.html_parsing import PARSER, TagStrainer, has_classes, parse  # noqa: E402
+from bs4 import BeautifulSoup  # noqa: E402
+
+HTML_PATH = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) / 'perenual_diseases.html'
+CARDS = TagStrainer(('a', {'class': has_classes('search-container-box', 'shadow', 'relative')}))
+
+
+def soup_cards(soup):
+    """Extracción anterior de diseases_parser.parse_diseases sobre un BeautifulSoup."""
+    items = []
+    for a in soup.select("a.search-container-box.shadow.relative"):
+        href = a.get("href")
+        item_id = None
+        if href:
+            try:
+                item_id = int(href.rstrip('/').split('/')[-1])
+            except Exception:
+                item_id = None
+        img_url = None
+        img_div = a.select_one("div.aspect-video.bg-cover.bg-center")
+        if img_div and img_div.has_attr("style"):
+            img_url = diseases_parser.extract_background_image_url(img_div.get("style"))
+        name_el = a.select_one(".text-xl.font-bold.line-clamp-2")
+        name = name_el.get_text(strip=True) if name_el else None
+        sol_el = a.select_one(".main-t-c")
+        m = re.search(r"(\d+)", sol_el.get_text(strip=True) if sol_el else "")
+        items.append({"id": item_id, "href": href, "image": img_url, "name": name,
+                      "solutions_count": int(m.group(1)) if m else None})
+    return items
+
+
+VARIANTS = {
+    'anterior (html.parser)': lambda html: soup_cards(BeautifulSoup(html, 'html.parser')),
+    'bs4 + lxml': lambda html: soup_cards(parse(html)),
+    'bs4 + lxml + strainer': lambda html: soup_cards(parse(html, CARDS)),
+    'lxml + XPath (actual)': None,  # diseases_parser.parse_diseases
+}
+
+
+def run_variant(name, repeat):
+    """Mide una variante en este proceso e imprime el resultado como JSON."""
+    extract = VARIANTS[name]
+
+    def once():
+        if extract is None:
+            return diseases_parser.parse_diseases(HTML_PATH)
+        return extract(HTML_PATH.read_text(encoding='utf-8'))
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    items = once()
+    rss_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        once()
+        times.append(time.perf_counter() - start)
+    print(json.dumps({'items': items, 'median': statistics.median(times),
+                      'rss_kb': rss_peak - rss_before}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--variant', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.variant:
+        run_variant(args.variant, args.repeat)
+        return
+    if PARSER != 'lxml':
+        sys.exit("lxml no está instalado (pip install lxml)")
+
+    print(f"{HTML_PATH.name}: {HTML_PATH.stat().st_size / 1024:.0f} KB, mediana de {args.repeat} ejecuciones")
+    baseline = None
+    for name in VARIANTS:
+        output = subprocess.run([sys.executable, __file__, '--variant', name, '--repeat', str(args.repeat)],
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        if baseline is None:
+            baseline = result
+        same = 'igual' if result['items'] == baseline['items'] else 'DISTINTO'
+        print(f"  {name:<24} {result['median'] * 1000:7.1f} ms (x{baseline['median'] / result['median']:5.1f})  "
+              f"pico RSS +{result['rss_kb'] / 1024:5.1f} MB  {len(result['items'])} tarjetas ({same})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Latencia y memoria de decodificar una subida: resolución completa frente a reducida.
+
+Genera una foto JPEG del tamaño de una de móvil (por defecto 4000x3000, 12 MP) y
+mide, en un proceso nuevo por modo para que el pico de RSS sea el de ese modo:
+  - "completa": lo que hacían las vistas, `np.frombuffer(f.read())` + `cv2.imdecode(IMREAD_COLOR)`.
+  - "reducida": `image_decode.read_buffer` + `image_decode.decode_image` (IMREAD_REDUCED_COLOR_*).
+En ambos casos se incluye el preprocesado del clasificador (onnx_backend.preprocess).
+
+Uso (desde server/):
+    python benchmarks/image_decode.py --size 4000x3000 --iterations 30
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_photo(width, height):
+    from io import BytesIO
+
+    import numpy as np
+    from PIL import Image
+
+    # Ruido suave para que el JPEG tenga un tamaño realista (no un color plano)
+    rng = np.random.default_rng(0)
+    small = rng.integers(0, 255, (height // 16, width // 16, 3), dtype=np.uint8)
+    image = Image.fromarray(small).resize((width, height), Image.BILINEAR)
+    buffer = BytesIO()
+    image.save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def run_mode(mode, path, iterations):
+    import resource
+    import statistics
+    import time
+
+    import django
+
+    django.setup()
+    import cv2
+    import numpy as np
+    from django.core.files.uploadedfile import SimpleUploadedFile
+
+    from api import image_decode
+    from api.onnx_backend import preprocess
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    latencies, shape = [], None
+    for _ in range(iterations):
+        upload = SimpleUploadedFile('photo.jpg', data, content_type='image/jpeg')
+        start = time.perf_counter()
+        if mode == 'completa':
+            image = cv2.imdecode(np.frombuffer(upload.read(), dtype=np.uint8), cv2.IMREAD_COLOR)
+        else:
+            image = image_decode.decode_image(image_decode.read_buffer(upload))
+        preprocess(image, 224)
+        latencies.append(time.perf_counter() - start)
+        shape = image.shape
+        del image
+    return {
+        'bytes': len(data),
+        'shape': shape,
+        'p50': statistics.median(latencies),
+        'max': max(latencies),
+        'rss_delta_mb': (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base_rss) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', default='4000x3000')
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--child', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, SERVER_DIR)
+        print('BENCH ' + json.dumps(run_mode(args.child[0], args.child[1], args.iterations)))
+        return
+
+    import tempfile
+
+    width, height = (int(v) for v in args.size.lower().split('x'))
+    # La foto se genera aquí para que su creación no cuente en el pico de RSS de los hijos
+    with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as f:
+        f.write(make_photo(width, height))
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE='plants.settings')
+    print(f"imagen {width}x{height}, {args.iterations} iteraciones")
+    try:
+        for mode in ('completa', 'reducida'):
+            report(mode, subprocess.run([sys.executable, __file__, '--child', mode, f.name,
+                                         '--iterations', str(args.iterations)],
+                                        cwd=SERVER_DIR, env=env, capture_output=True, text=True))
+    finally:
+        os.unlink(f.name)
+
+
+def report(mode, out):
+    line = next((line for line in out.stdout.splitlines() if line.startswith('BENCH ')), None)
+    if line is None:
+        print(f"  {mode:<9} error: {out.stderr.strip().splitlines()[-1:]}")
+        return
+    r = json.loads(line[6:])
+    print(f"  {mode:<9} JPEG {r['bytes'] / 1024 / 1024:4.1f} MB -> {r['shape'][1]}x{r['shape'][0]}  "
+          f"p50 {r['p50'] * 1000:6.1f} ms  max {r['max'] * 1000:6.1f} ms  "
+          f"pico RSS +{r['rss_delta_mb']:5.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
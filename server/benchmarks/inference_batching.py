@@ -0,0 +1,101 @@
+"""Benchmark del micro-batching de inferencia (api/inference.py) en CPU.
+
+Carga el clasificador de plantas y lanza `--requests` predicciones de imágenes
+aleatorias ya decodificadas desde `--concurrency` hilos (como las peticiones
+simultáneas de un worker con varios hilos). Compara la inferencia imagen a imagen
+(max_batch=1) con varios tamaños de batch y esperas: rendimiento y latencias p50/p99.
+
+Uso (desde server/):
+    python benchmarks/inference_batching.py --concurrency 16 --batches 1 4 8 16 --waits 5 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'plants.settings')
+os.environ.setdefault('YOLO_CONFIG_DIR', '/tmp/Ultralytics')
+
+import django  # noqa: E402
+
+django.setup()
+
+from ultralytics import YOLO  # noqa: E402
+
+from api.inference import BatchingPredictor  # noqa: E402
+
+WEIGHTS = "./model/results/plantify_model_v1/weights/best.pt"
+
+
+def run(predictor, images, total, concurrency):
+    latencies = []
+    counter = iter(range(total))
+    lock = threading.Lock()
+
+    def client():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            start = time.perf_counter()
+            predictor.predict(images[i % len(images)])
+            latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, sorted(latencies)
+
+
+class DirectPredictor:
+    """Inferencia imagen a imagen en el hilo de la petición, como antes."""
+
+    def __init__(self, model):
+        self.model = model
+
+    def predict(self, image):
+        return self.model.predict(image, verbose=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=256)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--batches', type=int, nargs='+', default=[1, 4, 8, 16])
+    parser.add_argument('--waits', type=float, nargs='+', default=[5, 20], help='INFERENCE_MAX_WAIT_MS a probar')
+    args = parser.parse_args()
+
+    model = YOLO(WEIGHTS)
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 255, (480, 640, 3), dtype=np.uint8) for _ in range(32)]
+    model.predict(images[0], verbose=False)  # calentar
+
+    configs = [('directo', DirectPredictor(model))]
+    for max_batch in args.batches:
+        if max_batch <= 1:
+            continue
+        for wait in args.waits:
+            configs.append((f'batch={max_batch} espera={wait:g}ms', BatchingPredictor(model, max_batch=max_batch, max_wait_ms=wait)))
+
+    print(f"peticiones={args.requests} concurrencia={args.concurrency} hilos torch={__import__('torch').get_num_threads()}")
+    for label, predictor in configs:
+        elapsed, latencies = run(predictor, images, args.requests, args.concurrency)
+        p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+        extra = ''
+        if isinstance(predictor, BatchingPredictor):
+            extra = f"  batch medio {predictor.stats()['avg_batch']}"
+        print(f"  {label:<24} {args.requests / elapsed:7.1f} img/s  "
+              f"p50 {statistics.median(latencies) * 1000:6.0f} ms  p99 {p99 * 1000:6.0f} ms{extra}")
+
+
+if __name__ == '__main__':
+    main()
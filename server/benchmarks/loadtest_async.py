@@ -0,0 +1,168 @@
+"""Prueba de carga: cuántas peticiones que esperan a Perenual aguanta un solo worker.
+
+Levanta una API de Perenual falsa que tarda `--delay` segundos en responder, arranca
+la aplicación con un único worker y lanza `--requests` peticiones a
+/api/perenual/plants/ con `--concurrency` clientes a la vez. Al final muestra el
+rendimiento, las latencias y el máximo de peticiones simultáneas que llegaron a la
+API falsa (es decir, cuántas mantuvo abiertas el worker a la vez).
+
+Uso (desde server/):
+    python benchmarks/loadtest_async.py --mode asgi --concurrency 200
+    python benchmarks/loadtest_async.py --mode wsgi --concurrency 200   # gunicorn sync, para comparar
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class FakePerenual:
+    """API HTTP mínima que responde a species-list tras `delay` segundos."""
+
+    def __init__(self, port, delay):
+        self.port = port
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self.total = 0
+        self.ready = threading.Event()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                while (await reader.readline()) not in (b'\r\n', b''):
+                    pass
+                self.in_flight += 1
+                self.total += 1
+                self.peak = max(self.peak, self.in_flight)
+                await asyncio.sleep(self.delay)
+                self.in_flight -= 1
+                body = json.dumps({'data': [{'id': 1, 'common_name': 'Bench Plant'}], 'total': 1}).encode()
+                writer.write(
+                    b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                    + f'Content-Length: {len(body)}\r\n\r\n'.encode() + body
+                )
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def run(self):
+        async def main():
+            server = await asyncio.start_server(self.handle, '127.0.0.1', self.port, backlog=4096)
+            self.ready.set()
+            async with server:
+                await server.serve_forever()
+        asyncio.run(main())
+
+
+def start_app(mode, port, upstream_port):
+    env = dict(
+        os.environ,
+        SERVER_MODE=mode,
+        USE_MOCK_DATA='False',
+        PERENUAL_API_KEY='bench',
+        PERENUAL_API_URL=f'http://127.0.0.1:{upstream_port}/api/v2',
+        OUTBOUND_MAX_RETRIES='0',
+        OUTBOUND_READ_TIMEOUT='120',
+        OUTBOUND_ASYNC_MAX_CONNECTIONS='1000',
+        DEBUG='False',
+        ALLOWED_HOSTS='127.0.0.1,localhost',
+    )
+    if mode == 'asgi':
+        cmd = [sys.executable, '-m', 'uvicorn', 'plants.asgi:application',
+               '--port', str(port), '--workers', '1', '--log-level', 'warning', '--backlog', '4096']
+    else:
+        cmd = [sys.executable, '-m', 'gunicorn', 'plants.wsgi:application',
+               '--bind', f'127.0.0.1:{port}', '--workers', '1', '--timeout', '300', '--backlog', '4096']
+    return subprocess.Popen(cmd, cwd=SERVER_DIR, env=env, stdout=subprocess.DEVNULL)
+
+
+def wait_ready(port, timeout=180):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f'http://127.0.0.1:{port}/api/refresh/', timeout=2)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.5)
+    raise RuntimeError('La aplicación no arrancó a tiempo')
+
+
+async def load(port, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+    # Pocas conexiones keep-alive: con cientos de conexiones ociosas el pool de httpx se degrada
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=20)
+    async with httpx.AsyncClient(limits=limits, timeout=300) as client:
+        async def one(i):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    r = await client.get(f'http://127.0.0.1:{port}/api/perenual/plants/', params={'page': i})
+                    if r.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[one(i) for i in range(total)])
+        elapsed = time.perf_counter() - start
+    return elapsed, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=['asgi', 'wsgi'], default='asgi')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--delay', type=float, default=0.5, help='latencia de la API falsa (s)')
+    args = parser.parse_args()
+
+    upstream = FakePerenual(free_port(), args.delay)
+    threading.Thread(target=upstream.run, daemon=True).start()
+    upstream.ready.wait()
+
+    port = free_port()
+    app = start_app(args.mode, port, upstream.port)
+    try:
+        wait_ready(port)
+        elapsed, latencies, errors = asyncio.run(load(port, args.requests, args.concurrency))
+    finally:
+        app.terminate()
+        app.wait()
+
+    latencies.sort()
+    print(f"modo={args.mode} peticiones={args.requests} concurrencia={args.concurrency} retardo={args.delay}s")
+    print(f"  tiempo total:      {elapsed:.2f}s  ({args.requests / elapsed:.1f} req/s)")
+    print(f"  latencia p50/p95:  {statistics.median(latencies) * 1000:.0f} / "
+          f"{latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f} ms")
+    print(f"  errores:           {errors}")
+    print(f"  llamadas a la API: {upstream.total}, máximo simultáneas: {upstream.peak}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""Latencia de las vistas de Perenual en modo mock (USE_MOCK_DATA=True).
+
+Compara el catálogo en memoria (api/mock_catalog.py) con las funciones anteriores,
+que abrían y parseaban el JSON mock en cada llamada y recorrían la lista entera.
+Usa una base de datos de test temporal (un usuario con jardines y una planta), no
+toca db.sqlite3.
+
+Uso (desde server/):
+    python benchmarks/mock_catalog.py --requests 300
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'plants.settings')
+os.environ.setdefault('YOLO_CONFIG_DIR', '/tmp/Ultralytics')
+os.environ['USE_MOCK_DATA'] = 'True'
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from rest_framework.test import APIRequestFactory, force_authenticate  # noqa: E402
+
+from api import views  # noqa: E402
+from api.models import Garden, UserPlant  # noqa: E402
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def legacy_get_mock_species_details(plant_id):
+    """get_mock_species_details anterior: json.load + recorrido lineal en cada llamada."""
+    with open(os.path.join(DATA_DIR, 'species-details-mock.json'), 'r', encoding='utf-8') as f:
+        mock_data = json.load(f)
+    for plant in mock_data:
+        if plant.get('id') == int(plant_id):
+            return plant
+    return None
+
+
+def legacy_search_mock_species_list(query=None, page=1):
+    """search_mock_species_list anterior."""
+    with open(os.path.join(DATA_DIR, 'species-list-mock.json'), 'r', encoding='utf-8') as f:
+        plants = json.load(f).get('data', [])
+    if query:
+        query_lower = query.lower()
+        plants = [plant for plant in plants
+                  if query_lower in plant.get('common_name', '').lower()
+                  or any(query_lower in name.lower() for name in plant.get('scientific_name', []))]
+    return views.mock_page(plants, page)
+
+
+def measure(view, make_request, total):
+    latencies = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(total):
+            request = make_request()
+            start = time.perf_counter()
+            response = view(request)
+            response.render()
+            latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies), sorted(latencies)[int(len(latencies) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=300)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    factory = APIRequestFactory()
+    try:
+        user = User.objects.create_user(username='bench', password='x')
+        plant_id = views.load_species_details_mock()[0]['id']
+        for humidity in ('low', 'normal', 'high'):
+            Garden.objects.create(owner=user, name=f'Jardín {humidity}', humidity=humidity)
+        user_plant = UserPlant.objects.create(owner=user, plant_id=plant_id, common_name='Bench')
+
+        def get(path, **params):
+            def make():
+                request = factory.get(path, params)
+                force_authenticate(request, user=user)
+                return request
+            return make
+
+        cases = [
+            ('lista', views.PerenualPlantListView.as_view(), get('/api/perenual/plants/'), {}),
+            ('búsqueda', views.PerenualPlantListView.as_view(), get('/api/perenual/plants/', q='fir'), {}),
+            ('detalle', views.PerenualPlantDetailView.as_view(), get(f'/api/perenual/plants/{plant_id}/'),
+             {'plant_id': plant_id}),
+            ('idoneidad', views.GardenSuitabilityView.as_view(),
+             get('/api/gardens/suitability/', plant_id=plant_id), {}),
+            ('planta usuario', views.UserPlantDetailView.as_view(), get(f'/api/userplant/{user_plant.pk}/'),
+             {'pk': user_plant.pk}),
+        ]
+        print(f"{args.requests} peticiones por vista (p50 / p99)")
+        for label, view, make_request, kwargs in cases:
+            def call(request, view=view, kwargs=kwargs):
+                return view(request, **kwargs)
+
+            with patch('api.views.get_mock_species_details', legacy_get_mock_species_details), \
+                    patch('api.views.search_mock_species_list', legacy_search_mock_species_list):
+                old = measure(call, make_request, args.requests)
+            new = measure(call, make_request, args.requests)
+            print(f"  {label:<15} anterior {old[0] * 1000:6.2f} / {old[1] * 1000:6.2f} ms   "
+                  f"catálogo {new[0] * 1000:6.2f} / {new[1] * 1000:6.2f} ms   (x{old[0] / new[0]:.1f})")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Latencia y rendimiento en CPU de los backends de inferencia (INFERENCE_BACKEND).
+
+Compara el modelo .pt con Ultralytics ('torch') con los exportados por
+`manage.py export_models --int8` ('onnx', 'onnx-int8'): latencia de una imagen
+(p50/p99) y rendimiento con batches de `--batch` imágenes. Cada backend se mide
+en un proceso nuevo para que también se vea la memoria (RSS) que añade.
+
+Uso (desde server/):
+    python benchmarks/onnx_backend.py --model plant --iterations 50
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_backend(backend, name, iterations, batch):
+    import resource
+    import statistics
+    import time
+
+    import django
+    import numpy as np
+
+    django.setup()
+    from api.inference import load_model
+
+    start = time.perf_counter()
+    model = load_model(name, backend)
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 255, (480, 640, 3), dtype=np.uint8) for _ in range(batch)]
+    model.predict(images[0], verbose=False)
+    load_time = time.perf_counter() - start
+
+    latencies = []
+    for i in range(iterations):
+        t = time.perf_counter()
+        model.predict(images[i % batch], verbose=False)
+        latencies.append(time.perf_counter() - t)
+    latencies.sort()
+
+    rounds = max(1, iterations // batch)
+    t = time.perf_counter()
+    for _ in range(rounds):
+        model.predict(images, verbose=False)
+    throughput = rounds * batch / (time.perf_counter() - t)
+
+    return {
+        'load': load_time,
+        'p50': statistics.median(latencies),
+        'p99': latencies[max(0, int(len(latencies) * 0.99) - 1)],
+        'throughput': throughput,
+        'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default='plant', choices=['plant', 'disease'])
+    parser.add_argument('--backends', nargs='+', default=['torch', 'onnx', 'onnx-int8'])
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--batch', type=int, default=8)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, SERVER_DIR)
+        print('BENCH ' + json.dumps(run_backend(args.child, args.model, args.iterations, args.batch)))
+        return
+
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE='plants.settings')
+    env.setdefault('YOLO_CONFIG_DIR', '/tmp/Ultralytics')
+    print(f"modelo={args.model} iteraciones={args.iterations} batch={args.batch}")
+    for backend in args.backends:
+        out = subprocess.run(
+            [sys.executable, __file__, '--child', backend, '--model', args.model,
+             '--iterations', str(args.iterations), '--batch', str(args.batch)],
+            cwd=SERVER_DIR, env=env, capture_output=True, text=True,
+        )
+        line = next((line for line in out.stdout.splitlines() if line.startswith('BENCH ')), None)
+        if line is None:
+            print(f"  {backend:<10} error: {out.stderr.strip().splitlines()[-1:]}")
+            continue
+        r = json.loads(line[6:])
+        print(f"  {backend:<10} carga {r['load']:5.1f}s  p50 {r['p50'] * 1000:6.1f} ms  p99 {r['p99'] * 1000:6.1f} ms  "
+              f"batch {r['throughput']:6.1f} img/s  RSS {r['rss_mb']:5.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
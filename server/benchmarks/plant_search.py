@@ -0,0 +1,110 @@
+"""Latencia de la búsqueda de plantas mientras se escribe (api/plant_search.py).
+
+Genera catálogos sintéticos de varios tamaños (Perenual tiene ~10.000 especies) con
+las palabras de species-list-mock.json más palabras inventadas a partir de ellas,
+para que el vocabulario crezca con el catálogo como en el real, y lanza, para una muestra
+de nombres, todas sus consultas de tecleo: "j", "ja", "jap", ..., "japanese m",
+"japanese ma", ... Compara el índice invertido con el recorrido anterior, que
+pasaba a minúsculas y buscaba la subcadena en cada planta en cada consulta.
+
+Uso (desde server/):
+    python benchmarks/plant_search.py --sizes 30 1000 10000 --names 50
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.plant_search import PlantSearchIndex  # noqa: E402
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def legacy_search(plants, query):
+    """Filtro anterior de search_mock_species_list."""
+    query_lower = query.lower()
+    return [plant for plant in plants
+            if query_lower in plant.get('common_name', '').lower()
+            or any(query_lower in name.lower() for name in plant.get('scientific_name', []))]
+
+
+SYLLABLES = ('a', 'ia', 'um', 'is', 'ora', 'ella', 'ensis', 'ana', 'ii', 'berry', 'wood', 'leaf', 'wort')
+
+
+def pseudo_words(words, count, rng):
+    """Palabras con la misma pinta que `words` (raíz de una existente + terminación)."""
+    result = set(words)
+    for _ in range(count * 20):
+        if len(result) >= count:
+            break
+        root = rng.choice(words)
+        ending = ''.join(rng.sample(SYLLABLES, rng.randint(1, 3)))
+        result.add(root[:rng.randint(3, max(3, len(root)))].capitalize() + ending)
+    return sorted(result)
+
+
+def make_catalog(size, seed=0):
+    with open(os.path.join(DATA_DIR, 'species-list-mock.json'), 'r', encoding='utf-8') as f:
+        base = json.load(f)['data']
+    rng = random.Random(seed)
+    common_words = pseudo_words(sorted({w for p in base for w in p['common_name'].split()}), size // 2, rng)
+    genera = pseudo_words(sorted({p['genus'] for p in base if p.get('genus')}), size // 20, rng)
+    epithets = [w.lower() for w in pseudo_words(
+        sorted({p['species_epithet'] for p in base if p.get('species_epithet')}), size // 5, rng)]
+    families = sorted({p['family'] for p in base if p.get('family')})
+    plants = [dict(p) for p in base[:size]]
+    for i in range(len(plants), size):
+        genus = rng.choice(genera)
+        plants.append({
+            'id': i + 1,
+            'common_name': ' '.join(rng.sample(common_words, rng.randint(2, 3))),
+            'scientific_name': [f"{genus} {rng.choice(epithets)}"],
+            'other_name': [' '.join(rng.sample(common_words, 2)) for _ in range(rng.randint(0, 2))],
+            'family': rng.choice(families),
+        })
+    return plants
+
+
+def typeahead_queries(name):
+    return [name[:i] for i in range(1, len(name) + 1) if not name[:i].endswith(' ')]
+
+
+def timed(fn, queries):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1], latencies[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[30, 1000, 10000])
+    parser.add_argument('--names', type=int, default=50, help='nombres cuyo tecleo se simula')
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        plants = make_catalog(size)
+        start = time.perf_counter()
+        index = PlantSearchIndex(plants)
+        build = time.perf_counter() - start
+        sample = random.Random(size).sample(plants, min(args.names, len(plants)))
+        queries = [q for plant in sample for q in typeahead_queries(plant['common_name'])]
+
+        old = timed(lambda q: legacy_search(plants, q), queries)
+        new = timed(index.search, queries)
+        print(f"plantas={size} consultas={len(queries)} índice construido en {build * 1000:.0f} ms "
+              f"({len(index.tokens)} tokens)")
+        for label, (p50, p99, worst) in (('anterior', old), ('índice', new)):
+            print(f"  {label:<9} p50 {p50 * 1000:6.3f} ms  p99 {p99 * 1000:6.3f} ms  max {worst * 1000:6.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
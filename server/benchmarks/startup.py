@@ -0,0 +1,53 @@
+"""Coste de arranque: importar api.views con los modelos perezosos frente a cargarlos al importar.
+
+Cada medición se hace en un proceso nuevo (como un worker de gunicorn o un
+`manage.py migrate`):
+  - "import api.views": lo que paga hoy cualquier proceso que carga las URLs.
+  - "import + cargar modelos": lo que se pagaba antes, cuando api.views creaba los
+    dos YOLO al importarse (equivale también a arrancar con MODEL_WARMUP=True).
+  - "primera predicción": import + predicción de una imagen con el modelo perezoso.
+
+Uso (desde server/):
+    python benchmarks/startup.py --repeat 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SETUP = "import time, sys; t = time.perf_counter(); import django; django.setup(); import api.views as v; "
+CASES = {
+    'import api.views': SETUP,
+    'import + cargar modelos': SETUP + "v.model.get(); v.model_disease.get(); ",
+    'primera predicción': SETUP + "import numpy as np; v.model.predict(np.zeros((480, 640, 3), dtype=np.uint8)); ",
+}
+REPORT = "print('BENCH', time.perf_counter() - t, 'torch' in sys.modules)"
+
+
+def measure(code):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE='plants.settings', MODEL_WARMUP='False', MODEL_SERVER_SOCKET='')
+    env.setdefault('YOLO_CONFIG_DIR', '/tmp/Ultralytics')
+    out = subprocess.run([sys.executable, '-c', code + REPORT], cwd=SERVER_DIR, env=env,
+                         capture_output=True, text=True, check=True)
+    line = next(line for line in out.stdout.splitlines() if line.startswith('BENCH'))
+    _, seconds, torch_loaded = line.split()
+    return float(seconds), torch_loaded == 'True'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for label, code in CASES.items():
+        runs = [measure(code) for _ in range(args.repeat)]
+        times = [t for t, _ in runs]
+        print(f"{label:<26} mediana {statistics.median(times) * 1000:6.0f} ms  "
+              f"(min {min(times) * 1000:.0f})  torch importado: {'sí' if runs[0][1] else 'no'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""Benchmark de /api/user-tasks/ con muchas plantas.
+
+Compara la vista actual (lee las columnas next_*_date con values() y serializa
+cada planta una vez) con el bucle anterior, que creaba un UserPlantSerializer
+por planta y repetía la planta completa en cada una de sus tareas. Usa una base de
+datos de test temporal, no toca db.sqlite3.
+
+Uso (desde server/):
+    python benchmarks/user_tasks.py --plants 1000 10000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'plants.settings')
+os.environ.setdefault('YOLO_CONFIG_DIR', '/tmp/Ultralytics')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from rest_framework.test import APIRequestFactory, force_authenticate  # noqa: E402
+
+from api import care_tasks  # noqa: E402
+from api.models import UserPlant  # noqa: E402
+from api.serializers import UserPlantSerializer  # noqa: E402
+from api.views import UserTasksView  # noqa: E402
+
+
+def legacy_tasks(request):
+    """El cálculo anterior de UserTasksView (un serializador por planta)."""
+    today = timezone.localdate()
+    buckets = {'today_tasks': [], 'next_tasks': [], 'previous_tasks': []}
+    for plant in UserPlant.objects.filter(owner=request.user):
+        serializer = UserPlantSerializer(plant, context={'request': request})
+        plant_data = serializer.data
+        for task_type, method in (
+            ('watering', serializer.get_next_watering_date),
+            ('pruning', serializer.get_next_pruning_date),
+            ('spraying', serializer.get_next_spraying_date),
+            ('rotating', serializer.get_next_rotating_date),
+        ):
+            date = method(plant)
+            if not date:
+                continue
+            bucket = 'today_tasks' if date == today else 'next_tasks' if date > today else 'previous_tasks'
+            buckets[bucket].append({"type": task_type, "next_date": date, "user_plant": plant_data})
+    return buckets
+
+
+def create_plants(user, count):
+    today = timezone.localdate()
+    rng = random.Random(count)
+    plants = []
+    for i in range(count):
+        plants.append(UserPlant(
+            owner=user, plant_id=i, common_name=f'Plant {i}',
+            last_watered_date=today - timedelta(days=rng.randint(0, 14)),
+            watering_type=rng.choice(['manual', 'recommended']),
+            watering_time=rng.randint(1, 4), watering_unit='day',
+            watering_period={'value': '7-10', 'unit': 'days'},
+            pruning_time=1, pruning_time_unit='month',
+            last_pruning_date=today - timedelta(days=rng.randint(0, 60)),
+            sprayed_time=2, sprayed_unit='week',
+            rotation_time=1, rotation_unit='week',
+            last_rotating_date=today - timedelta(days=rng.randint(0, 10)),
+        ))
+    UserPlant.objects.bulk_create(plants, batch_size=1000)
+    # bulk_create no pasa por save(): calcular las columnas next_*_date
+    care_tasks.backfill(UserPlant)
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--plants', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    factory = APIRequestFactory()
+    renderer = JSONRenderer()
+    view = UserTasksView.as_view()
+    try:
+        for count in args.plants:
+            user = User.objects.create_user(username=f'bench{count}', password='x')
+            create_plants(user, count)
+
+            def new():
+                request = factory.get('/api/user-tasks/')
+                force_authenticate(request, user=user)
+                return renderer.render(view(request).data)
+
+            def old():
+                request = factory.get('/api/user-tasks/')
+                request.user = user
+                return renderer.render(legacy_tasks(request))
+
+            new_time, new_body = timed(new, args.repeat)
+            old_time, old_body = timed(old, args.repeat)
+            tasks = sum(len(v) for k, v in json.loads(new_body).items() if k != 'plants')
+            print(f"plantas={count} tareas={tasks}")
+            print(f"  anterior: {old_time * 1000:8.0f} ms  {len(old_body) / 1e6:6.1f} MB")
+            print(f"  actual:   {new_time * 1000:8.0f} ms  {len(new_body) / 1e6:6.1f} MB  "
+                  f"(x{old_time / new_time:.1f})")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
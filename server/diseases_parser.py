@@ -3,7 +3,21 @@ import os
 import re
 from pathlib import Path
 from typing import Optional, List, Dict, Any
-from bs4 import BeautifulSoup
+
+from api.html_parsing import has_classes_xpath, parse_tree, text, xpath
+
+# The page is ~490 KB: it is parsed with lxml and walked with XPath instead of
+# building a BeautifulSoup tree (see benchmarks/html_parsing.py)
+CARDS_XPATH = xpath(f'//a[{has_classes_xpath("search-container-box", "shadow", "relative")}]')
+IMAGE_XPATH = xpath(f'.//div[{has_classes_xpath("aspect-video", "bg-cover", "bg-center")}]')
+NAME_XPATH = xpath(f'.//*[{has_classes_xpath("text-xl", "font-bold", "line-clamp-2")}]')
+SOLUTIONS_XPATH = xpath(f'.//*[{has_classes_xpath("main-t-c")}]')
+
+
+def first(element, query):
+    """First element matched by a compiled XPath query, or None."""
+    found = query(element)
+    return found[0] if found else None
 
 
 def extract_background_image_url(style_value: Optional[str]) -> Optional[str]:
@@ -22,11 +36,11 @@ def parse_diseases(html_path: Path) -> List[Dict[str, Any]]:
     href, image, name, solutions_count.
     """
     html_text = html_path.read_text(encoding="utf-8")
-    soup = BeautifulSoup(html_text, "html.parser")
+    tree = parse_tree(html_text)
 
     items: List[Dict[str, Any]] = []
     # Each card is an <a> with classes: search-container-box shadow relative
-    for a in soup.select("a.search-container-box.shadow.relative"):
+    for a in CARDS_XPATH(tree):
         href = a.get("href")
         # Try to extract numeric id from href last path segment
         item_id = None
@@ -39,17 +53,17 @@ def parse_diseases(html_path: Path) -> List[Dict[str, Any]]:
 
         # Image is in a div.aspect-video.bg-cover.bg-center with style background-image:url(...)
         img_url = None
-        img_div = a.select_one("div.aspect-video.bg-cover.bg-center")
-        if img_div and img_div.has_attr("style"):
+        img_div = first(a, IMAGE_XPATH)
+        if img_div is not None and img_div.get("style") is not None:
             img_url = extract_background_image_url(img_div.get("style"))
 
         # Name text element
-        name_el = a.select_one(".text-xl.font-bold.line-clamp-2")
-        name = name_el.get_text(strip=True) if name_el else None
+        name_el = first(a, NAME_XPATH)
+        name = text(name_el) if name_el is not None else None
 
         # Solutions count from .main-t-c (e.g., "3 Solutions")
-        sol_el = a.select_one(".main-t-c")
-        sol_text = sol_el.get_text(strip=True) if sol_el else ""
+        sol_el = first(a, SOLUTIONS_XPATH)
+        sol_text = text(sol_el) if sol_el is not None else ""
         m = re.search(r"(\d+)", sol_text)
         solutions_count = int(m.group(1)) if m else None
 
@@ -17,5 +17,40 @@ python manage.py migrate --noinput
 echo "Collecting static files..."
 python manage.py collectstatic --noinput
 
+if [ -n "$MODEL_SERVER_SOCKET" ]; then
+  # Un solo proceso con los modelos para todos los workers de gunicorn; si termina
+  # se vuelve a arrancar (mientras tanto las predicciones responden 503)
+  echo "Starting model server on $MODEL_SERVER_SOCKET..."
+  (
+    while true; do
+      python manage.py model_server || true
+      echo "Model server exited, restarting in 1s..."
+      sleep 1
+    done
+  ) &
+
+  # Gunicorn no arranca hasta que el servidor responde (carga de los modelos)
+  waited=0
+  until python manage.py model_server --check > /dev/null 2>&1; do
+    if [ "$waited" -ge "${MODEL_SERVER_START_TIMEOUT:-300}" ]; then
+      echo "Model server not ready after ${waited}s"
+      exit 1
+    fi
+    echo "Waiting for model server..."
+    sleep 2
+    waited=$((waited + 2))
+  done
+fi
+
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+  # Workers de uvicorn: las vistas proxy (Perenual, tiempo, plagas) son async y un
+  # worker mantiene muchas peticiones esperando a la API externa a la vez
+  echo "Starting Gunicorn with uvicorn workers (ASGI)..."
+  exec gunicorn plants.asgi:application --bind 0.0.0.0:8000 --workers ${GUNICORN_WORKERS:-3} \
+    --worker-class uvicorn_worker.UvicornWorker --timeout ${GUNICORN_TIMEOUT:-60}
+fi
+
 echo "Starting Gunicorn..."
-exec gunicorn plants.wsgi:application --bind 0.0.0.0:8000 --workers ${GUNICORN_WORKERS:-3}
+# Con GUNICORN_THREADS > 1 cada worker atiende varias peticiones a la vez y las
+# predicciones simultáneas se agrupan en un solo batch (INFERENCE_MAX_BATCH)
+exec gunicorn plants.wsgi:application --bind 0.0.0.0:8000 --workers ${GUNICORN_WORKERS:-3} --threads ${GUNICORN_THREADS:-1}
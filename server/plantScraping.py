@@ -1,9 +1,10 @@
-from bs4 import BeautifulSoup
 import requests
 import json
 import time
 import re
 
+from api.html_parsing import TagStrainer, parse
+
 def extract_watering_period(watering_text):
     if not watering_text:
         return None
@@ -44,7 +45,8 @@ def extract_watering_period(watering_text):
 with open("./perenual.html", "r", encoding="utf-8") as f:
     html = f.read()
 
-soup = BeautifulSoup(html, "html.parser")
+# Solo se construye el div con los resultados
+soup = parse(html, TagStrainer((None, {"id": "search-container-display"})))
 
 # Encuentra el div por id
 container = soup.find("div", id="search-container-display")
@@ -60,7 +62,8 @@ for href in hrefs:
     seconds = int(elapsed % 60)
     print(f"Scraping plant data from: {href} | Elapsed time: {minutes}m {seconds}s")
     ficha_resp = requests.get(href)
-    ficha_soup = BeautifulSoup(ficha_resp.text, "html.parser")
+    # La ficha se usa casi entera (h3 de cada campo y su <p>): parseo completo con lxml
+    ficha_soup = parse(ficha_resp.text)
     nombre_comun_elem = ficha_soup.find("h1", class_="text-5xl font-bold")
     nombre_comun = nombre_comun_elem.get_text(strip=True) if nombre_comun_elem else ""
     nombre_cientifico_elem = ficha_soup.find("h2", class_="italic main-t-c my-2")
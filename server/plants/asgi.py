@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'plants.settings')
 
 application = get_asgi_application()
+
+if settings.MODEL_WARMUP:
+    from api.inference import warm_up_in_background
+    from api.views import model, model_disease
+    warm_up_in_background(model, model_disease)
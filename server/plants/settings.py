@@ -63,7 +63,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'plants.middleware.AsyncWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -108,6 +108,11 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'plants.wsgi.application'
 
+# 'wsgi' (gunicorn con workers sync) o 'asgi' (gunicorn con workers de uvicorn), ver entrypoint.sh
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi')
+# Servir las vistas proxy de Perenual/OpenWeather en su versión async
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', str(SERVER_MODE == 'asgi')).lower() == 'true'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
@@ -135,6 +140,129 @@ else:
     }
 
 
+# Cachés
+# La caché 'perenual' guarda los detalles de especies. En producción usa un backend
+# de fichero para que todos los workers de gunicorn compartan las entradas; se puede
+# cambiar por base de datos (django.core.cache.backends.db.DatabaseCache + createcachetable)
+# con PERENUAL_CACHE_BACKEND y PERENUAL_CACHE_LOCATION.
+if os.getenv('ENVIRONMENT') == 'production':
+    _perenual_cache_backend = 'django.core.cache.backends.filebased.FileBasedCache'
+    _perenual_cache_location = str(BASE_DIR / 'cache' / 'perenual')
+else:
+    _perenual_cache_backend = 'django.core.cache.backends.locmem.LocMemCache'
+    _perenual_cache_location = 'perenual'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'perenual': {
+        'BACKEND': os.getenv('PERENUAL_CACHE_BACKEND', _perenual_cache_backend),
+        'LOCATION': os.getenv('PERENUAL_CACHE_LOCATION', _perenual_cache_location),
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('PERENUAL_CACHE_MAX_ENTRIES', '10000'))},
+    },
+}
+
+PERENUAL_API_URL = os.getenv('PERENUAL_API_URL', 'https://perenual.com/api/v2')
+PERENUAL_CACHE_ALIAS = 'perenual'
+# TTL (segundos) de los detalles de especies en la caché compartida
+PERENUAL_CACHE_TTL = int(os.getenv('PERENUAL_CACHE_TTL', str(60 * 60 * 24)))
+# TTL de las respuestas 404 (caché negativa)
+PERENUAL_CACHE_NEGATIVE_TTL = int(os.getenv('PERENUAL_CACHE_NEGATIVE_TTL', str(60 * 60)))
+# LRU en memoria de cada proceso
+PERENUAL_LRU_SIZE = int(os.getenv('PERENUAL_LRU_SIZE', '512'))
+PERENUAL_LRU_TTL = int(os.getenv('PERENUAL_LRU_TTL', '300'))
+# Segundos que un worker espera a otro que ya está consultando la misma especie
+PERENUAL_LEASE_TIMEOUT = int(os.getenv('PERENUAL_LEASE_TIMEOUT', '10'))
+# Hilos para pedir detalles y guía de cuidados en paralelo
+PERENUAL_FANOUT_WORKERS = int(os.getenv('PERENUAL_FANOUT_WORKERS', '8'))
+# Tiempo máximo (segundos) que el detalle de una planta del usuario espera a Perenual
+PERENUAL_DETAIL_DEADLINE = float(os.getenv('PERENUAL_DETAIL_DEADLINE', '4'))
+# Copia local de Perenual (manage.py sync_species, api/species_mirror.py): con
+# SPECIES_MIRROR=True los detalles y la lista de plantas salen de la base de datos
+SPECIES_MIRROR = os.getenv('SPECIES_MIRROR', 'False').lower() == 'true'
+# Edad (segundos) a partir de la cual se vuelve a pedir una especie a Perenual
+SPECIES_MIRROR_MAX_AGE = int(os.getenv('SPECIES_MIRROR_MAX_AGE', str(60 * 60 * 24 * 30)))
+# True: se responde con la copia caducada y se refresca en segundo plano
+SPECIES_MIRROR_STALE_WHILE_REVALIDATE = os.getenv('SPECIES_MIRROR_STALE_WHILE_REVALIDATE', 'True').lower() == 'true'
+SPECIES_MIRROR_REFRESH_WORKERS = int(os.getenv('SPECIES_MIRROR_REFRESH_WORKERS', '2'))
+# Cada cuántos segundos se comprueba si hay especies nuevas para el índice de búsqueda
+SPECIES_MIRROR_INDEX_TTL = int(os.getenv('SPECIES_MIRROR_INDEX_TTL', '60'))
+# Páginas de detalle de plagas ya parseadas (api/pest_details.py, manage.py prefetch_pest_details):
+# edad (segundos) a partir de la cual se revalidan en segundo plano con una petición condicional
+PEST_DETAIL_MAX_AGE = int(os.getenv('PEST_DETAIL_MAX_AGE', str(60 * 60 * 24 * 7)))
+# Sugerencias mientras se escribe (/api/suggest/, api/suggest.py)
+SUGGEST_LIMIT = int(os.getenv('SUGGEST_LIMIT', '10'))
+SUGGEST_MAX_LIMIT = int(os.getenv('SUGGEST_MAX_LIMIT', '25'))
+# max-age (segundos) de Cache-Control en las respuestas
+SUGGEST_MAX_AGE = int(os.getenv('SUGGEST_MAX_AGE', '300'))
+SUGGEST_CACHE_SIZE = int(os.getenv('SUGGEST_CACHE_SIZE', '2048'))
+SUGGEST_CACHE_TTL = int(os.getenv('SUGGEST_CACHE_TTL', '600'))
+
+# Llamadas HTTP salientes (api/http_client.py)
+OUTBOUND_CONNECT_TIMEOUT = float(os.getenv('OUTBOUND_CONNECT_TIMEOUT', '3.05'))
+OUTBOUND_READ_TIMEOUT = float(os.getenv('OUTBOUND_READ_TIMEOUT', '15'))
+OUTBOUND_MAX_RETRIES = int(os.getenv('OUTBOUND_MAX_RETRIES', '2'))
+OUTBOUND_BACKOFF_FACTOR = float(os.getenv('OUTBOUND_BACKOFF_FACTOR', '0.3'))
+# Retry-After máximo (segundos) que se espera para reintentar; con uno mayor se devuelve el 429/503
+OUTBOUND_MAX_RETRY_AFTER = float(os.getenv('OUTBOUND_MAX_RETRY_AFTER', '5'))
+# Conexiones keep-alive por host
+OUTBOUND_POOL_MAXSIZE = int(os.getenv('OUTBOUND_POOL_MAXSIZE', '10'))
+# Conexiones simultáneas del cliente async de cada worker ASGI
+OUTBOUND_ASYNC_MAX_CONNECTIONS = int(os.getenv('OUTBOUND_ASYNC_MAX_CONNECTIONS', '100'))
+
+# Micro-batching de los clasificadores YOLO (api/inference.py). Solo agrupa si el
+# worker atiende varias peticiones a la vez (GUNICORN_THREADS > 1 o SERVER_MODE=asgi)
+INFERENCE_MAX_BATCH = int(os.getenv('INFERENCE_MAX_BATCH', '4'))
+INFERENCE_MAX_WAIT_MS = float(os.getenv('INFERENCE_MAX_WAIT_MS', '10'))
+# Segundos que una petición espera su resultado
+INFERENCE_TIMEOUT = float(os.getenv('INFERENCE_TIMEOUT', '30'))
+
+# 'torch' (best.pt con Ultralytics), 'onnx' u 'onnx-int8' (onnxruntime, sin torch;
+# requiere `manage.py export_models`, con --int8 para 'onnx-int8')
+INFERENCE_BACKEND = os.getenv('INFERENCE_BACKEND', 'torch')
+
+# Decodificación de las imágenes subidas (api/image_decode.py): tamaño de entrada
+# del clasificador, límites por encima de los cuales se responde 413 y decodificación
+# JPEG a 1/2, 1/4 u 1/8 cuando la imagen es mucho mayor que INFERENCE_IMGSZ
+INFERENCE_IMGSZ = int(os.getenv('INFERENCE_IMGSZ', '224'))
+IMAGE_MAX_BYTES = int(os.getenv('IMAGE_MAX_BYTES', str(20 * 1024 * 1024)))
+IMAGE_MAX_PIXELS = int(os.getenv('IMAGE_MAX_PIXELS', '50000000'))
+IMAGE_REDUCED_DECODE = os.getenv('IMAGE_REDUCED_DECODE', 'True').lower() == 'true'
+
+# Subidas de imágenes en streaming (api/uploads.py): máximo por endpoint y bytes que
+# se guardan en memoria antes de pasar la subida a un fichero temporal
+PREDICT_UPLOAD_MAX_BYTES = int(os.getenv('PREDICT_UPLOAD_MAX_BYTES', str(IMAGE_MAX_BYTES)))
+MEDIA_UPLOAD_MAX_BYTES = int(os.getenv('MEDIA_UPLOAD_MAX_BYTES', str(10 * 1024 * 1024)))
+IMAGE_UPLOAD_MEMORY_LIMIT = int(os.getenv('IMAGE_UPLOAD_MEMORY_LIMIT', str(2621440)))
+
+# Cargar los clasificadores al arrancar cada worker (en segundo plano) en lugar de
+# en la primera predicción (plants/wsgi.py, plants/asgi.py)
+MODEL_WARMUP = os.getenv('MODEL_WARMUP', 'False').lower() == 'true'
+
+# Servidor de modelos compartido (manage.py model_server). Vacío: cada worker carga
+# los modelos en su proceso
+MODEL_SERVER_SOCKET = os.getenv('MODEL_SERVER_SOCKET', '')
+# Predicciones en curso a partir de las cuales el servidor responde "ocupado" (503)
+MODEL_SERVER_MAX_PENDING = int(os.getenv('MODEL_SERVER_MAX_PENDING', '32'))
+MODEL_SERVER_TIMEOUT = float(os.getenv('MODEL_SERVER_TIMEOUT', '30'))
+# Segundos sin volver a intentar conectar tras un fallo (mientras, 503 o inferencia local)
+MODEL_SERVER_RETRY_INTERVAL = float(os.getenv('MODEL_SERVER_RETRY_INTERVAL', '5'))
+# Si el servidor no responde, cargar los modelos en el worker (torch en cada proceso)
+# en lugar de responder 503; se liberan cuando el servidor vuelve a responder
+MODEL_SERVER_LOCAL_FALLBACK = os.getenv('MODEL_SERVER_LOCAL_FALLBACK', 'False').lower() == 'true'
+
+# Caché de predicciones por hash de la imagen y versión del modelo
+# (api/prediction_cache.py). 0 la desactiva
+PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', '1024'))
+PREDICTION_CACHE_TTL = int(os.getenv('PREDICTION_CACHE_TTL', str(60 * 60 * 6)))
+PREDICTION_CACHE_TOP_K = int(os.getenv('PREDICTION_CACHE_TOP_K', '5'))
+
+# Paginación por cursor de posts y comentarios (api/pagination.py)
+POSTS_PAGE_SIZE = int(os.getenv('POSTS_PAGE_SIZE', '20'))
+POSTS_MAX_PAGE_SIZE = int(os.getenv('POSTS_MAX_PAGE_SIZE', '100'))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'plants.settings')
 
 application = get_wsgi_application()
+
+if settings.MODEL_WARMUP:
+    from api.inference import warm_up_in_background
+    from api.views import model, model_disease
+    warm_up_in_background(model, model_disease)